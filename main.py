@@ -1,3 +1,5 @@
+import multiprocessing
+
 from loguru import logger
 
 from src.infrastructure.container import Container
@@ -14,4 +16,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Frozen builds start the clipboard monitor process through this script.
+    multiprocessing.freeze_support()
     main()
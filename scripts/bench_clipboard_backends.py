@@ -0,0 +1,74 @@
+"""Compare clipboard round trips of pyperclip and the persistent X11 client.
+
+Needs an X server (a real session or ``xvfb-run``) and, for the pyperclip
+column, xclip or xsel. Reads are timed against a value owned by another
+client, as the monitor sees them; writes are timed on their own.
+"""
+
+from pathlib import Path
+import statistics
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pyperclip  # noqa: E402
+
+from src.adapters.x11_clipboard import X11Clipboard  # noqa: E402
+
+ROUNDS = 200
+VALUE = "clipboard benchmark value " * 8
+
+
+def time_calls(call, rounds: int) -> list[float]:
+    timings = []
+    for i in range(rounds):
+        started = time.perf_counter()
+        call(i)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def describe(name: str, timings: list[float]) -> str:
+    median = statistics.median(timings) * 1e6
+    p95 = sorted(timings)[int(len(timings) * 0.95)] * 1e6
+    return f"{name:<24} median {median:10.0f} µs   p95 {p95:10.0f} µs"
+
+
+def main():
+    owner = X11Clipboard()
+    reader = X11Clipboard()
+    try:
+        owner.write_text(VALUE)
+        results = [
+            describe(
+                "X11Clipboard read",
+                time_calls(lambda i: reader.read_text(), ROUNDS),
+            ),
+            describe(
+                "X11Clipboard write",
+                time_calls(lambda i: owner.write_text(f"{VALUE}{i}"), ROUNDS),
+            ),
+        ]
+        owner.write_text(VALUE)
+        results += [
+            describe(
+                "pyperclip.paste",
+                time_calls(lambda i: pyperclip.paste(), ROUNDS),
+            ),
+            describe(
+                "pyperclip.copy",
+                time_calls(lambda i: pyperclip.copy(f"{VALUE}{i}"), ROUNDS),
+            ),
+        ]
+    finally:
+        owner.close()
+        reader.close()
+
+    print(f"Rounds: {ROUNDS}, value of {len(VALUE)} characters")
+    for line in results:
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
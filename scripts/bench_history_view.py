@@ -0,0 +1,79 @@
+"""Time how history changes reach a displayed list of ``SIZES`` items.
+
+Each run fills a history, shows it, then makes ``CHANGE_COUNT`` changes: new
+clips that evict the oldest, clips copied again and uses. The changes are
+turned into deltas by ``HistoryView`` and applied to the list the UI adapter
+keeps, one batch per change as the service does. Both costs should stay
+about flat as the history grows: the view locates items in O(log n), and the
+adapter finds them at the position each delta carries.
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.adapters.ui.pywebview_ui_adapter import PyWebViewUIAdapter  # noqa: E402
+from src.application.history_view import HistoryView  # noqa: E402
+from src.domain.clipboard import ClipboardHistory, ClipboardItem  # noqa: E402
+
+SIZES = [1_000, 10_000, 100_000]
+CHANGE_COUNT = 2_000
+
+
+def run(size: int) -> str:
+    start = datetime(2024, 1, 1)
+    history = ClipboardHistory(
+        items=[
+            ClipboardItem(content=f"clip {i}", created_at=start - timedelta(seconds=i))
+            for i in range(size)
+        ],
+        max_items=size,
+    )
+    changes = []
+    history.subscribe(changes.extend)
+    snapshot = history.snapshot()
+    view = HistoryView(snapshot)
+    ui = PyWebViewUIAdapter()
+    ui.show_history(list(snapshot.listed()))
+    rng = random.Random(1)
+
+    view_seconds = ui_seconds = 0.0
+    for step in range(CHANGE_COUNT):
+        action = step % 3
+        if action == 0:
+            history.add_item(f"new clip {step}")
+        else:
+            item_id = history.items[rng.randrange(len(history))].id
+            if action == 1:
+                history.promote(item_id)
+            else:
+                history.record_use(item_id)
+
+        started = time.perf_counter()
+        deltas = view.apply(changes)
+        applied = time.perf_counter()
+        ui.apply_history_deltas(deltas)
+        finished = time.perf_counter()
+        changes.clear()
+        view_seconds += applied - started
+        ui_seconds += finished - applied
+
+    assert view.ids() == [item.id for item in history.snapshot().listed()]
+    return (
+        f"{size:>7} items: view {view_seconds / CHANGE_COUNT * 1e6:6.1f} us, "
+        f"UI list {ui_seconds / CHANGE_COUNT * 1e6:6.1f} us per change"
+    )
+
+
+def main():
+    print(f"{CHANGE_COUNT} changes per run")
+    for size in SIZES:
+        print(run(size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Feed ClipboardService a synthetic stream of clipboard changes.
+
+Changes arrive from a producer thread at ``RATE`` per second, as the monitor
+would deliver them, with and without burst coalescing. Storage and the UI
+are stand-ins that only count calls, so the figures are the service's own
+cost: how many commits it made and whether the owner loop kept up.
+"""
+
+from pathlib import Path
+import sys
+import time
+from unittest.mock import Mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.application.clipboard_service import ClipboardService  # noqa: E402
+from src.application.settings_service import SettingsService  # noqa: E402
+from src.domain.clipboard import ClipboardHistory  # noqa: E402
+from src.domain.settings.app_settings import create_app_settings  # noqa: E402
+
+RATE = 1000
+SECONDS = 2.0
+WINDOWS_MS = [0, 20, 100]
+
+
+def run(window_ms: int) -> str:
+    repository = Mock()
+    repository.exists.return_value = False
+    settings_service = SettingsService(
+        repository=repository, settings=create_app_settings()
+    )
+    settings_service.update_setting("history.burst_window_ms", window_ms)
+    storage_port = Mock()
+    storage_port.load_history.return_value = ClipboardHistory(items=[])
+    storage_port.apply_changes.return_value = True
+    ui_port = Mock()
+    clipboard_port = Mock()
+    service = ClipboardService(
+        clipboard_port=clipboard_port,
+        storage_port=storage_port,
+        ui_port=ui_port,
+        search_port=Mock(),
+        settings_service=settings_service,
+    )
+    service.start_monitoring()
+    on_change = clipboard_port.start_monitoring.call_args.args[0]
+
+    count = int(RATE * SECONDS)
+    started = time.perf_counter()
+    for i in range(count):
+        on_change(f"synthetic clip {i}", [])
+        # Pace the producer without sleeping past the schedule.
+        delay = started + (i + 1) / RATE - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    service.stop()
+    elapsed = time.perf_counter() - started
+
+    metrics = service.loop_metrics
+    return (
+        f"window {window_ms:>4} ms: {count / elapsed:7.0f} changes/s, "
+        f"{storage_port.apply_changes.call_count:5} storage writes, "
+        f"{ui_port.show_history.call_count:5} full UI pushes, "
+        f"{ui_port.apply_history_deltas.call_count:5} delta pushes, "
+        f"{len(service.history):5} items, "
+        f"max wait {metrics.max_wait * 1000:6.1f} ms"
+    )
+
+
+def main():
+    print(f"{RATE} changes/s for {SECONDS:.0f} s")
+    for window_ms in WINDOWS_MS:
+        print(run(window_ms))
+
+
+if __name__ == "__main__":
+    main()
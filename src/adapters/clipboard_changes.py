@@ -0,0 +1,185 @@
+"""Cheap signals that the clipboard changed, without reading it.
+
+Windows keeps a clipboard sequence number and macOS a pasteboard change
+count. Both move on every write by any application, and reading them is a
+single call, so the monitor can skip reading and hashing the clipboard data
+while they stay put. Where there is no such counter, ``current_signal`` falls
+back to a hash of the text streamed from the clipboard tool in chunks, which
+costs a transfer but never holds the whole value in memory.
+"""
+
+import ctypes
+from ctypes.util import find_library
+from functools import lru_cache
+import hashlib
+import shutil
+import subprocess
+import sys
+from typing import Callable, Hashable, NamedTuple, Optional
+
+from loguru import logger
+
+from src.adapters.clipboard_images import (
+    IMAGE_COMMAND_TIMEOUT,
+    uses_wayland,
+    windows_api,
+)
+
+STREAM_CHUNK_BYTES = 1 << 20
+
+_CF_UNICODETEXT = 13
+
+
+class ChangeSignal(NamedTuple):
+    """What is known about the clipboard without reading its contents."""
+
+    # Differs whenever the clipboard changed.
+    token: Hashable
+    # Lower bound of the UTF-8 size of the text on the clipboard, if it came
+    # with the token; otherwise see ``text_size``.
+    size: Optional[int] = None
+    # Whether ``token`` is a counter that moves once per change, so that a
+    # jump of more than one means changes nobody saw.
+    counts_changes: bool = False
+    # Whether getting the signal started a process, which makes each poll
+    # costly enough to slow down.
+    spawned: bool = False
+
+
+def current_signal() -> Optional[ChangeSignal]:
+    """The cheapest change signal for this platform, or None if there is none."""
+    count = change_count()
+    if count is not None:
+        return ChangeSignal(count, counts_changes=True)
+    if sys.platform.startswith("linux"):
+        return stream_digest()
+    return None
+
+
+def change_count() -> Optional[int]:
+    """Current value of the platform clipboard change counter, or None."""
+    counter = _counter()
+    if counter is None:
+        return None
+    try:
+        return counter()
+    except Exception as e:
+        logger.debug(f"Could not read the clipboard change counter: {e}")
+        return None
+
+
+def text_size() -> Optional[int]:
+    """Lower bound of the clipboard text's UTF-8 size, read without the text.
+
+    Only Windows reports it, as the size of the UTF-16 allocation; each
+    UTF-16 code unit is at least one UTF-8 byte.
+    """
+    if sys.platform != "win32":
+        return None
+    try:
+        _, user32, kernel32, _ = windows_api()
+        if not user32.IsClipboardFormatAvailable(_CF_UNICODETEXT):
+            return 0
+        if not user32.OpenClipboard(None):
+            return None
+        try:
+            handle = user32.GetClipboardData(_CF_UNICODETEXT)
+            return kernel32.GlobalSize(handle) // 2 if handle else None
+        finally:
+            user32.CloseClipboard()
+    except Exception as e:
+        logger.debug(f"Could not size the clipboard text: {e}")
+        return None
+
+
+def stream_digest() -> Optional[ChangeSignal]:
+    """Hash of the clipboard text, read from the clipboard tool in chunks.
+
+    The token is the hash and the size is exact. None where no tool is
+    available or the clipboard holds no text. Each call starts the tool, so
+    monitors polling on this signal should poll less often.
+    """
+    args = text_command()
+    if args is None:
+        return None
+    digest = hashlib.blake2b(digest_size=16)
+    size = 0
+    try:
+        process = subprocess.Popen(
+            args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+    except OSError as e:
+        logger.debug(f"Could not stream the clipboard text: {e}")
+        return None
+    with process:
+        for chunk in iter(lambda: process.stdout.read(STREAM_CHUNK_BYTES), b""):
+            digest.update(chunk)
+            size += len(chunk)
+        try:
+            process.wait(IMAGE_COMMAND_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            return None
+    if process.returncode != 0 or not size:
+        return None
+    return ChangeSignal(digest.digest(), size, spawned=True)
+
+
+def text_command(primary: bool = False) -> Optional[list[str]]:
+    """Command that prints the text of the clipboard or the PRIMARY selection."""
+    if uses_wayland():
+        flag = ["--primary"] if primary else []
+        return ["wl-paste", *flag, "--no-newline", "--type", "text"]
+    if shutil.which("xclip"):
+        return ["xclip", "-selection", "primary" if primary else "clipboard", "-o"]
+    if shutil.which("xsel"):
+        return ["xsel", "--primary" if primary else "--clipboard", "--output"]
+    return None
+
+
+@lru_cache(maxsize=1)
+def _counter() -> Optional[Callable[[], int]]:
+    try:
+        if sys.platform == "win32":
+            return _windows_counter()
+        if sys.platform == "darwin":
+            return _macos_counter()
+    except (OSError, AttributeError) as e:
+        logger.info(f"Clipboard change counter unavailable: {e}")
+    return None
+
+
+def _windows_counter() -> Callable[[], int]:
+    from ctypes import wintypes
+
+    user32 = ctypes.WinDLL("user32", use_last_error=True)
+    user32.GetClipboardSequenceNumber.argtypes = []
+    user32.GetClipboardSequenceNumber.restype = wintypes.DWORD
+    return user32.GetClipboardSequenceNumber
+
+
+def _macos_counter() -> Callable[[], int]:
+    objc = ctypes.CDLL(find_library("objc"))
+    # Loading AppKit registers the NSPasteboard class with the runtime.
+    ctypes.CDLL(find_library("AppKit"))
+    objc.objc_getClass.argtypes = [ctypes.c_char_p]
+    objc.objc_getClass.restype = ctypes.c_void_p
+    objc.sel_registerName.argtypes = [ctypes.c_char_p]
+    objc.sel_registerName.restype = ctypes.c_void_p
+
+    # objc_msgSend has to be called through the exact prototype of the
+    # method, which differs between the two messages sent here.
+    send_object = ctypes.CFUNCTYPE(ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p)(
+        ("objc_msgSend", objc)
+    )
+    send_integer = ctypes.CFUNCTYPE(ctypes.c_long, ctypes.c_void_p, ctypes.c_void_p)(
+        ("objc_msgSend", objc)
+    )
+    pasteboard = send_object(
+        objc.objc_getClass(b"NSPasteboard"),
+        objc.sel_registerName(b"generalPasteboard"),
+    )
+    if not pasteboard:
+        raise OSError("No general pasteboard")
+    change_count_selector = objc.sel_registerName(b"changeCount")
+    return lambda: send_integer(pasteboard, change_count_selector)
@@ -0,0 +1,188 @@
+"""Rich text formats offered on the system clipboard next to plain text.
+
+Formats are named by media type. ``list_formats`` only asks which of them are
+on offer, which is cheap enough to do on every change; the data itself is
+read with ``read_format`` once per captured change and written back with
+``write_formats`` when a clip is copied with its formatting. On Linux the
+text and its formats can only be offered together by one owner serving all
+their targets; ``unix_targets`` names them for such an owner.
+"""
+
+import os
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from src.adapters.clipboard_images import (
+    applescript_data,
+    offered_types,
+    read_type,
+    run_command,
+    windows_api,
+    windows_get,
+    windows_set,
+)
+
+HTML_MEDIA_TYPE = "text/html"
+RTF_MEDIA_TYPE = "text/rtf"
+RICH_FORMATS = (HTML_MEDIA_TYPE, RTF_MEDIA_TYPE)
+
+_UNIX_TYPES = {
+    HTML_MEDIA_TYPE: ("text/html",),
+    RTF_MEDIA_TYPE: ("text/rtf", "application/rtf"),
+}
+_MACOS_CLASSES = {HTML_MEDIA_TYPE: "HTML", RTF_MEDIA_TYPE: "RTF "}
+_WINDOWS_NAMES = {HTML_MEDIA_TYPE: "HTML Format", RTF_MEDIA_TYPE: "Rich Text Format"}
+
+_CF_UNICODETEXT = 13
+
+
+def list_formats() -> List[str]:
+    """Media types of the rich formats currently on the clipboard."""
+    try:
+        if sys.platform == "win32":
+            return _windows_list()
+        if sys.platform == "darwin":
+            return _macos_list()
+        return _unix_list()
+    except Exception as e:
+        logger.debug(f"Could not list clipboard formats: {e}")
+        return []
+
+
+def read_format(media_type: str) -> Optional[bytes]:
+    """Data of one rich format, or None if it is not on the clipboard."""
+    try:
+        if sys.platform == "win32":
+            return _windows_read(media_type)
+        if sys.platform == "darwin":
+            return _macos_read(media_type)
+        return _unix_read(media_type)
+    except Exception as e:
+        logger.debug(f"Could not read clipboard format {media_type}: {e}")
+        return None
+
+
+def write_formats(text: str, formats: Dict[str, bytes]) -> bool:
+    """Put ``text`` together with its rich ``formats`` on the clipboard.
+
+    Returns False if they could not be written together, in which case the
+    caller should write the plain text instead.
+    """
+    try:
+        if sys.platform == "win32":
+            return _windows_write(text, formats)
+        if sys.platform == "darwin":
+            return _macos_write(text, formats)
+        return _unix_write()
+    except Exception as e:
+        logger.error(f"Could not copy formatted content to clipboard: {e}")
+        return False
+
+
+def _unix_list() -> List[str]:
+    offered = set(offered_types())
+    return [
+        media_type
+        for media_type, names in _UNIX_TYPES.items()
+        if offered.intersection(names)
+    ]
+
+
+def _unix_read(media_type: str) -> Optional[bytes]:
+    for name in _UNIX_TYPES.get(media_type, ()):
+        data = read_type(name)
+        if data:
+            return data
+    return None
+
+
+def unix_targets(formats: Dict[str, bytes]) -> Dict[str, bytes]:
+    """Data of ``formats`` under each X11 target name it is offered as."""
+    return {
+        name: data
+        for media_type, data in formats.items()
+        for name in _UNIX_TYPES.get(media_type, ())
+    }
+
+
+def _unix_write() -> bool:
+    # wl-copy and xclip serve a single type per process. Offering only a
+    # rich format would leave nothing for applications that paste plain
+    # text, so the text alone is written instead.
+    logger.debug("No clipboard owner here serves text and formats together.")
+    return False
+
+
+def _macos_list() -> List[str]:
+    output = run_command(["osascript", "-e", "clipboard info"])
+    if not output:
+        return []
+    info = output.decode("utf-8", "replace")
+    return [
+        media_type
+        for media_type, class_code in _MACOS_CLASSES.items()
+        if f"«class {class_code}»" in info
+    ]
+
+
+def _macos_read(media_type: str) -> Optional[bytes]:
+    class_code = _MACOS_CLASSES.get(media_type)
+    if class_code is None:
+        return None
+    script = f"get the clipboard as «class {class_code}»"
+    output = run_command(["osascript", "-e", script])
+    return applescript_data(output, class_code) if output else None
+
+
+def _macos_write(text: str, formats: Dict[str, bytes]) -> bool:
+    with tempfile.NamedTemporaryFile(suffix=".txt", delete=False) as file:
+        file.write(text.encode("utf-8"))
+    try:
+        fields = [f'«class utf8»:(read (POSIX file "{file.name}") as «class utf8»)']
+        for media_type, data in formats.items():
+            class_code = _MACOS_CLASSES.get(media_type)
+            if class_code is not None:
+                literal = f"«data {class_code}{data.hex().upper()}»"
+                fields.append(f"«class {class_code}»:{literal}")
+        script = "set the clipboard to {" + ", ".join(fields) + "}"
+        return run_command(["osascript", "-e", script]) is not None
+    finally:
+        os.unlink(file.name)
+
+
+def _windows_format(media_type: str) -> Optional[int]:
+    name = _WINDOWS_NAMES.get(media_type)
+    if name is None:
+        return None
+    _, user32, _, _ = windows_api()
+    return user32.RegisterClipboardFormatW(name)
+
+
+def _windows_list() -> List[str]:
+    _, user32, _, _ = windows_api()
+    return [
+        media_type
+        for media_type in RICH_FORMATS
+        if user32.IsClipboardFormatAvailable(_windows_format(media_type))
+    ]
+
+
+def _windows_read(media_type: str) -> Optional[bytes]:
+    clipboard_format = _windows_format(media_type)
+    if clipboard_format is None:
+        return None
+    data = windows_get(clipboard_format)
+    # Both formats are NUL-terminated inside a possibly larger allocation.
+    return data.split(b"\0", 1)[0] if data else None
+
+
+def _windows_write(text: str, formats: Dict[str, bytes]) -> bool:
+    payloads = [(_CF_UNICODETEXT, text.encode("utf-16-le") + b"\0\0")]
+    for media_type, data in formats.items():
+        clipboard_format = _windows_format(media_type)
+        if clipboard_format is not None:
+            payloads.append((clipboard_format, data + b"\0"))
+    return windows_set(payloads)
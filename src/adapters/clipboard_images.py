@@ -0,0 +1,261 @@
+"""Encoded image access to the system clipboard.
+
+Images are read and written as encoded bytes: PNG where the platform offers
+it, otherwise a BMP file framed around the Windows DIB. Nothing here decodes
+pixels on read, so it is safe to call from the monitor thread.
+"""
+
+from functools import lru_cache
+import io
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+from typing import List, Optional, Tuple
+
+from loguru import logger
+
+IMAGE_COMMAND_TIMEOUT = 2.0
+PNG_MEDIA_TYPE = "image/png"
+
+_XCLIP = ["xclip", "-selection", "clipboard"]
+
+_CF_DIB = 8
+_GMEM_MOVEABLE = 0x0002
+_BI_BITFIELDS = 3
+
+
+def read_image() -> Optional[bytes]:
+    """Encoded image currently on the clipboard, or None."""
+    try:
+        if sys.platform == "win32":
+            return _windows_read()
+        if sys.platform == "darwin":
+            return _macos_read()
+        return _unix_read()
+    except Exception as e:
+        logger.debug(f"Could not read clipboard image: {e}")
+        return None
+
+
+def write_image(data: bytes) -> bool:
+    """Put encoded image ``data`` on the clipboard; return whether it worked."""
+    try:
+        if sys.platform == "win32":
+            return _windows_write(data)
+        if sys.platform == "darwin":
+            return _macos_write(data)
+        return _unix_write(data)
+    except Exception as e:
+        logger.error(f"Could not copy image to clipboard: {e}")
+        return False
+
+
+def run_command(args: list[str]) -> Optional[bytes]:
+    result = subprocess.run(
+        args, capture_output=True, timeout=IMAGE_COMMAND_TIMEOUT, check=False
+    )
+    return result.stdout if result.returncode == 0 else None
+
+
+def run_with_input(args: list[str], data: bytes) -> bool:
+    # Clipboard owners such as xclip keep running in the background, so their
+    # output must not be captured or this would wait for them to exit.
+    result = subprocess.run(
+        args,
+        input=data,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        timeout=IMAGE_COMMAND_TIMEOUT,
+        check=False,
+    )
+    return result.returncode == 0
+
+
+def uses_wayland() -> bool:
+    return bool(os.environ.get("WAYLAND_DISPLAY")) and shutil.which("wl-paste")
+
+
+def offered_types() -> List[str]:
+    """MIME types (Wayland) or targets (X11) the clipboard currently offers."""
+    if uses_wayland():
+        output = run_command(["wl-paste", "--list-types"])
+    elif shutil.which("xclip"):
+        output = run_command([*_XCLIP, "-t", "TARGETS", "-o"])
+    else:
+        return []
+    return output.decode("utf-8", "replace").split() if output else []
+
+
+def read_type(media_type: str) -> Optional[bytes]:
+    if uses_wayland():
+        return run_command(["wl-paste", "--no-newline", "--type", media_type])
+    if shutil.which("xclip"):
+        return run_command([*_XCLIP, "-t", media_type, "-o"])
+    return None
+
+
+def write_type(media_type: str, data: bytes) -> bool:
+    if uses_wayland() and shutil.which("wl-copy"):
+        return run_with_input(["wl-copy", "--type", media_type], data)
+    if shutil.which("xclip"):
+        return run_with_input([*_XCLIP, "-t", media_type, "-i"], data)
+    logger.warning(f"Neither wl-copy nor xclip is available to copy {media_type}.")
+    return False
+
+
+def _unix_read() -> Optional[bytes]:
+    if PNG_MEDIA_TYPE not in offered_types():
+        return None
+    return read_type(PNG_MEDIA_TYPE)
+
+
+def _unix_write(data: bytes) -> bool:
+    return write_type(PNG_MEDIA_TYPE, data)
+
+
+def _macos_read() -> Optional[bytes]:
+    output = run_command(["osascript", "-e", "get the clipboard as «class PNGf»"])
+    if not output:
+        return None
+    return applescript_data(output, "PNGf")
+
+
+def applescript_data(output: bytes, class_code: str) -> Optional[bytes]:
+    """Bytes of an AppleScript ``«data XXXX…»`` literal of class ``class_code``."""
+    text = output.decode("utf-8", "replace").strip()
+    prefix = f"«data {class_code}"
+    if not text.startswith(prefix) or not text.endswith("»"):
+        return None
+    return bytes.fromhex(text[len(prefix) : -1])
+
+
+def _macos_write(data: bytes) -> bool:
+    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as file:
+        file.write(_to_png(data))
+    try:
+        script = (
+            f'set the clipboard to (read (POSIX file "{file.name}") as «class PNGf»)'
+        )
+        return run_command(["osascript", "-e", script]) is not None
+    finally:
+        os.unlink(file.name)
+
+
+@lru_cache(maxsize=1)
+def windows_api():
+    import ctypes
+    from ctypes import wintypes
+
+    user32 = ctypes.WinDLL("user32", use_last_error=True)
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+
+    user32.OpenClipboard.argtypes = [wintypes.HWND]
+    user32.OpenClipboard.restype = wintypes.BOOL
+    user32.CloseClipboard.restype = wintypes.BOOL
+    user32.EmptyClipboard.restype = wintypes.BOOL
+    user32.IsClipboardFormatAvailable.argtypes = [wintypes.UINT]
+    user32.IsClipboardFormatAvailable.restype = wintypes.BOOL
+    user32.RegisterClipboardFormatW.argtypes = [wintypes.LPCWSTR]
+    user32.RegisterClipboardFormatW.restype = wintypes.UINT
+    user32.GetClipboardData.argtypes = [wintypes.UINT]
+    user32.GetClipboardData.restype = wintypes.HANDLE
+    user32.SetClipboardData.argtypes = [wintypes.UINT, wintypes.HANDLE]
+    user32.SetClipboardData.restype = wintypes.HANDLE
+    kernel32.GlobalAlloc.argtypes = [wintypes.UINT, ctypes.c_size_t]
+    kernel32.GlobalAlloc.restype = wintypes.HGLOBAL
+    kernel32.GlobalLock.argtypes = [wintypes.HGLOBAL]
+    kernel32.GlobalLock.restype = wintypes.LPVOID
+    kernel32.GlobalUnlock.argtypes = [wintypes.HGLOBAL]
+    kernel32.GlobalSize.argtypes = [wintypes.HGLOBAL]
+    kernel32.GlobalSize.restype = ctypes.c_size_t
+
+    png_format = user32.RegisterClipboardFormatW("PNG")
+    return ctypes, user32, kernel32, png_format
+
+
+def windows_get(clipboard_format: int) -> Optional[bytes]:
+    """Raw data of one clipboard format, or None if it is not there."""
+    ctypes, user32, kernel32, _ = windows_api()
+    if not user32.IsClipboardFormatAvailable(clipboard_format):
+        return None
+    if not user32.OpenClipboard(None):
+        return None
+    try:
+        handle = user32.GetClipboardData(clipboard_format)
+        if not handle:
+            return None
+        pointer = kernel32.GlobalLock(handle)
+        try:
+            return ctypes.string_at(pointer, kernel32.GlobalSize(handle))
+        finally:
+            kernel32.GlobalUnlock(handle)
+    finally:
+        user32.CloseClipboard()
+
+
+def windows_set(formats: List[Tuple[int, bytes]]) -> bool:
+    """Replace the clipboard with the given ``(format, data)`` pairs."""
+    ctypes, user32, kernel32, _ = windows_api()
+    if not user32.OpenClipboard(None):
+        return False
+    try:
+        user32.EmptyClipboard()
+        for clipboard_format, payload in formats:
+            handle = kernel32.GlobalAlloc(_GMEM_MOVEABLE, len(payload))
+            pointer = kernel32.GlobalLock(handle)
+            ctypes.memmove(pointer, payload, len(payload))
+            kernel32.GlobalUnlock(handle)
+            if not user32.SetClipboardData(clipboard_format, handle):
+                return False
+        return True
+    finally:
+        user32.CloseClipboard()
+
+
+def _windows_read() -> Optional[bytes]:
+    _, _, _, png_format = windows_api()
+    data = windows_get(png_format)
+    if data is not None:
+        return data
+    dib = windows_get(_CF_DIB)
+    return dib_to_bmp(dib) if dib is not None else None
+
+
+def _windows_write(data: bytes) -> bool:
+    _, _, _, png_format = windows_api()
+    if data.startswith(b"BM"):
+        return windows_set([(_CF_DIB, data[14:])])
+    return windows_set([(png_format, data), (_CF_DIB, _to_bmp(data)[14:])])
+
+
+def dib_to_bmp(dib: bytes) -> bytes:
+    """Frame a device-independent bitmap as a BMP file without decoding it."""
+    (header_size,) = struct.unpack_from("<I", dib, 0)
+    bit_count, compression = struct.unpack_from("<HI", dib, 14)
+    (colors_used,) = struct.unpack_from("<I", dib, 32)
+    palette = colors_used or (1 << bit_count if bit_count <= 8 else 0)
+    masks = 12 if compression == _BI_BITFIELDS and header_size == 40 else 0
+    offset = 14 + header_size + masks + palette * 4
+    return b"BM" + struct.pack("<IHHI", 14 + len(dib), 0, 0, offset) + dib
+
+
+def _to_png(data: bytes) -> bytes:
+    if not data.startswith(b"BM"):
+        return data
+    return _convert(data, "PNG")
+
+
+def _to_bmp(data: bytes) -> bytes:
+    return _convert(data, "BMP")
+
+
+def _convert(data: bytes, image_format: str) -> bytes:
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        buffer = io.BytesIO()
+        image.convert("RGB").save(buffer, image_format)
+    return buffer.getvalue()
@@ -0,0 +1,126 @@
+"""Which application put the current value on the clipboard.
+
+Windows records the window that owns the clipboard, from which the process
+and its executable follow. macOS does not, so the frontmost application is
+taken instead: copies are made from the app in front. X11 selection owners
+are usually hidden toolkit windows without a name, so Linux reports nothing.
+"""
+
+import ctypes
+from ctypes.util import find_library
+from functools import lru_cache
+import os
+import sys
+from typing import Callable, Optional
+
+from loguru import logger
+
+_PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+_MAX_PATH_CHARS = 32768
+
+
+def owner_app() -> Optional[str]:
+    """Name of the application that owns the clipboard, or None."""
+    lookup = _lookup()
+    if lookup is None:
+        return None
+    try:
+        return lookup()
+    except OSError as e:
+        logger.debug(f"Could not tell the clipboard owner: {e}")
+        return None
+
+
+@lru_cache(maxsize=1)
+def _lookup() -> Optional[Callable[[], Optional[str]]]:
+    try:
+        if sys.platform == "win32":
+            return _windows_lookup()
+        if sys.platform == "darwin":
+            return _macos_lookup()
+    except (OSError, AttributeError) as e:
+        logger.info(f"Clipboard owner lookup unavailable: {e}")
+    return None
+
+
+def _windows_lookup() -> Callable[[], Optional[str]]:
+    from ctypes import wintypes
+
+    user32 = ctypes.WinDLL("user32", use_last_error=True)
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    user32.GetClipboardOwner.argtypes = []
+    user32.GetClipboardOwner.restype = wintypes.HWND
+    user32.GetWindowThreadProcessId.argtypes = [
+        wintypes.HWND,
+        ctypes.POINTER(wintypes.DWORD),
+    ]
+    user32.GetWindowThreadProcessId.restype = wintypes.DWORD
+    kernel32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+    kernel32.OpenProcess.restype = wintypes.HANDLE
+    kernel32.QueryFullProcessImageNameW.argtypes = [
+        wintypes.HANDLE,
+        wintypes.DWORD,
+        wintypes.LPWSTR,
+        ctypes.POINTER(wintypes.DWORD),
+    ]
+    kernel32.QueryFullProcessImageNameW.restype = wintypes.BOOL
+    kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+
+    def lookup() -> Optional[str]:
+        window = user32.GetClipboardOwner()
+        if not window:
+            return None
+        pid = wintypes.DWORD()
+        user32.GetWindowThreadProcessId(window, ctypes.byref(pid))
+        process = kernel32.OpenProcess(
+            _PROCESS_QUERY_LIMITED_INFORMATION, False, pid.value
+        )
+        if not process:
+            return None
+        try:
+            size = wintypes.DWORD(_MAX_PATH_CHARS)
+            path = ctypes.create_unicode_buffer(size.value)
+            if not kernel32.QueryFullProcessImageNameW(
+                process, 0, path, ctypes.byref(size)
+            ):
+                return None
+            return os.path.splitext(os.path.basename(path.value))[0]
+        finally:
+            kernel32.CloseHandle(process)
+
+    return lookup
+
+
+def _macos_lookup() -> Callable[[], Optional[str]]:
+    objc = ctypes.CDLL(find_library("objc"))
+    ctypes.CDLL(find_library("AppKit"))
+    objc.objc_getClass.argtypes = [ctypes.c_char_p]
+    objc.objc_getClass.restype = ctypes.c_void_p
+    objc.sel_registerName.argtypes = [ctypes.c_char_p]
+    objc.sel_registerName.restype = ctypes.c_void_p
+
+    send_object = ctypes.CFUNCTYPE(ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p)(
+        ("objc_msgSend", objc)
+    )
+    send_string = ctypes.CFUNCTYPE(ctypes.c_char_p, ctypes.c_void_p, ctypes.c_void_p)(
+        ("objc_msgSend", objc)
+    )
+    workspace = send_object(
+        objc.objc_getClass(b"NSWorkspace"),
+        objc.sel_registerName(b"sharedWorkspace"),
+    )
+    if not workspace:
+        raise OSError("No shared workspace")
+    frontmost = objc.sel_registerName(b"frontmostApplication")
+    localized_name = objc.sel_registerName(b"localizedName")
+    utf8_string = objc.sel_registerName(b"UTF8String")
+
+    def lookup() -> Optional[str]:
+        app = send_object(workspace, frontmost)
+        name = send_object(app, localized_name) if app else None
+        if not name:
+            return None
+        value = send_string(name, utf8_string)
+        return value.decode("utf-8", "replace") if value else None
+
+    return lookup
@@ -0,0 +1,177 @@
+"""Clipboard change notifications on Linux.
+
+A watcher blocks until the clipboard owner changes, so the monitor can sleep
+while nothing happens instead of waking up on a timer. X11 sessions use
+XFixes selection events through ctypes, Wayland sessions a ``wl-paste
+--watch`` child process per selection. ``create_watcher`` returns None where
+neither is available and the caller keeps polling.
+
+A watcher can follow the PRIMARY selection next to CLIPBOARD and reports
+which of them changed.
+"""
+
+from abc import ABC, abstractmethod
+import ctypes
+import os
+import select
+import shutil
+import subprocess
+import sys
+from typing import Dict, Iterable, Optional, Set
+
+from loguru import logger
+
+from src.adapters.xlib import XEvent, load_xfixes, load_xlib
+from src.ports.clipboard_port import CLIPBOARD_SELECTION, PRIMARY_SELECTION
+
+_SELECTION_ATOMS = {CLIPBOARD_SELECTION: b"CLIPBOARD", PRIMARY_SELECTION: b"PRIMARY"}
+
+_XFIXES_SELECTION_NOTIFY = 0
+_XFIXES_SET_SELECTION_OWNER_NOTIFY_MASK = 1 << 0
+_XFIXES_SELECTION_WINDOW_DESTROY_NOTIFY_MASK = 1 << 1
+_XFIXES_SELECTION_CLIENT_CLOSE_NOTIFY_MASK = 1 << 2
+_XFIXES_SELECTION_MASK = (
+    _XFIXES_SET_SELECTION_OWNER_NOTIFY_MASK
+    | _XFIXES_SELECTION_WINDOW_DESTROY_NOTIFY_MASK
+    | _XFIXES_SELECTION_CLIENT_CLOSE_NOTIFY_MASK
+)
+
+
+class ClipboardWatcher(ABC):
+    @abstractmethod
+    def wait(self, timeout: float) -> Set[str]:
+        """Wait up to ``timeout`` seconds for any watched selection to change.
+
+        Returns the names of the selections that changed, empty if none did
+        in time. Raises OSError once the watcher can no longer deliver
+        notifications.
+        """
+
+    @abstractmethod
+    def close(self) -> None:
+        """Release the connection or process behind the watcher."""
+
+
+class XFixesWatcher(ClipboardWatcher):
+    """Selection owner change events from the X server, on one connection."""
+
+    def __init__(
+        self,
+        selections: Iterable[str] = (CLIPBOARD_SELECTION,),
+        display: Optional[str] = None,
+    ):
+        x11, xfixes = load_xlib(), load_xfixes()
+        self._x11 = x11
+        self._display = x11.XOpenDisplay(display.encode() if display else None)
+        if not self._display:
+            raise OSError("Cannot open X display")
+        try:
+            event_base = ctypes.c_int()
+            error_base = ctypes.c_int()
+            if not xfixes.XFixesQueryExtension(
+                self._display, ctypes.byref(event_base), ctypes.byref(error_base)
+            ):
+                raise OSError("X server does not support XFixes")
+            self._notify_event = event_base.value + _XFIXES_SELECTION_NOTIFY
+
+            root = x11.XDefaultRootWindow(self._display)
+            self._window = x11.XCreateSimpleWindow(
+                self._display, root, 0, 0, 1, 1, 0, 0, 0
+            )
+            self._names: Dict[int, str] = {}
+            for name in selections:
+                atom = x11.XInternAtom(self._display, _SELECTION_ATOMS[name], False)
+                self._names[atom] = name
+                xfixes.XFixesSelectSelectionInput(
+                    self._display, self._window, atom, _XFIXES_SELECTION_MASK
+                )
+            x11.XFlush(self._display)
+            self._fd = x11.XConnectionNumber(self._display)
+        except Exception:
+            x11.XCloseDisplay(self._display)
+            raise
+        self._event = XEvent()
+
+    def wait(self, timeout: float) -> Set[str]:
+        changed = self._drain()
+        if changed:
+            return changed
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        return self._drain() if ready else set()
+
+    def _drain(self) -> Set[str]:
+        changed = set()
+        while self._x11.XPending(self._display):
+            self._x11.XNextEvent(self._display, ctypes.byref(self._event))
+            if self._event.type == self._notify_event:
+                changed.add(self._names[self._event.xfixesselection.selection])
+        return changed
+
+    def close(self) -> None:
+        if self._display:
+            self._x11.XDestroyWindow(self._display, self._window)
+            self._x11.XCloseDisplay(self._display)
+            self._display = None
+
+
+class WlPasteWatcher(ClipboardWatcher):
+    """Change notifications from ``wl-paste --watch``, one child per selection."""
+
+    def __init__(self, selections: Iterable[str] = (CLIPBOARD_SELECTION,)):
+        self._processes: Dict[int, subprocess.Popen] = {}
+        self._names: Dict[int, str] = {}
+        try:
+            for name in selections:
+                process = _watch_process(name)
+                self._processes[process.stdout.fileno()] = process
+                self._names[process.stdout.fileno()] = name
+        except OSError:
+            self.close()
+            raise
+
+    def wait(self, timeout: float) -> Set[str]:
+        ready, _, _ = select.select(list(self._processes), [], [], timeout)
+        for fd in ready:
+            if not os.read(fd, 4096):
+                code = self._processes[fd].poll()
+                raise OSError(f"wl-paste exited with code {code}")
+        return {self._names[fd] for fd in ready}
+
+    def close(self) -> None:
+        for process in self._processes.values():
+            if process.poll() is None:
+                process.terminate()
+                try:
+                    process.wait(timeout=1)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+            process.stdout.close()
+        self._processes = {}
+
+
+def _watch_process(selection: str) -> subprocess.Popen:
+    # wl-paste pipes the new content to the command; it is discarded and only
+    # the line printed afterwards is read as the notification.
+    primary = ["--primary"] if selection == PRIMARY_SELECTION else []
+    return subprocess.Popen(
+        ["wl-paste", *primary, "--watch", "sh", "-c", "cat > /dev/null; echo"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def create_watcher(
+    selections: Iterable[str] = (CLIPBOARD_SELECTION,),
+) -> Optional[ClipboardWatcher]:
+    """Best change notification source for this session, or None."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        if os.environ.get("WAYLAND_DISPLAY") and shutil.which("wl-paste"):
+            return WlPasteWatcher(selections)
+        if os.environ.get("DISPLAY"):
+            return XFixesWatcher(selections)
+    except OSError as e:
+        logger.info(f"Clipboard change notifications unavailable: {e}")
+    return None
@@ -0,0 +1,228 @@
+from functools import partial
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from loguru import logger
+
+from src.adapters import clipboard_changes, clipboard_formats, clipboard_images
+from src.adapters.clipboard_changes import ChangeSignal
+from src.adapters.clipboard_watchers import ClipboardWatcher, create_watcher
+from src.adapters.poll_scheduler import PollScheduler
+from src.adapters.pyperclip_adapter import PyperclipAdapter
+from src.adapters.x11_clipboard import X11Clipboard, create_x11_clipboard
+from src.ports.clipboard_port import CLIPBOARD_SELECTION, PRIMARY_SELECTION
+
+# How long a single wait on the watcher may block before the stop flag is
+# checked again. Timeouts do not read the clipboard.
+STOP_CHECK_SECONDS = 0.5
+
+# Dragging a selection changes PRIMARY on every step. It is read once it has
+# stayed put this long, or this long after the drag began at the latest.
+PRIMARY_SETTLE_SECONDS = 0.5
+PRIMARY_MAX_DELAY_SECONDS = 2.0
+
+
+class EventClipboardAdapter(PyperclipAdapter):
+    """Clipboard adapter that wakes on change notifications, not on a timer.
+
+    The monitor thread blocks on a ``ClipboardWatcher`` and reads the
+    clipboard only when the owner changed, which keeps it idle between clips
+    and catches changes that follow each other within the polling interval.
+    Without a watcher, or once it fails, it polls like ``PyperclipAdapter``.
+
+    On X11, text is read and written through a persistent ``X11Clipboard``
+    connection rather than a pyperclip subprocess per call; pyperclip stays
+    the fallback where there is none.
+
+    With ``watch_primary``, the same watcher also follows the PRIMARY
+    selection. Its changes are read only once the selection settles, and
+    reported unless the value is already the one on the clipboard.
+    """
+
+    def __init__(
+        self,
+        watcher_factory: Optional[Callable[[], Optional[ClipboardWatcher]]] = None,
+        connection_factory: Callable[[], Optional[X11Clipboard]] = create_x11_clipboard,
+        scheduler: Optional[PollScheduler] = None,
+        watch_primary: bool = False,
+        primary_connection_factory: Callable[[], Optional[X11Clipboard]] = partial(
+            create_x11_clipboard, b"PRIMARY"
+        ),
+    ):
+        super().__init__(scheduler)
+        if watcher_factory is None:
+            selections = [CLIPBOARD_SELECTION]
+            if watch_primary:
+                selections.append(PRIMARY_SELECTION)
+            watcher_factory = partial(create_watcher, selections)
+        self._watcher_factory = watcher_factory
+        self._watcher: Optional[ClipboardWatcher] = None
+        self._notifications = 0
+        self._watch_primary = watch_primary
+        self._primary_connection_factory = primary_connection_factory
+        self._primary_connection: Optional[X11Clipboard] = None
+        self._last_primary = ""
+        # When the pending PRIMARY change is read, and when it began.
+        self._primary_due: Optional[float] = None
+        self._primary_since = 0.0
+        # Used from the monitor thread and the writers' threads; each use
+        # works on its own reference, and only dropping it is serialized.
+        self._connection = connection_factory()
+        self._connection_lock = threading.Lock()
+
+    def get_content(self) -> str:
+        connection = self._connection
+        if connection is not None:
+            try:
+                text = connection.read_text()
+            except OSError as e:
+                self._drop_connection(connection, e)
+            else:
+                # An owner that did not answer leaves the last value in place.
+                return text if text is not None else self._last_value
+        return super().get_content()
+
+    def _write_text(self, content: str) -> None:
+        connection = self._connection
+        if connection is not None:
+            try:
+                if connection.write_text(content):
+                    logger.debug(f"Copied to clipboard: '{content[:30]}...'")
+                    return
+                logger.info("X11 clipboard did not take the value; using pyperclip.")
+            except OSError as e:
+                self._drop_connection(connection, e)
+        super()._write_text(content)
+
+    def _change_signal(self) -> Optional[ChangeSignal]:
+        if self._watcher is not None:
+            # The clipboard is only read after a notification, and each one
+            # is a change.
+            return ChangeSignal(("notification", self._notifications))
+        connection = self._connection
+        if connection is not None:
+            try:
+                stamp = connection.selection_stamp()
+            except OSError as e:
+                self._drop_connection(connection, e)
+            else:
+                if stamp is not None:
+                    return ChangeSignal(stamp)
+        return super()._change_signal()
+
+    def _write_rich(self, content: str, formats: Dict[str, bytes]) -> bool:
+        connection = self._connection
+        if connection is not None:
+            try:
+                # Serves the text targets and the rich ones from one owner.
+                return connection.write_text(
+                    content, clipboard_formats.unix_targets(formats)
+                )
+            except OSError as e:
+                self._drop_connection(connection, e)
+        return super()._write_rich(content, formats)
+
+    def stop_monitoring(self) -> None:
+        super().stop_monitoring()
+        if self._primary_connection is not None:
+            self._primary_connection.close()
+            self._primary_connection = None
+        with self._connection_lock:
+            connection, self._connection = self._connection, None
+        if connection is None:
+            return
+        owned = connection.owned_text
+        connection.close()
+        if owned is not None:
+            # X11 selections die with their owner; hand the last copy over to
+            # pyperclip's helper so it outlives the app.
+            super()._write_text(owned)
+
+    def _drop_connection(self, connection: X11Clipboard, error: OSError) -> None:
+        with self._connection_lock:
+            if self._connection is not connection:
+                # Another thread dropped it already.
+                return
+            self._connection = None
+        logger.warning(f"X11 clipboard connection lost, using pyperclip: {error}")
+        connection.close()
+
+    def _monitor_clipboard(self) -> None:
+        self._watcher = self._watcher_factory()
+        if self._watcher is None:
+            logger.info("No clipboard change notifications; polling instead.")
+        else:
+            logger.info(f"Watching clipboard with {type(self._watcher).__name__}.")
+            if self._watch_primary and self._primary_connection is None:
+                self._primary_connection = self._primary_connection_factory()
+        try:
+            super()._monitor_clipboard()
+        finally:
+            if self._watcher is not None:
+                self._watcher.close()
+                self._watcher = None
+
+    def _wait_for_change(self) -> None:
+        while self._watcher is not None and not self._stop_event.is_set():
+            try:
+                changed = self._watcher.wait(self._watch_timeout())
+            except OSError as e:
+                logger.warning(f"Clipboard watcher failed, polling instead: {e}")
+                self._watcher.close()
+                self._watcher = None
+                break
+            now = time.monotonic()
+            if PRIMARY_SELECTION in changed:
+                if self._primary_due is None:
+                    self._primary_since = now
+                self._primary_due = min(
+                    now + PRIMARY_SETTLE_SECONDS,
+                    self._primary_since + PRIMARY_MAX_DELAY_SECONDS,
+                )
+            if self._primary_due is not None and now >= self._primary_due:
+                self._primary_due = None
+                self._poll_primary()
+            if CLIPBOARD_SELECTION in changed:
+                self._notifications += 1
+                return
+        super()._wait_for_change()
+
+    def _watch_timeout(self) -> float:
+        if self._primary_due is None:
+            return STOP_CHECK_SECONDS
+        return max(0.0, min(STOP_CHECK_SECONDS, self._primary_due - time.monotonic()))
+
+    def _poll_primary(self) -> None:
+        try:
+            value = self._read_primary()
+        except Exception as e:
+            logger.debug(f"Could not read the PRIMARY selection: {e}")
+            return
+        if not value or value == self._last_primary:
+            return
+        self._last_primary = value
+        # Selecting text and copying it puts the same value on both; the
+        # clipboard reports it, with its formats.
+        if value == self._last_value:
+            return
+        value = self._fit_capture(value)
+        if value is None or not self._callback:
+            return
+        logger.debug("New PRIMARY selection detected.")
+        self._callback(value, [], None, PRIMARY_SELECTION)
+
+    def _read_primary(self) -> Optional[str]:
+        connection = self._primary_connection
+        if connection is not None:
+            try:
+                return connection.read_text()
+            except OSError as e:
+                logger.warning(f"X11 PRIMARY connection lost: {e}")
+                self._primary_connection = None
+                connection.close()
+        args = clipboard_changes.text_command(primary=True)
+        if args is None:
+            return None
+        data = clipboard_images.run_command(args)
+        return data.decode("utf-8", "replace") if data else None
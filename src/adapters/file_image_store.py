@@ -0,0 +1,164 @@
+import base64
+from concurrent.futures import ThreadPoolExecutor
+import io
+import os
+from pathlib import Path
+import struct
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from src.domain.clipboard.clipboard_item import hash_bytes
+from src.infrastructure.lru_cache import LRUCache
+from src.infrastructure.system_paths import get_images_dir
+from src.ports.image_store_port import ImageInfo, ImageStorePort
+
+THUMBNAIL_SIZE = 96
+THUMBNAIL_WORKERS = 2
+THUMBNAIL_CACHE_ENTRIES = 512
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+BMP_SIGNATURE = b"BM"
+
+
+def image_header(data: bytes) -> Tuple[str, int, int]:
+    """Media type, width and height read from the header, without decoding."""
+    if data.startswith(PNG_SIGNATURE) and data[12:16] == b"IHDR":
+        width, height = struct.unpack(">II", data[16:24])
+        return "image/png", width, height
+    if data.startswith(BMP_SIGNATURE) and len(data) >= 26:
+        width, height = struct.unpack("<ii", data[18:26])
+        return "image/bmp", width, abs(height)
+    return "application/octet-stream", 0, 0
+
+
+def data_uri(data: bytes, media_type: str) -> str:
+    return f"data:{media_type};base64," + base64.b64encode(data).decode("ascii")
+
+
+def _is_key(name: str) -> bool:
+    try:
+        return len(bytes.fromhex(name)) == 16
+    except ValueError:
+        return False
+
+
+class FileImageStore(ImageStorePort):
+    """Image clips as files named by content hash, with lazy PNG thumbnails.
+
+    Images keep the encoding they were captured in. Thumbnails are decoded
+    and resized only in a small worker pool, written next to the images and
+    kept as data URIs in an LRU cache, so the list never waits for Pillow.
+    Full-resolution data is read only by ``get``.
+    """
+
+    def __init__(self, directory: Optional[Path] = None):
+        self._directory = Path(directory) if directory else get_images_dir()
+        self._thumbnail_directory = self._directory / "thumbnails"
+        self._thumbnail_directory.mkdir(parents=True, exist_ok=True)
+        self._thumbnails: LRUCache[str, str] = LRUCache(
+            max_entries=THUMBNAIL_CACHE_ENTRIES
+        )
+        self._pending: Dict[str, List[Callable[[str], None]]] = {}
+        self._pending_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(
+            max_workers=THUMBNAIL_WORKERS, thread_name_prefix="thumbnails"
+        )
+        logger.debug(f"FileImageStore initialized in {self._directory}")
+
+    def put(self, data: bytes) -> ImageInfo:
+        content_hash = hash_bytes(data)
+        path = self._image_path(content_hash.hex())
+        if not path.exists():
+            self._write_atomic(path, data)
+            logger.debug(f"Stored image {path.name} ({len(data)} bytes)")
+        media_type, width, height = image_header(data)
+        return ImageInfo(content_hash, len(data), media_type, width, height)
+
+    def get(self, content_hash: bytes) -> Optional[bytes]:
+        try:
+            return self._image_path(content_hash.hex()).read_bytes()
+        except OSError as e:
+            logger.warning(f"Could not read image {content_hash.hex()}: {e}")
+            return None
+
+    def thumbnail(
+        self, content_hash: bytes, on_ready: Callable[[str], None]
+    ) -> Optional[str]:
+        key = content_hash.hex()
+        uri = self._thumbnails.get(key)
+        if uri is not None:
+            return uri
+
+        path = self._thumbnail_path(key)
+        if path.exists():
+            uri = data_uri(path.read_bytes(), "image/png")
+            self._thumbnails.put(key, uri)
+            return uri
+
+        with self._pending_lock:
+            waiting = self._pending.get(key)
+            if waiting is not None:
+                waiting.append(on_ready)
+                return None
+            self._pending[key] = [on_ready]
+        self._pool.submit(self._generate_thumbnail, key)
+        return None
+
+    def remove(self, content_hash: bytes) -> None:
+        key = content_hash.hex()
+        self._thumbnails.pop(key)
+        for path in (self._image_path(key), self._thumbnail_path(key)):
+            try:
+                path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Could not delete {path}: {e}")
+
+    def retain(self, content_hashes: Iterable[bytes]) -> None:
+        keep = {content_hash.hex() for content_hash in content_hashes}
+        removed = 0
+        for path in self._directory.iterdir():
+            if path.is_file() and _is_key(path.name) and path.name not in keep:
+                self.remove(bytes.fromhex(path.name))
+                removed += 1
+        if removed:
+            logger.info(f"Removed {removed} unreferenced images.")
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _generate_thumbnail(self, key: str) -> None:
+        uri = None
+        try:
+            from PIL import Image
+
+            with Image.open(self._image_path(key)) as image:
+                image.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+                buffer = io.BytesIO()
+                image.save(buffer, "PNG")
+            png = buffer.getvalue()
+            self._write_atomic(self._thumbnail_path(key), png)
+            uri = data_uri(png, "image/png")
+            self._thumbnails.put(key, uri)
+        except Exception as e:
+            logger.warning(f"Could not create thumbnail for image {key}: {e}")
+        finally:
+            with self._pending_lock:
+                waiting = self._pending.pop(key, [])
+
+        if uri is not None:
+            for on_ready in waiting:
+                on_ready(uri)
+
+    def _image_path(self, key: str) -> Path:
+        return self._directory / key
+
+    def _thumbnail_path(self, key: str) -> Path:
+        return self._thumbnail_directory / f"{key}.png"
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        temporary = path.with_name(path.name + ".tmp")
+        temporary.write_bytes(data)
+        os.replace(temporary, path)
@@ -1,3 +1,5 @@
+from typing import Iterable, Iterator, Tuple
+
 import fuzzysearch
 from loguru import logger
 
@@ -45,23 +47,44 @@ class FuzzySearchAdapter(SearchPort):
         if not query:
             return items.copy()
 
-        results = [item for item in items if self.is_match(item, query)]
+        results = list(self.iter_search(items, query))
         logger.debug(
             f"Fuzzy search query '{query}' returned {len(results)} results from {len(items)} items."
         )
         return results
 
+    def iter_search(
+        self, items: Iterable[ClipboardItem], query: str
+    ) -> Iterator[ClipboardItem]:
+        if not query:
+            yield from items
+            return
+
+        for item in items:
+            if self.is_match(item, query):
+                yield item
+
+    def iter_search_contents(
+        self, entries: Iterable[Tuple[ClipboardItem, str]], query: str
+    ) -> Iterator[ClipboardItem]:
+        for item, content in entries:
+            if self._matches(content, query):
+                yield item
+
     def is_match(self, item: ClipboardItem, query: str) -> bool:
+        return self._matches(item.content, query) if query else True
+
+    def _matches(self, text: str, query: str) -> bool:
         if not query:
             return True
 
-        content = item.content if self.case_sensitive else item.content.lower()
+        content = text if self.case_sensitive else text.lower()
         search_query = query if self.case_sensitive else query.lower()
 
         if len(search_query) <= 2:
             return search_query in content
 
-        fuzzy_content = item.content if self.case_sensitive else content
+        fuzzy_content = text if self.case_sensitive else content
         fuzzy_query = query if self.case_sensitive else search_query
 
         return bool(
@@ -0,0 +1,180 @@
+from dataclasses import dataclass
+import threading
+import time
+from typing import Callable, Optional
+
+from loguru import logger
+
+ACTIVE_INTERVAL_SECONDS = 0.075
+# Fastest rate while each poll has to run a clipboard tool as a process.
+COSTLY_ACTIVE_INTERVAL_SECONDS = 0.3
+IDLE_INTERVAL_SECONDS = 2.0
+BACKOFF_FACTOR = 2.0
+
+# The user counts as away after this long without input; polling then stops
+# until input resumes, which is re-checked every PAUSE_CHECK_SECONDS.
+AWAY_AFTER_SECONDS = 300.0
+PAUSE_CHECK_SECONDS = 5.0
+
+RATE_WINDOW_SECONDS = 60.0
+
+
+@dataclass(frozen=True)
+class PollStats:
+    polls: int
+    changes: int
+    # Changes found only after the interval had backed off: a clip that was
+    # replaced again within that interval would have been missed.
+    late_changes: int
+    # Changes replaced before any poll saw them, where a platform change
+    # counter tells.
+    missed_changes: int
+    max_detection_delay: float
+    polls_per_minute: float
+    interval: float
+    paused: bool
+    paused_seconds: float
+
+
+class PollScheduler:
+    """Decides how long the clipboard monitor sleeps between polls.
+
+    Polls come every ``active_interval`` right after a change or user
+    activity and the interval doubles with every poll that finds nothing,
+    up to ``idle_interval``. Polls marked costly, such as those that start a
+    process, come no faster than ``costly_interval``. While ``is_away``
+    reports the session locked or the user away, polling pauses until it
+    clears or activity is notified.
+    """
+
+    def __init__(
+        self,
+        active_interval: float = ACTIVE_INTERVAL_SECONDS,
+        idle_interval: float = IDLE_INTERVAL_SECONDS,
+        is_away: Optional[Callable[[], bool]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        costly_interval: float = COSTLY_ACTIVE_INTERVAL_SECONDS,
+    ):
+        self._active_interval = active_interval
+        self._cheap_interval = active_interval
+        self._costly_interval = min(
+            max(costly_interval, active_interval), idle_interval
+        )
+        self._idle_interval = idle_interval
+        self._is_away = is_away
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._interval = active_interval
+        self._paused = False
+        self._paused_since = 0.0
+        self._paused_total = 0.0
+        self._next_away_check = 0.0
+        self._polls = 0
+        self._changes = 0
+        self._late_changes = 0
+        self._missed_changes = 0
+        self._max_detection_delay = 0.0
+        self._window_start = clock()
+        self._window_polls = 0
+        self._polls_per_minute = 0.0
+
+    @property
+    def paused(self) -> bool:
+        return self._paused
+
+    def next_delay(self) -> float:
+        """Seconds to wait before the next poll, or before re-checking a pause."""
+        now = self._clock()
+        with self._lock:
+            if self._is_away is not None and now >= self._next_away_check:
+                self._next_away_check = now + PAUSE_CHECK_SECONDS
+                self._set_paused(self._check_away(), now)
+            return PAUSE_CHECK_SECONDS if self._paused else self._interval
+
+    def notify_activity(self) -> None:
+        """The user is active: resume and poll at the fast rate."""
+        now = self._clock()
+        with self._lock:
+            self._set_paused(False, now)
+            self._next_away_check = now + PAUSE_CHECK_SECONDS
+            self._interval = self._active_interval
+
+    def set_costly_polls(self, costly: bool) -> None:
+        """Whether polls are costly now, which can change from one to the next."""
+        with self._lock:
+            self._active_interval = (
+                self._costly_interval if costly else self._cheap_interval
+            )
+            self._interval = max(self._interval, self._active_interval)
+
+    def record_poll(self, changed: bool) -> None:
+        now = self._clock()
+        with self._lock:
+            self._polls += 1
+            self._window_polls += 1
+            elapsed = now - self._window_start
+            if elapsed >= RATE_WINDOW_SECONDS:
+                self._polls_per_minute = self._window_polls * 60.0 / elapsed
+                self._window_start = now
+                self._window_polls = 0
+
+            if changed:
+                self._changes += 1
+                if self._interval > self._active_interval:
+                    self._late_changes += 1
+                self._max_detection_delay = max(
+                    self._max_detection_delay, self._interval
+                )
+                self._interval = self._active_interval
+            else:
+                self._interval = min(
+                    self._interval * BACKOFF_FACTOR, self._idle_interval
+                )
+
+    def record_missed(self, count: int) -> None:
+        if count <= 0:
+            return
+        with self._lock:
+            self._missed_changes += count
+        logger.debug(f"Clipboard changed {count} times between polls unseen.")
+
+    def stats(self) -> PollStats:
+        now = self._clock()
+        with self._lock:
+            paused_seconds = self._paused_total
+            if self._paused:
+                paused_seconds += now - self._paused_since
+            elapsed = now - self._window_start
+            rate = self._polls_per_minute
+            if not rate and elapsed > 0:
+                rate = self._window_polls * 60.0 / elapsed
+            return PollStats(
+                polls=self._polls,
+                changes=self._changes,
+                late_changes=self._late_changes,
+                missed_changes=self._missed_changes,
+                max_detection_delay=self._max_detection_delay,
+                polls_per_minute=rate,
+                interval=self._interval,
+                paused=self._paused,
+                paused_seconds=paused_seconds,
+            )
+
+    def _check_away(self) -> bool:
+        try:
+            return self._is_away()
+        except Exception as e:
+            logger.debug(f"Could not check user activity: {e}")
+            return False
+
+    def _set_paused(self, paused: bool, now: float) -> None:
+        if paused == self._paused:
+            return
+        self._paused = paused
+        if paused:
+            self._paused_since = now
+            logger.debug("User away; clipboard polling paused.")
+        else:
+            self._paused_total += now - self._paused_since
+            self._interval = self._active_interval
+            logger.debug("User back; clipboard polling resumed.")
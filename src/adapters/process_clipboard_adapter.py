@@ -0,0 +1,279 @@
+"""Clipboard monitoring in a separate process.
+
+The monitor shares the main process's GIL with searches, JSON pushes to the
+webview, the tray and keyboard hooks, so slow UI work delays capture. Here a
+child process runs an ordinary clipboard adapter and puts each change into a
+``SharedRing``, then sends an empty message on a pipe to wake the main
+process, whose reader thread takes the record off the ring and calls the
+callbacks. A record that does not fit in the ring is sent as the message
+itself. Either way the pipe carries one message per record, in the order the
+child saw the changes, and the reader follows it.
+
+Writes are sent to the child so that its adapter knows them as its own and
+does not report them back. Reads are answered by an adapter in the main
+process, which never monitors and whose connections are released when
+monitoring stops. A child that dies is started again.
+"""
+
+import multiprocessing
+from multiprocessing.connection import Connection
+import pickle
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from src.adapters.shared_ring import SharedRing
+from src.ports.clipboard_port import ClipboardPort
+
+# A fresh interpreter: forking the main process would copy its threads' locks
+# in whatever state they were, and its memory along with them.
+_CONTEXT = multiprocessing.get_context("spawn")
+
+RESTART_BACKOFF_SECONDS = 1.0
+MAX_RESTART_BACKOFF_SECONDS = 30.0
+JOIN_TIMEOUT_SECONDS = 5.0
+
+_TEXT = b"t"
+_IMAGE = b"i"
+
+
+class ProcessClipboardAdapter(ClipboardPort):
+    def __init__(
+        self,
+        adapter_factory: Callable[[], ClipboardPort],
+        ring_bytes: Optional[int] = None,
+    ):
+        """Monitor through ``adapter_factory()`` in a child process.
+
+        The factory is pickled into the child, so it must be a class or
+        another importable callable, or a ``functools.partial`` of one.
+        """
+        self._adapter_factory = adapter_factory
+        self._local = adapter_factory()
+        self._ring_bytes = ring_bytes
+        self._ring: Optional[SharedRing] = None
+        self._callback: Optional[Callable[..., None]] = None
+        self._image_callback: Optional[Callable[[bytes], None]] = None
+        self._capture_limit: Tuple[Optional[int], bool] = (None, False)
+        self._process: Optional[multiprocessing.process.BaseProcess] = None
+        self._commands: Optional[Connection] = None
+        self._wake: Optional[Connection] = None
+        self._commands_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._supervisor: Optional[threading.Thread] = None
+        self.restarts = 0
+
+    def get_content(self) -> str:
+        return self._local.get_content()
+
+    def set_content(self, content: str) -> None:
+        self._send("set_content", content)
+
+    def get_formats(self) -> List[str]:
+        return self._local.get_formats()
+
+    def get_format(self, media_type: str) -> Optional[bytes]:
+        return self._local.get_format(media_type)
+
+    def set_rich_content(self, content: str, formats: Dict[str, bytes]) -> None:
+        self._send("set_rich_content", content, formats)
+
+    def get_image(self) -> Optional[bytes]:
+        return self._local.get_image()
+
+    def set_image(self, data: bytes) -> None:
+        self._send("set_image", data)
+
+    def set_capture_limit(self, max_bytes: Optional[int], truncate: bool) -> None:
+        self._capture_limit = (max_bytes, truncate)
+        self._send("set_capture_limit", max_bytes, truncate)
+
+    def notify_activity(self) -> None:
+        self._send("notify_activity")
+
+    def start_monitoring(
+        self,
+        callback: Callable[..., None],
+        image_callback: Optional[Callable[[bytes], None]] = None,
+    ) -> None:
+        if self._supervisor and self._supervisor.is_alive():
+            logger.warning("Clipboard monitor process already running.")
+            return
+        self._callback = callback
+        self._image_callback = image_callback
+        self._stop_event.clear()
+        kwargs = {} if self._ring_bytes is None else {"capacity": self._ring_bytes}
+        self._ring = SharedRing(**kwargs)
+        self._supervisor = threading.Thread(
+            target=self._supervise, name="clipboard-monitor-supervisor", daemon=True
+        )
+        self._supervisor.start()
+
+    def stop_monitoring(self) -> None:
+        self._stop_event.set()
+        self._send("stop")
+        if self._supervisor and self._supervisor.is_alive():
+            self._supervisor.join()
+        if self._ring is not None:
+            self._ring.close()
+            self._ring = None
+        # Closes e.g. the local X11 connection and its event thread, handing
+        # anything it still owns over to a helper like a monitor would.
+        self._local.stop_monitoring()
+        logger.info(
+            f"Clipboard monitor process stopped after {self.restarts} restarts."
+        )
+
+    def _supervise(self) -> None:
+        backoff = RESTART_BACKOFF_SECONDS
+        while not self._stop_event.is_set():
+            self._start_process()
+            self._read_until_exit()
+            process = self._process
+            process.join(JOIN_TIMEOUT_SECONDS)
+            if process.is_alive():
+                process.kill()
+                process.join()
+            self._close_pipes()
+            if self._stop_event.is_set():
+                break
+            logger.warning(
+                f"Clipboard monitor process exited with code {process.exitcode}; "
+                f"restarting in {backoff:g}s."
+            )
+            if self._stop_event.wait(backoff):
+                break
+            self.restarts += 1
+            backoff = min(backoff * 2, MAX_RESTART_BACKOFF_SECONDS)
+
+    def _start_process(self) -> None:
+        commands, child_commands = _CONTEXT.Pipe()
+        wake, child_wake = _CONTEXT.Pipe(duplex=False)
+        self._process = _CONTEXT.Process(
+            target=run_monitor,
+            args=(
+                self._adapter_factory,
+                self._ring.name,
+                child_wake,
+                child_commands,
+                self._image_callback is not None,
+                self._capture_limit,
+            ),
+            name="clip-flow-monitor",
+            daemon=True,
+        )
+        self._process.start()
+        child_commands.close()
+        child_wake.close()
+        with self._commands_lock:
+            self._commands = commands
+            if self._stop_event.is_set():
+                # Stopped while this one was starting; the stop went nowhere.
+                commands.send(("stop",))
+        self._wake = wake
+        logger.info(f"Clipboard monitor process {self._process.pid} started.")
+
+    def _read_until_exit(self) -> None:
+        """Hand records to the callbacks until the child closes its pipe."""
+        while True:
+            try:
+                message = self._wake.recv_bytes()
+            except (EOFError, OSError):
+                # Records put by a child that died before waking us.
+                self._drain()
+                return
+            if message:
+                self._deliver(message)
+                continue
+            # One ring record per wake, and no more: a later one may be behind
+            # a record that is still on its way over the pipe.
+            record = self._ring.get()
+            if record is not None:
+                self._deliver(record)
+
+    def _drain(self) -> None:
+        while True:
+            record = self._ring.get()
+            if record is None:
+                return
+            self._deliver(record)
+
+    def _deliver(self, record: bytes) -> None:
+        kind, payload = record[:1], record[1:]
+        try:
+            if kind == _TEXT and self._callback:
+                self._callback(*pickle.loads(payload))
+            elif kind == _IMAGE and self._image_callback:
+                self._image_callback(payload)
+        except Exception as e:
+            logger.exception(f"Error handling a clipboard change: {e}")
+
+    def _send(self, *command: Any) -> None:
+        with self._commands_lock:
+            if self._commands is None:
+                if command[0] not in ("stop", "set_capture_limit", "notify_activity"):
+                    # No monitor to tag the write: it may be reported back.
+                    getattr(self._local, command[0])(*command[1:])
+                return
+            try:
+                self._commands.send(command)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not reach the clipboard monitor process: {e}")
+
+    def _close_pipes(self) -> None:
+        with self._commands_lock:
+            commands, self._commands = self._commands, None
+        if commands is not None:
+            commands.close()
+        if self._wake is not None:
+            self._wake.close()
+            self._wake = None
+
+
+def run_monitor(
+    adapter_factory: Callable[[], ClipboardPort],
+    ring_name: str,
+    wake: Connection,
+    commands: Connection,
+    capture_images: bool,
+    capture_limit: Tuple[Optional[int], bool],
+) -> None:
+    """Entry point of the monitor process."""
+    ring = SharedRing(ring_name)
+    wake_lock = threading.Lock()
+
+    def hand_over(record: bytes) -> None:
+        with wake_lock:
+            if ring.put(record):
+                wake.send_bytes(b"")
+            else:
+                # Full, or too large for the ring: the pipe carries it.
+                wake.send_bytes(record)
+
+    def on_text(*change: Any) -> None:
+        hand_over(_TEXT + pickle.dumps(change))
+
+    def on_image(data: bytes) -> None:
+        hand_over(_IMAGE + data)
+
+    adapter = adapter_factory()
+    adapter.set_capture_limit(*capture_limit)
+    adapter.start_monitoring(on_text, on_image if capture_images else None)
+    try:
+        while True:
+            try:
+                name, *args = commands.recv()
+            except (EOFError, OSError):
+                # The main process is gone.
+                break
+            if name == "stop":
+                break
+            try:
+                getattr(adapter, name)(*args)
+            except Exception as e:
+                logger.error(f"Clipboard monitor command {name} failed: {e}")
+    finally:
+        adapter.stop_monitoring()
+        wake.close()
+        ring.close()
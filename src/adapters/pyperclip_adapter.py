@@ -1,19 +1,70 @@
+from collections import OrderedDict
 import threading
-import time
-from typing import Callable
+from typing import Callable, Dict, List, Optional, Tuple
 
 from loguru import logger
 import pyperclip
 
-from src.ports.clipboard_port import ClipboardPort
+from src.adapters import (
+    clipboard_changes,
+    clipboard_formats,
+    clipboard_images,
+    clipboard_owner,
+    user_activity,
+)
+from src.adapters.clipboard_changes import ChangeSignal
+from src.adapters.poll_scheduler import (
+    AWAY_AFTER_SECONDS,
+    PollScheduler,
+    PollStats,
+)
+from src.domain.clipboard.clipboard_item import (
+    encode_content,
+    hash_bytes,
+    hash_content,
+)
+from src.ports.clipboard_port import CLIPBOARD_SELECTION, ClipboardPort
+
+# Upper bound on our own writes awaiting their echo. A write whose echo is
+# never seen, e.g. because the write failed or another value overtook it, is
+# forgotten at the first change seen after it finished.
+SELF_WRITE_WINDOW = 16
+
+ERROR_BACKOFF_SECONDS = 5.0
+
+# UTF-8 needs at most this many bytes per character, so text this many times
+# shorter than the capture limit is within it without being encoded.
+_MAX_UTF8_BYTES_PER_CHAR = 4
+
+# Text, the media types of its rich formats, the application it came from and
+# the selection it was seen on.
+TextCallback = Callable[[str, List[str], Optional[str], str], None]
 
 
 class PyperclipAdapter(ClipboardPort):
-    def __init__(self):
-        self._callback: Callable[[str], None] | None = None
+    def __init__(self, scheduler: Optional[PollScheduler] = None):
+        self._callback: TextCallback | None = None
+        self._image_callback: Callable[[bytes], None] | None = None
+        self._last_image_hash: bytes | None = None
+        # Signal under which the clipboard was last read, and the external
+        # changes and own writes seen since, to count the changes missed.
+        self._last_signal: ChangeSignal | None = None
+        self._seen_changes = 0
+        self._own_writes = 0
+        self._capture_limit: Tuple[int | None, bool] = (None, False)
         self._stop_event = threading.Event()
+        # Set by activity and by stop, to cut a poll wait short.
+        self._wake_event = threading.Event()
+        self._scheduler = scheduler or PollScheduler(
+            is_away=lambda: user_activity.is_away(AWAY_AFTER_SECONDS)
+        )
         self._monitor_thread: threading.Thread | None = None
         self._last_value = ""
+        self._self_writes: OrderedDict[bytes, int] = OrderedDict()
+        self._write_sequence = 0
+        # Highest tagged write known to have reached the clipboard.
+        self._written_sequence = 0
+        self._self_writes_lock = threading.Lock()
         logger.debug("PyperclipAdapter initialized.")
 
     def get_content(self) -> str:
@@ -23,15 +74,71 @@ class PyperclipAdapter(ClipboardPort):
             logger.warning(f"Could not read clipboard content: {e}")
             return ""
 
+    @property
+    def poll_stats(self) -> PollStats:
+        return self._scheduler.stats()
+
+    def notify_activity(self) -> None:
+        self._scheduler.notify_activity()
+        self._wake_event.set()
+
+    def set_capture_limit(self, max_bytes: int | None, truncate: bool) -> None:
+        self._capture_limit = (max_bytes, truncate)
+
     def set_content(self, content: str) -> None:
+        """Write ``content`` and tag it so the monitor does not report it back."""
+        sequence = self._tag_self_write(content)
+        self._write_text(content)
+        self._finish_self_write(sequence)
+        self.notify_activity()
+
+    def _write_text(self, content: str) -> None:
         try:
             pyperclip.copy(content)
             logger.debug(f"Copied to clipboard: '{content[:30]}...'")
         except pyperclip.PyperclipException as e:
             logger.error(f"Could not copy to clipboard: {e}")
 
-    def start_monitoring(self, callback: Callable[[str], None]) -> None:
+    def get_formats(self) -> List[str]:
+        return clipboard_formats.list_formats()
+
+    def get_format(self, media_type: str) -> Optional[bytes]:
+        return clipboard_formats.read_format(media_type)
+
+    def set_rich_content(self, content: str, formats: Dict[str, bytes]) -> None:
+        if not formats:
+            self.set_content(content)
+            return
+        sequence = self._tag_self_write(content)
+        if self._write_rich(content, formats):
+            logger.debug(f"Copied formatted content: {', '.join(formats)}")
+        else:
+            self._write_text(content)
+        self._finish_self_write(sequence)
+        self.notify_activity()
+
+    def _write_rich(self, content: str, formats: Dict[str, bytes]) -> bool:
+        return clipboard_formats.write_formats(content, formats)
+
+    def get_image(self) -> Optional[bytes]:
+        return clipboard_images.read_image()
+
+    def set_image(self, data: bytes) -> None:
+        image_hash = hash_bytes(data)
+        sequence = None
+        if image_hash != self._last_image_hash:
+            sequence = self._tag_self_write_hash(image_hash)
+        if clipboard_images.write_image(data):
+            logger.debug(f"Copied image to clipboard ({len(data)} bytes)")
+        self._finish_self_write(sequence)
+
+    def start_monitoring(
+        self,
+        callback: TextCallback,
+        image_callback: Optional[Callable[[bytes], None]] = None,
+    ) -> None:
         self._callback = callback
+        self._image_callback = image_callback
         self._stop_event.clear()
 
         if self._monitor_thread and self._monitor_thread.is_alive():
@@ -47,37 +154,209 @@ class PyperclipAdapter(ClipboardPort):
     def stop_monitoring(self) -> None:
         logger.info("Stopping clipboard monitoring.")
         self._stop_event.set()
+        self._wake_event.set()
         if self._monitor_thread and self._monitor_thread.is_alive():
             self._monitor_thread.join()
             logger.debug("Monitoring thread joined successfully.")
+        logger.debug(f"Clipboard polling: {self.poll_stats}")
 
     def _monitor_clipboard(self) -> None:
         logger.info("Clipboard monitoring thread started.")
 
         try:
+            self._last_signal = self._change_signal()
             self._last_value = self.get_content()
-            if self._last_value and self._callback:
-                logger.debug(
-                    f"Initial clipboard content found: '{self._last_value[:30]}...'"
+            value = self._fit_capture(self._last_value)
+            if value and self._callback:
+                logger.debug(f"Initial clipboard content found: '{value[:30]}...'")
+                self._callback(
+                    value,
+                    self.get_formats(),
+                    clipboard_owner.owner_app(),
+                    CLIPBOARD_SELECTION,
                 )
-                self._callback(self._last_value)
         except Exception as e:
             logger.warning(f"Could not read initial clipboard content: {e}")
             self._last_value = ""
 
         while not self._stop_event.is_set():
+            self._wait_for_change()
+            if self._stop_event.is_set():
+                break
             try:
-                current_value = self.get_content()
-                if current_value != self._last_value:
-                    logger.debug("New clipboard value detected.")
-                    self._last_value = current_value
-                    if self._callback:
-                        self._callback(current_value)
+                self._scheduler.record_poll(self._poll_once())
             except Exception as e:
                 logger.warning(f"Error monitoring clipboard: {e}")
-                time.sleep(5)
-                continue
-
-            time.sleep(1)
+                self._stop_event.wait(ERROR_BACKOFF_SECONDS)
 
         logger.info("Clipboard monitoring thread stopped.")
+
+    def _wait_for_change(self) -> None:
+        """Block until the clipboard may have changed or monitoring stops.
+
+        The scheduler sets the pace; while it is paused only the pause itself
+        is re-checked, without touching the clipboard.
+        """
+        while not self._stop_event.is_set():
+            if self._wake_event.wait(self._scheduler.next_delay()):
+                self._wake_event.clear()
+            if not self._scheduler.paused:
+                return
+
+    def _poll_once(self) -> bool:
+        """Check the clipboard once; return whether its content changed.
+
+        Nothing is read while the change signal stays the same, and text
+        known to be over the capture limit is not read at all unless it is
+        to be truncated.
+        """
+        # Taken before the read: those writes are reflected in what it returns.
+        written = self._written_sequence
+        signal = self._change_signal()
+        # A process per poll, e.g. xclip, is too costly for the fastest rate.
+        self._scheduler.set_costly_polls(signal is not None and signal.spawned)
+        previous = self._last_signal
+        if signal is not None and previous is not None:
+            if signal.token == previous.token:
+                return False
+        self._last_signal = signal
+        seen = self._seen_changes
+        with self._self_writes_lock:
+            own_writes, self._own_writes = self._own_writes, 0
+
+        changed = self._read_changes(signal, written)
+
+        if signal and previous and signal.counts_changes and previous.counts_changes:
+            # Each change moves the counter once; those neither seen nor our
+            # own were replaced before a poll got to them.
+            external = signal.token - previous.token - own_writes
+            self._scheduler.record_missed(external - (self._seen_changes - seen))
+        return changed
+
+    def _read_changes(self, signal: ChangeSignal | None, written: int) -> bool:
+        size = signal.size if signal is not None else None
+        if size is None:
+            size = clipboard_changes.text_size()
+        max_bytes, truncate = self._capture_limit
+        if max_bytes is not None and size is not None and size > max_bytes:
+            if not truncate:
+                logger.info(f"Skipping a clip of at least {size} bytes unread.")
+                self._seen_changes += 1
+                self._last_value = ""
+                self._last_image_hash = None
+                return True
+
+        current_value = self.get_content()
+        changed = current_value != self._last_value
+        if changed:
+            self._last_value = current_value
+            self._report_text(current_value, written)
+        # An image on the clipboard leaves no text, so only look for one then.
+        if current_value:
+            self._last_image_hash = None
+        elif self._image_callback:
+            changed = self._poll_image(written) or changed
+        return changed
+
+    def _report_text(self, value: str, written: int) -> None:
+        sequence = self._consume_self_write(hash_content(value), written)
+        if sequence is not None:
+            logger.debug(f"Skipping clipboard value from our own write #{sequence}.")
+            return
+        self._seen_changes += 1
+        value = self._fit_capture(value)
+        if value is None:
+            return
+        logger.debug("New clipboard value detected.")
+        if self._callback:
+            # Only the names of the formats: their data is fetched by the
+            # consumer, once, if it wants it.
+            self._callback(
+                value,
+                self.get_formats() if value else [],
+                clipboard_owner.owner_app(),
+                CLIPBOARD_SELECTION,
+            )
+
+    def _fit_capture(self, value: str) -> str | None:
+        """``value`` within the capture limit: as is, truncated, or None."""
+        max_bytes, truncate = self._capture_limit
+        if max_bytes is None or len(value) * _MAX_UTF8_BYTES_PER_CHAR <= max_bytes:
+            return value
+        encoded = encode_content(value)
+        if len(encoded) <= max_bytes:
+            return value
+        if not truncate:
+            logger.info(f"Skipping a clip of {len(encoded)} bytes.")
+            return None
+        logger.info(f"Truncating a clip of {len(encoded)} bytes to {max_bytes}.")
+        return encoded[:max_bytes].decode("utf-8", "ignore")
+
+    def _change_signal(self) -> ChangeSignal | None:
+        """What changed on the clipboard, as far as is known without reading it.
+
+        None when there is no cheaper way to tell than reading the clipboard.
+        """
+        return clipboard_changes.current_signal()
+
+    def _poll_image(self, written: int) -> bool:
+        data = self.get_image()
+        image_hash = hash_bytes(data) if data else None
+        if image_hash == self._last_image_hash:
+            return False
+        self._last_image_hash = image_hash
+        if image_hash is None:
+            return True
+        sequence = self._consume_self_write(image_hash, written)
+        if sequence is not None:
+            logger.debug(f"Skipping clipboard image from our own write #{sequence}.")
+            return True
+        self._seen_changes += 1
+        max_bytes, _ = self._capture_limit
+        if max_bytes is not None and len(data) > max_bytes:
+            logger.info(f"Skipping an image of {len(data)} bytes.")
+            return True
+        logger.debug(f"New clipboard image detected ({len(data)} bytes).")
+        self._image_callback(data)
+        return True
+
+    def _tag_self_write(self, content: str) -> int | None:
+        if content == self._last_value:
+            # Already on the clipboard: there will be no echo to swallow.
+            return None
+        return self._tag_self_write_hash(hash_content(content))
+
+    def _tag_self_write_hash(self, content_hash: bytes) -> int:
+        with self._self_writes_lock:
+            self._write_sequence += 1
+            self._self_writes.pop(content_hash, None)
+            self._self_writes[content_hash] = self._write_sequence
+            while len(self._self_writes) > SELF_WRITE_WINDOW:
+                self._self_writes.popitem(last=False)
+            return self._write_sequence
+
+    def _finish_self_write(self, sequence: int | None) -> None:
+        with self._self_writes_lock:
+            self._own_writes += 1
+            if sequence is not None:
+                self._written_sequence = max(self._written_sequence, sequence)
+
+    def _consume_self_write(self, content_hash: bytes, written: int) -> int | None:
+        """Sequence number of our write that produced this content, if any.
+
+        Any change seen also settles the writes that finished before the
+        clipboard was read, and those before the one matched: the clipboard
+        has moved past them, so their echo will not come and a later equal
+        value is a genuine copy.
+        """
+        if not self._self_writes:
+            return None
+        with self._self_writes_lock:
+            sequence = self._self_writes.pop(content_hash, None)
+            settled = max(written, sequence or 0)
+            while self._self_writes:
+                pending, oldest = next(iter(self._self_writes.items()))
+                if oldest > settled:
+                    break
+                del self._self_writes[pending]
+            return sequence
@@ -0,0 +1,85 @@
+"""Byte ring in shared memory for handing records from one process to another.
+
+One process puts records, one other process gets them. The header holds the
+total number of bytes ever written and ever read; each side only advances its
+own count, after the bytes it covers, so no lock is needed. Records are
+framed by their length and wrap around the end of the buffer.
+"""
+
+from multiprocessing import shared_memory
+import struct
+from typing import Optional
+
+RING_BYTES = 4 * 1024 * 1024
+
+_POSITIONS = struct.Struct("<QQ")
+_LENGTH = struct.Struct("<I")
+
+
+class SharedRing:
+    def __init__(self, name: Optional[str] = None, capacity: int = RING_BYTES):
+        """Create a ring of ``capacity`` bytes, or attach to the one ``name``d."""
+        if name is None:
+            self._memory = shared_memory.SharedMemory(
+                create=True, size=_POSITIONS.size + capacity
+            )
+            _POSITIONS.pack_into(self._memory.buf, 0, 0, 0)
+        else:
+            self._memory = shared_memory.SharedMemory(name=name)
+        self._owner = name is None
+        self._capacity = self._memory.size - _POSITIONS.size
+        self._data = self._memory.buf[_POSITIONS.size :]
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def fits(self, size: int) -> bool:
+        """Whether a record of ``size`` bytes could ever be put."""
+        return _LENGTH.size + size <= self._capacity
+
+    def put(self, record: bytes) -> bool:
+        """Append ``record``; False, leaving the ring alone, if it has no room."""
+        written, read = _POSITIONS.unpack_from(self._memory.buf, 0)
+        size = _LENGTH.size + len(record)
+        if written - read + size > self._capacity:
+            return False
+        self._copy_in(written, _LENGTH.pack(len(record)))
+        self._copy_in(written + _LENGTH.size, record)
+        # Published last: the reader never sees a count ahead of its bytes.
+        struct.pack_into("<Q", self._memory.buf, 0, written + size)
+        return True
+
+    def get(self) -> Optional[bytes]:
+        """Take the oldest record, or None if there is none."""
+        written, read = _POSITIONS.unpack_from(self._memory.buf, 0)
+        if read == written:
+            return None
+        (length,) = _LENGTH.unpack(self._copy_out(read, _LENGTH.size))
+        record = self._copy_out(read + _LENGTH.size, length)
+        struct.pack_into("<Q", self._memory.buf, 8, read + _LENGTH.size + length)
+        return record
+
+    def close(self) -> None:
+        """Detach; the ring that created the memory also frees it."""
+        self._data.release()
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
+
+    def _copy_in(self, position: int, data: bytes) -> None:
+        start = position % self._capacity
+        head = min(len(data), self._capacity - start)
+        self._data[start : start + head] = data[:head]
+        self._data[: len(data) - head] = data[head:]
+
+    def _copy_out(self, position: int, size: int) -> bytes:
+        start = position % self._capacity
+        head = min(size, self._capacity - start)
+        return bytes(self._data[start : start + head]) + bytes(
+            self._data[: size - head]
+        )
@@ -1,16 +1,70 @@
 from datetime import datetime
 import os
+from pathlib import Path
 import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+import zlib
 
 from loguru import logger
 
-from src.domain.clipboard import ClipboardHistory, ClipboardItem
+from src.domain.clipboard import (
+    ChangeKind,
+    ClipboardHistory,
+    ClipboardItem,
+    HistoryChange,
+)
+from src.domain.clipboard.clipboard_history import DEFAULT_MAX_ITEMS
+from src.domain.clipboard.clipboard_item import (
+    DEFAULT_SOURCE,
+    PREVIEW_LENGTH,
+    encode_content,
+    hash_content,
+    to_timestamp,
+)
+from src.domain.clipboard.near_duplicate_index import content_signature
+from src.infrastructure.lru_cache import LRUCache
 from src.infrastructure.system_paths import (
     ensure_directories_exist,
     get_database_file_path,
 )
 from src.ports.storage_port import StoragePort
 
+CONTENT_CACHE_ENTRIES = 256
+CONTENT_CACHE_CHARS = 16 * 1024 * 1024
+# Ids per query of a batch load; well under SQLite's host parameter limit.
+CONTENT_BATCH_IDS = 500
+FORMAT_COMPRESSION_LEVEL = 6
+
+_METADATA_COLUMNS = {
+    "content_hash": "BLOB",
+    "size": "INTEGER",
+    "preview": "TEXT",
+    "use_count": "INTEGER NOT NULL DEFAULT 0",
+    "last_used_at": "TEXT",
+    "frecency": "REAL",
+    "signature": "INTEGER",
+    "variant_count": "INTEGER NOT NULL DEFAULT 1",
+    "pinned": "INTEGER NOT NULL DEFAULT 0",
+    "media_type": "TEXT",
+    "source": f"TEXT NOT NULL DEFAULT '{DEFAULT_SOURCE}'",
+}
+
+_SIGNED_OFFSET = 1 << 64
+
+# Kept in PRAGMA user_version. Bumped whenever ``content_signature`` changes,
+# so that stored signatures are recomputed instead of compared across versions.
+_SIGNATURE_VERSION = 2
+
+
+def _to_signed(signature: int) -> int:
+    """SQLite integers are signed 64-bit; store unsigned signatures wrapped."""
+    return signature - _SIGNED_OFFSET if signature >= 1 << 63 else signature
+
+
+def _to_unsigned(signature: int) -> int:
+    return signature + _SIGNED_OFFSET if signature < 0 else signature
+
 
 class SqliteStorageAdapter(StoragePort):
     def __init__(self, db_path: str = None):
@@ -19,6 +73,13 @@ class SqliteStorageAdapter(StoragePort):
             self.db_path = str(get_database_file_path())
         else:
             self.db_path = db_path
+        self._content_cache: LRUCache[int, str] = LRUCache(
+            max_entries=CONTENT_CACHE_ENTRIES, max_weight=CONTENT_CACHE_CHARS
+        )
+        # Bodies are read on demand from any thread; one read-only connection
+        # spares a connect per read and is used by one thread at a time.
+        self._reader: Optional[sqlite3.Connection] = None
+        self._reader_lock = threading.Lock()
         self._init_database()
         logger.info(f"Database configured successfully. Database file: {self.db_path}")
 
@@ -33,31 +94,211 @@ class SqliteStorageAdapter(StoragePort):
                         created_at TEXT NOT NULL
                     )
                 """)
+                self._migrate_metadata_columns(cursor)
+                self._invalidate_stale_signatures(cursor)
+                # Rich formats of text clips, zlib-compressed. They are only
+                # read when an item is copied back with its formatting.
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS clipboard_formats (
+                        item_id INTEGER NOT NULL,
+                        media_type TEXT NOT NULL,
+                        data BLOB NOT NULL,
+                        PRIMARY KEY (item_id, media_type)
+                    )
+                """)
                 conn.commit()
                 logger.trace("Database initialized successfully")
         except sqlite3.Error as e:
             logger.error(f"Error initializing database: {e}")
             raise
 
+    def _migrate_metadata_columns(self, cursor: sqlite3.Cursor) -> None:
+        cursor.execute("PRAGMA table_info(clipboard_history)")
+        existing = {row[1] for row in cursor.fetchall()}
+        for column, column_type in _METADATA_COLUMNS.items():
+            if column not in existing:
+                cursor.execute(
+                    f"ALTER TABLE clipboard_history ADD COLUMN {column} {column_type}"
+                )
+                logger.debug(f"Added column '{column}' to clipboard_history")
+
+    def _invalidate_stale_signatures(self, cursor: sqlite3.Cursor) -> None:
+        (version,) = cursor.execute("PRAGMA user_version").fetchone()
+        if version >= _SIGNATURE_VERSION:
+            return
+        # Image rows have no signature to recompute.
+        cursor.execute(
+            "UPDATE clipboard_history SET signature = NULL WHERE media_type IS NULL"
+        )
+        cursor.execute(f"PRAGMA user_version = {_SIGNATURE_VERSION}")
+        logger.debug("Near-duplicate signatures will be recomputed.")
+
     def save_history(self, history: ClipboardHistory) -> None:
+        """Sync the table with ``history`` without reading lazy bodies back.
+
+        Rows of removed items are deleted, resident items are written in full
+        and then released to the content cache, lazy items only get their
+        metadata refreshed since their body is already stored.
+        """
         try:
             with sqlite3.connect(self.db_path) as conn:
                 cursor = conn.cursor()
 
-                cursor.execute("DELETE FROM clipboard_history")
+                cursor.execute("SELECT id FROM clipboard_history")
+                stored_ids = {row[0] for row in cursor.fetchall()}
+                items = history.items
+                removed_ids = stored_ids - {item.id for item in items}
+                cursor.executemany(
+                    "DELETE FROM clipboard_history WHERE id = ?",
+                    [(item_id,) for item_id in removed_ids],
+                )
 
-                for item in history.items:
-                    cursor.execute(
-                        "INSERT INTO clipboard_history (content, created_at) VALUES (?, ?)",
-                        (item.content, item.created_at.isoformat()),
-                    )
+                released = [self._write_item(cursor, item) for item in items]
+                cursor.execute(
+                    "DELETE FROM clipboard_formats "
+                    "WHERE item_id NOT IN (SELECT id FROM clipboard_history)"
+                )
 
                 conn.commit()
-                logger.trace(f"Saved {len(history.items)} items to database")
+
+            self._after_commit(removed_ids, released)
+            logger.trace(f"Saved {len(items)} items to database")
         except sqlite3.Error as e:
             # TODO: Add tests
             logger.error(f"Error saving history to database: {e}")
 
+    def apply_changes(self, changes: List[HistoryChange]) -> bool:
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                removed_ids = set()
+                released = []
+
+                for change in changes:
+                    if change.kind is ChangeKind.CLEARED:
+                        cursor.execute("DELETE FROM clipboard_history")
+                        cursor.execute("DELETE FROM clipboard_formats")
+                        self._content_cache.clear()
+                    elif change.kind is ChangeKind.REMOVED:
+                        cursor.execute(
+                            "DELETE FROM clipboard_history WHERE id = ?",
+                            (change.item_id,),
+                        )
+                        self._delete_formats(cursor, change.item_id)
+                        removed_ids.add(change.item_id)
+                    else:
+                        if change.kind is ChangeKind.MOVED and not change.item.formats:
+                            # Collapsed into different text: old formats are stale.
+                            self._delete_formats(cursor, change.item_id)
+                        released.append(self._write_item(cursor, change.item))
+
+                conn.commit()
+
+            self._after_commit(removed_ids, released)
+            logger.trace(f"Applied {len(changes)} history changes to database")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error applying history changes to database: {e}")
+            return False
+
+    def _write_item(
+        self, cursor: sqlite3.Cursor, item: ClipboardItem
+    ) -> Optional[Tuple[ClipboardItem, str]]:
+        """Write ``item``; return it with its body if that should be released."""
+        if not item.is_loaded:
+            cursor.execute(
+                "UPDATE clipboard_history SET created_at = ?, "
+                "use_count = ?, last_used_at = ?, frecency = ?, pinned = ? "
+                "WHERE id = ?",
+                (item.created_at.isoformat(), *self._mutable_values(item), item.id),
+            )
+            return None
+
+        content = item.content
+        cursor.execute(
+            "INSERT OR REPLACE INTO clipboard_history "
+            "(id, content, created_at, content_hash, size, preview, "
+            "variant_count, use_count, last_used_at, "
+            "frecency, pinned, media_type, source) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                item.id,
+                content,
+                item.created_at.isoformat(),
+                item.content_hash,
+                item.size,
+                content[:PREVIEW_LENGTH],
+                item.variant_count,
+                *self._mutable_values(item),
+                item.media_type,
+                item.source,
+            ),
+        )
+        return item, content
+
+    @staticmethod
+    def _delete_formats(cursor: sqlite3.Cursor, item_id: int) -> None:
+        cursor.execute("DELETE FROM clipboard_formats WHERE item_id = ?", (item_id,))
+
+    def save_formats(self, item_id: int, formats: Dict[str, bytes]) -> None:
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                self._delete_formats(cursor, item_id)
+                cursor.executemany(
+                    "INSERT INTO clipboard_formats (item_id, media_type, data) "
+                    "VALUES (?, ?, ?)",
+                    [
+                        (
+                            item_id,
+                            media_type,
+                            zlib.compress(data, FORMAT_COMPRESSION_LEVEL),
+                        )
+                        for media_type, data in formats.items()
+                    ],
+                )
+                conn.commit()
+            logger.trace(f"Saved {len(formats)} formats of item {item_id}")
+        except sqlite3.Error as e:
+            logger.error(f"Error saving formats of item {item_id}: {e}")
+
+    def load_formats(self, item_id: int) -> Dict[str, bytes]:
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                rows = conn.execute(
+                    "SELECT media_type, data FROM clipboard_formats "
+                    "WHERE item_id = ? ORDER BY rowid",
+                    (item_id,),
+                ).fetchall()
+            return {media_type: zlib.decompress(data) for media_type, data in rows}
+        except (sqlite3.Error, zlib.error) as e:
+            logger.error(f"Error loading formats of item {item_id}: {e}")
+            return {}
+
+    def _after_commit(
+        self,
+        removed_ids: Iterable[int],
+        released: Iterable[Optional[Tuple[ClipboardItem, str]]],
+    ) -> None:
+        for entry in released:
+            if entry is None:
+                continue
+            item, content = entry
+            self._content_cache.put(item.id, content)
+            item.release_content(self.load_content)
+        for item_id in removed_ids:
+            self._content_cache.pop(item_id)
+
+    @staticmethod
+    def _mutable_values(item: ClipboardItem) -> tuple:
+        last_used_at = item.last_used_at
+        return (
+            item.use_count,
+            last_used_at.isoformat() if last_used_at else None,
+            item.frecency,
+            int(item.pinned),
+        )
+
     def load_history(self) -> ClipboardHistory:
         try:
             # TODO: Add tests
@@ -68,24 +309,77 @@ class SqliteStorageAdapter(StoragePort):
             with sqlite3.connect(self.db_path) as conn:
                 cursor = conn.cursor()
 
-                max_items = 1000  # Hardcoded max items
+                self._backfill_metadata(cursor)
+                conn.commit()
 
                 cursor.execute(
-                    "SELECT content, created_at FROM clipboard_history ORDER BY created_at DESC"
+                    "SELECT id, created_at, content_hash, size, preview, "
+                    "use_count, last_used_at, frecency, variant_count, "
+                    "pinned, media_type, source "
+                    "FROM clipboard_history ORDER BY created_at DESC"
                 )
                 rows = cursor.fetchall()
 
+                cursor.execute(
+                    "SELECT item_id, media_type FROM clipboard_formats ORDER BY rowid"
+                )
+                formats: Dict[int, List[str]] = {}
+                for item_id, media_type in cursor.fetchall():
+                    formats.setdefault(item_id, []).append(media_type)
+
                 items = []
-                for content, created_at_str in rows:
+                for (
+                    item_id,
+                    created_at_str,
+                    content_hash,
+                    size,
+                    preview,
+                    use_count,
+                    last_used_at_str,
+                    frecency,
+                    variant_count,
+                    pinned,
+                    media_type,
+                    source,
+                ) in rows:
                     try:
                         created_at = datetime.fromisoformat(created_at_str)
-                        item = ClipboardItem(content=content, created_at=created_at)
+                        last_used_at = (
+                            datetime.fromisoformat(last_used_at_str)
+                            if last_used_at_str
+                            else None
+                        )
+                        item = ClipboardItem.lazy(
+                            id=item_id,
+                            head=preview,
+                            content_hash=content_hash,
+                            size=size,
+                            created_timestamp=to_timestamp(created_at),
+                            loader=self.load_content,
+                            use_count=use_count or 0,
+                            last_used_timestamp=(
+                                to_timestamp(last_used_at) if last_used_at else None
+                            ),
+                            frecency=frecency,
+                            variant_count=variant_count,
+                            pinned=bool(pinned),
+                            media_type=media_type,
+                            formats=tuple(formats.get(item_id, ())),
+                            source=source,
+                        )
                         items.append(item)
                     except (ValueError, TypeError) as e:
                         logger.warning(f"Skipping invalid history item: {e}")
                         continue
 
-                history = ClipboardHistory(items=items, max_items=max_items)
+                # Everything stored is loaded. The configured limits are applied
+                # by the service afterwards, as journaled evictions, so rows
+                # past them are deleted from here too instead of lingering.
+                history = ClipboardHistory(
+                    items=items,
+                    max_items=max(len(items), DEFAULT_MAX_ITEMS),
+                    signature_loader=self.load_signatures,
+                )
                 logger.info(f"Loaded {len(items)} items from database.")
                 return history
 
@@ -95,9 +389,144 @@ class SqliteStorageAdapter(StoragePort):
             logger.info("Starting with empty history.")
             return ClipboardHistory(items=[])
 
+    def _backfill_metadata(self, cursor: sqlite3.Cursor) -> None:
+        """Fill derived columns for rows written before they existed."""
+        cursor.execute(
+            "SELECT id, content FROM clipboard_history WHERE content_hash IS NULL"
+        )
+        rows = cursor.fetchall()
+        updates = [
+            (
+                hash_content(content),
+                len(encode_content(content)),
+                content[:PREVIEW_LENGTH],
+                item_id,
+            )
+            for item_id, content in rows
+        ]
+        cursor.executemany(
+            "UPDATE clipboard_history "
+            "SET content_hash = ?, size = ?, preview = ? "
+            "WHERE id = ?",
+            updates,
+        )
+        if rows:
+            logger.info(f"Backfilled metadata for {len(rows)} stored items.")
+
+    def load_signatures(self) -> Dict[int, int]:
+        """Near-duplicate signatures of the stored text clips, by id.
+
+        Only needed while near-duplicates are collapsed, so they are not
+        computed when clips are written: rows without one get it here, once.
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT id, content, size FROM clipboard_history "
+                    "WHERE signature IS NULL AND media_type IS NULL"
+                )
+                rows = cursor.fetchall()
+                cursor.executemany(
+                    "UPDATE clipboard_history SET signature = ? WHERE id = ?",
+                    [
+                        (_to_signed(content_signature(content, size)), item_id)
+                        for item_id, content, size in rows
+                    ],
+                )
+                conn.commit()
+                if rows:
+                    logger.debug(f"Computed signatures of {len(rows)} stored items.")
+                cursor.execute(
+                    "SELECT id, signature FROM clipboard_history "
+                    "WHERE media_type IS NULL"
+                )
+                return {
+                    item_id: _to_unsigned(signature)
+                    for item_id, signature in cursor.fetchall()
+                }
+        except sqlite3.Error as e:
+            logger.error(f"Error loading signatures from database: {e}")
+            return {}
+
+    def load_content(self, item_id: int) -> Optional[str]:
+        content = self._content_cache.get(item_id)
+        if content is not None:
+            return content
+
+        try:
+            with self._reader_lock:
+                row = (
+                    self._read_connection()
+                    .execute(
+                        "SELECT content FROM clipboard_history WHERE id = ?", (item_id,)
+                    )
+                    .fetchone()
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Error loading content of item {item_id}: {e}")
+            self._close_reader()
+            return None
+
+        if row is None:
+            logger.warning(f"Content of item {item_id} not found in database")
+            return None
+        self._content_cache.put(item_id, row[0])
+        return row[0]
+
+    def load_contents(self, item_ids: Iterable[int]) -> Dict[int, str]:
+        """Bodies of several items by id, for scans that read them all.
+
+        What is not cached is read in a few queries and not cached either, so
+        a scan does not push out the bodies that are read again and again.
+        """
+        contents: Dict[int, str] = {}
+        missing = []
+        for item_id in item_ids:
+            content = self._content_cache.get(item_id)
+            if content is not None:
+                contents[item_id] = content
+            else:
+                missing.append(item_id)
+
+        try:
+            with self._reader_lock:
+                connection = self._read_connection()
+                for start in range(0, len(missing), CONTENT_BATCH_IDS):
+                    batch = missing[start : start + CONTENT_BATCH_IDS]
+                    placeholders = ", ".join("?" * len(batch))
+                    contents.update(
+                        connection.execute(
+                            "SELECT id, content FROM clipboard_history "
+                            f"WHERE id IN ({placeholders})",
+                            batch,
+                        )
+                    )
+        except sqlite3.Error as e:
+            logger.error(f"Error loading contents of {len(missing)} items: {e}")
+            self._close_reader()
+        return contents
+
+    def _read_connection(self) -> sqlite3.Connection:
+        """The reader connection, opened on first use; hold the reader lock."""
+        if self._reader is None:
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            self._reader = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        return self._reader
+
+    def _close_reader(self) -> None:
+        # Reopened on the next read, e.g. once a deleted file is created again.
+        with self._reader_lock:
+            reader, self._reader = self._reader, None
+        if reader is not None:
+            reader.close()
+
     def clear_storage(self) -> None:
         # TODO: Add tests
         try:
+            self._content_cache.clear()
+            # An open connection keeps the file from being deleted on Windows.
+            self._close_reader()
             if os.path.exists(self.db_path):
                 os.remove(self.db_path)
                 logger.info(f"Database file {self.db_path} deleted.")
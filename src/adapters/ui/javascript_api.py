@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Dict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 if TYPE_CHECKING:
     from src.adapters.ui.pywebview_ui_adapter import PyWebViewUIAdapter
@@ -13,14 +13,41 @@ class JavaScriptAPI:
     def on_search(self, query: str) -> None:
         self._ui.handle_js_search(query)
 
-    def on_copy(self, index: int) -> None:
-        self._ui.handle_js_copy(int(index))
+    def on_copy(self, item_id: int) -> None:
+        self._ui.handle_js_copy(int(item_id))
+
+    def on_copy_rich(self, item_id: int) -> None:
+        self._ui.handle_js_copy_rich(int(item_id))
 
     def on_clear(self) -> None:
         self._ui.handle_js_clear()
 
-    def on_delete(self, index: int) -> None:
-        self._ui.handle_js_delete(int(index))
+    def on_delete(self, item_id: int) -> None:
+        self._ui.handle_js_delete(int(item_id))
+
+    def on_copy_many(self, item_ids: List[int]) -> None:
+        self._ui.handle_js_copy_many([int(item_id) for item_id in item_ids])
+
+    def on_delete_many(self, item_ids: List[int]) -> None:
+        self._ui.handle_js_delete_many([int(item_id) for item_id in item_ids])
+
+    def on_pin_many(self, item_ids: List[int], pinned: bool = True) -> None:
+        self._ui.handle_js_pin_many([int(item_id) for item_id in item_ids], pinned)
+
+    def get_rows(self, start: int, count: int) -> Dict[str, Any]:
+        return self._ui.handle_js_get_rows(int(start), int(count))
+
+    def get_ids_between(self, first_id: int, last_id: int) -> List[int]:
+        return self._ui.handle_js_get_ids_between(int(first_id), int(last_id))
+
+    def get_item_content(self, item_id: int) -> Optional[str]:
+        return self._ui.handle_js_get_content(int(item_id))
+
+    def get_thumbnail(self, item_id: int) -> Optional[str]:
+        return self._ui.handle_js_get_thumbnail(int(item_id))
+
+    def get_item_image(self, item_id: int) -> Optional[str]:
+        return self._ui.handle_js_get_image(int(item_id))
 
     def on_ready(self) -> None:
         self._ui.handle_js_ready()
@@ -1,16 +1,30 @@
+import base64
 import json
-from typing import Any, Callable, Dict
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from loguru import logger
 import webview
 
 from src.adapters.ui.javascript_api import JavaScriptAPI
+from src.domain.clipboard import ClipboardItem
 from src.ports.settings_port import SettingsServicePort
-from src.ports.ui_port import UIPort
+from src.ports.ui_port import DeltaKind, HistoryDelta, UIPort
 from src.utils.assets import asset_uri as get_asset_uri
 
+# Rows the webview may fetch at once; it asks for what is on screen plus a
+# margin, so a request only reaches this on very tall windows.
+MAX_ROWS_PER_REQUEST = 500
+
 
 class PyWebViewUIAdapter(UIPort):
+    """UI in a webview that fetches the rows it shows.
+
+    The result set stays here. The page is told only how many rows there
+    are, and asks for the range it has on screen through ``get_rows``, so
+    the cost of a push does not grow with the history.
+    """
+
     def __init__(self, settings_service: SettingsServicePort = None):
         if webview is None:
             raise RuntimeError(
@@ -22,15 +36,27 @@ class PyWebViewUIAdapter(UIPort):
         self._settings_service = settings_service
 
         self._copy_callback: Callable[[int], None] | None = None
+        self._rich_copy_callback: Callable[[int], None] | None = None
         self._search_callback: Callable[[int | str], None] | None = None
         self._clear_callback: Callable[[int], None] | None = None
         self._delete_callback: Callable[[int], None] | None = None
         self._hide_callback: Callable[[int], None] | None = None
-
-        self._current_items: list[str] = []
+        self._content_callback: Callable[[int], Optional[str]] | None = None
+        self._bulk_copy_callback: Callable[[List[int]], None] | None = None
+        self._bulk_delete_callback: Callable[[List[int]], None] | None = None
+        self._bulk_pin_callback: Callable[[List[int], bool], None] | None = None
+        self._thumbnail_callback: Callable[[int], Optional[str]] | None = None
+        self._image_callback: Callable[[int], Optional[Tuple[str, bytes]]] | None = None
+
+        # Replaced on the render lane, read by the webview's API thread.
+        self._current_items: list[ClipboardItem] = []
+        self._items_lock = threading.Lock()
+        # Bumped whenever the result set is replaced, so the page can tell
+        # rows of the current set from late answers about an earlier one.
+        self._results_version = 0
         self._is_hidden = False
         self._js_ready = False
-        self._pending_history: list[str] | None = None
+        self._history_pending = False
         self._request_focus = False
 
         logger.debug("PyWebViewUIAdapter initialized.")
@@ -38,17 +64,47 @@ class PyWebViewUIAdapter(UIPort):
     def set_settings_service(self, settings_service: SettingsServicePort) -> None:
         self._settings_service = settings_service
 
-    def show_history(self, items: list[str]) -> None:
+    def show_history(self, items: list[ClipboardItem]) -> None:
         logger.debug(f"show_history called with {len(items)} items")
-        logger.debug(f"JS ready state: {self._js_ready}")
-        self._current_items = items.copy()
+        with self._items_lock:
+            self._current_items = list(items)
+            self._results_version += 1
 
         if self._js_ready:
-            logger.debug("JS is ready, pushing history to webview")
             self._push_history_to_webview()
         else:
-            logger.debug("JS not ready, storing in pending history")
-            self._pending_history = self._current_items.copy()
+            logger.debug("JS not ready, history will be pushed once it is")
+            self._history_pending = True
+
+    def append_history(self, items: list[ClipboardItem]) -> None:
+        with self._items_lock:
+            self._current_items.extend(items)
+
+        if self._js_ready:
+            data = json.dumps(self._results_state())
+            self._evaluate_js(f"window.appendHistory({data});")
+        else:
+            self._history_pending = True
+
+    def apply_history_deltas(self, deltas: list[HistoryDelta]) -> None:
+        with self._items_lock:
+            ops = [op for op in map(self._apply_delta_locked, deltas) if op]
+            if not ops:
+                return
+            self._results_version += 1
+            state = self._results_state_locked()
+
+        if self._js_ready:
+            data = json.dumps({**state, "ops": ops})
+            self._evaluate_js(f"window.updateHistory({data});")
+        else:
+            self._history_pending = True
+
+    def show_thumbnail(self, item_id: int, uri: str) -> None:
+        if self._js_ready:
+            self._evaluate_js(
+                f"window.showThumbnail({json.dumps(item_id)}, {json.dumps(uri)});"
+            )
 
     def show_message(self, message: str, message_type: str = "info") -> None:
         if not self.window:
@@ -88,6 +144,9 @@ class PyWebViewUIAdapter(UIPort):
     def register_copy_callback(self, callback: Callable[[int], None]) -> None:
         self._copy_callback = callback
 
+    def register_rich_copy_callback(self, callback: Callable[[int], None]) -> None:
+        self._rich_copy_callback = callback
+
     def register_search_callback(self, callback: Callable[[str], None]) -> None:
         self._search_callback = callback
 
@@ -100,13 +159,50 @@ class PyWebViewUIAdapter(UIPort):
     def register_hide_callback(self, callback: Callable[[], None]) -> None:
         self._hide_callback = callback
 
+    def register_content_callback(
+        self, callback: Callable[[int], Optional[str]]
+    ) -> None:
+        self._content_callback = callback
+
+    def register_thumbnail_callback(
+        self, callback: Callable[[int], Optional[str]]
+    ) -> None:
+        self._thumbnail_callback = callback
+
+    def register_image_callback(
+        self, callback: Callable[[int], Optional[Tuple[str, bytes]]]
+    ) -> None:
+        self._image_callback = callback
+
+    def register_bulk_copy_callback(
+        self, callback: Callable[[List[int]], None]
+    ) -> None:
+        self._bulk_copy_callback = callback
+
+    def register_bulk_delete_callback(
+        self, callback: Callable[[List[int]], None]
+    ) -> None:
+        self._bulk_delete_callback = callback
+
+    def register_bulk_pin_callback(
+        self, callback: Callable[[List[int], bool], None]
+    ) -> None:
+        self._bulk_pin_callback = callback
+
     def handle_js_search(self, query: str) -> None:
         if self._search_callback:
             self._search_callback(query)
 
-    def handle_js_copy(self, index: int) -> None:
+    def handle_js_copy(self, item_id: int) -> None:
         if self._copy_callback:
-            self._copy_callback(index)
+            self._copy_callback(item_id)
+        self.hide_window()
+        if self._hide_callback:
+            self._hide_callback()
+
+    def handle_js_copy_rich(self, item_id: int) -> None:
+        if self._rich_copy_callback:
+            self._rich_copy_callback(item_id)
         self.hide_window()
         if self._hide_callback:
             self._hide_callback()
@@ -115,9 +211,63 @@ class PyWebViewUIAdapter(UIPort):
         if self._clear_callback:
             self._clear_callback()
 
-    def handle_js_delete(self, index: int) -> None:
+    def handle_js_delete(self, item_id: int) -> None:
         if self._delete_callback:
-            self._delete_callback(index)
+            self._delete_callback(item_id)
+
+    def handle_js_copy_many(self, item_ids: List[int]) -> None:
+        if self._bulk_copy_callback:
+            # Joined in the order they are listed, not the order selected.
+            self._bulk_copy_callback(self._in_display_order(item_ids))
+        self.hide_window()
+        if self._hide_callback:
+            self._hide_callback()
+
+    def handle_js_delete_many(self, item_ids: List[int]) -> None:
+        if self._bulk_delete_callback:
+            self._bulk_delete_callback(item_ids)
+
+    def handle_js_pin_many(self, item_ids: List[int], pinned: bool) -> None:
+        if self._bulk_pin_callback:
+            self._bulk_pin_callback(item_ids, pinned)
+
+    def handle_js_get_content(self, item_id: int) -> Optional[str]:
+        if self._content_callback:
+            return self._content_callback(item_id)
+        return None
+
+    def handle_js_get_thumbnail(self, item_id: int) -> Optional[str]:
+        if self._thumbnail_callback:
+            return self._thumbnail_callback(item_id)
+        return None
+
+    def handle_js_get_image(self, item_id: int) -> Optional[str]:
+        image = self._image_callback(item_id) if self._image_callback else None
+        if image is None:
+            return None
+        media_type, data = image
+        return f"data:{media_type};base64," + base64.b64encode(data).decode("ascii")
+
+    def handle_js_get_rows(self, start: int, count: int) -> Dict[str, Any]:
+        start = max(start, 0)
+        count = min(max(count, 0), MAX_ROWS_PER_REQUEST)
+        with self._items_lock:
+            rows = self._current_items[start : start + count]
+            state = self._results_state_locked()
+        return {**state, "start": start, "rows": self._serialize_items(rows)}
+
+    def handle_js_get_ids_between(self, first_id: int, last_id: int) -> List[int]:
+        """Ids listed from one item to another, both included, in list order.
+
+        Empty if either is no longer listed.
+        """
+        with self._items_lock:
+            ids = [item.id for item in self._current_items]
+        try:
+            first, last = ids.index(first_id), ids.index(last_id)
+        except ValueError:
+            return []
+        return ids[min(first, last) : max(first, last) + 1]
 
     def handle_js_ready(self) -> None:
         self._mark_js_ready()
@@ -157,8 +307,9 @@ class PyWebViewUIAdapter(UIPort):
         if not self.window:
             return
 
-        data = json.dumps(self._current_items)
-        logger.debug(f"Pushing {len(self._current_items)} items to WebView")
+        state = self._results_state()
+        data = json.dumps(state)
+        logger.debug(f"Pushing a result set of {state['total']} items to WebView")
         exists = self._evaluate_js(
             "typeof updateHistory === 'function' ? 'ok' : 'missing'"
         )
@@ -176,6 +327,96 @@ class PyWebViewUIAdapter(UIPort):
 
         self._evaluate_js(f"updateHistory({data});")
 
+    def _apply_delta_locked(self, delta: HistoryDelta) -> Optional[Dict[str, Any]]:
+        """Apply a delta to the result set; the op that repeats it in the page.
+
+        Positions are checked against the ids they should hold, so a delta
+        meant for a list that was replaced meanwhile does no harm; None if
+        it has nothing to apply to.
+        """
+        items = self._current_items
+        if delta.kind is DeltaKind.RESET:
+            self._current_items = list(delta.items)
+            return {"op": "reset"}
+        if delta.kind is DeltaKind.INSERT:
+            position = min(delta.position, len(items))
+            items[position:position] = delta.items
+            return {
+                "op": "insert",
+                "at": position,
+                "rows": self._serialize_items(delta.items),
+            }
+        if delta.kind is DeltaKind.REPLACE:
+            rows = delta.items[: max(len(items) - delta.position, 0)]
+            if not rows or not all(
+                items[delta.position + i].id == item.id for i, item in enumerate(rows)
+            ):
+                return None
+            items[delta.position : delta.position + len(rows)] = rows
+            return {
+                "op": "replace",
+                "at": delta.position,
+                "rows": self._serialize_items(rows),
+            }
+
+        origin = delta.position if delta.kind is DeltaKind.REMOVE else delta.origin
+        origin = self._find_locked(delta.item_id, origin)
+        if origin is None:
+            return None
+        del items[origin]
+        if delta.kind is DeltaKind.REMOVE:
+            return {"op": "remove", "at": origin, "id": delta.item_id}
+        position = min(delta.position, len(items))
+        items.insert(position, delta.items[0])
+        return {
+            "op": "move",
+            "from": origin,
+            "to": position,
+            "row": self._serialize_items(delta.items)[0],
+        }
+
+    def _find_locked(self, item_id: int, position: Optional[int]) -> Optional[int]:
+        """Index of ``item_id``, looked for at ``position`` first.
+
+        Deltas carry the position the history view gave the item, so while
+        the list is in step with it this is O(1). The O(n) scan only finds
+        rows of a list that drifted, and moving rows still shifts the list,
+        though in C; see scripts/bench_history_view.py.
+        """
+        items = self._current_items
+        if position is not None and position < len(items):
+            if items[position].id == item_id:
+                return position
+        return next((i for i, item in enumerate(items) if item.id == item_id), None)
+
+    def _results_state(self) -> Dict[str, int]:
+        with self._items_lock:
+            return self._results_state_locked()
+
+    def _results_state_locked(self) -> Dict[str, int]:
+        return {"version": self._results_version, "total": len(self._current_items)}
+
+    def _in_display_order(self, item_ids: List[int]) -> List[int]:
+        with self._items_lock:
+            positions = {item.id: i for i, item in enumerate(self._current_items)}
+        return sorted(
+            item_ids, key=lambda item_id: positions.get(item_id, len(positions))
+        )
+
+    @staticmethod
+    def _serialize_items(items: list[ClipboardItem]) -> list[Dict[str, Any]]:
+        return [
+            {
+                "id": item.id,
+                "preview": item.preview(),
+                "variants": item.variant_count,
+                "pinned": item.pinned,
+                "image": item.is_image,
+                "rich": bool(item.formats),
+            }
+            for item in items
+        ]
+
     def _evaluate_js(self, script: str):
         try:
             if self.window:
@@ -201,16 +442,9 @@ class PyWebViewUIAdapter(UIPort):
         self._js_ready = True
 
         logger.debug("JS context is ready")
-        logger.debug(
-            f"Pending history items: {len(self._pending_history) if self._pending_history else 0}"
-        )
 
-        if self._pending_history is not None:
-            logger.debug(
-                f"Processing pending history with {len(self._pending_history)} items"
-            )
-            self._current_items = self._pending_history
-            self._pending_history = None
+        if self._history_pending:
+            self._history_pending = False
             self._push_history_to_webview()
         else:
             logger.debug("No pending history to process")
@@ -0,0 +1,135 @@
+"""Whether the user is at the machine, for pausing the clipboard monitor.
+
+``idle_seconds`` is the time since the last keyboard or mouse input and
+``session_locked`` whether the session is locked or the screen saver is on.
+Both are best effort: where a platform offers no cheap way to tell, they
+report an active user so that polling never stops by mistake.
+"""
+
+import ctypes
+from functools import lru_cache
+import os
+import re
+import subprocess
+import sys
+import threading
+from typing import Optional
+
+from loguru import logger
+
+from src.adapters import xlib
+
+_DESKTOP_SWITCHDESKTOP = 0x0100
+_HID_IDLE_TIME = re.compile(rb'"HIDIdleTime" = (\d+)')
+
+
+def is_away(after_seconds: float) -> bool:
+    """True if the session is locked or there was no input for a while."""
+    if session_locked():
+        return True
+    idle = idle_seconds()
+    return idle is not None and idle >= after_seconds
+
+
+def idle_seconds() -> Optional[float]:
+    """Seconds since the last user input, or None if unknown."""
+    try:
+        if sys.platform == "win32":
+            return _windows_idle()
+        if sys.platform == "darwin":
+            return _macos_idle()
+        info = _x11_screen_saver_info()
+        return info.idle / 1000 if info is not None else None
+    except Exception as e:
+        logger.debug(f"Could not read user idle time: {e}")
+        return None
+
+
+def session_locked() -> bool:
+    try:
+        if sys.platform == "win32":
+            return _windows_locked()
+        if sys.platform == "darwin":
+            return False
+        info = _x11_screen_saver_info()
+        return info is not None and info.state == xlib.SCREEN_SAVER_ON
+    except Exception as e:
+        logger.debug(f"Could not read session lock state: {e}")
+        return False
+
+
+class _LastInputInfo(ctypes.Structure):
+    _fields_ = [("cbSize", ctypes.c_uint), ("dwTime", ctypes.c_uint)]
+
+
+def _windows_idle() -> float:
+    info = _LastInputInfo(cbSize=ctypes.sizeof(_LastInputInfo))
+    if not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):
+        raise OSError("GetLastInputInfo failed")
+    ticks = ctypes.windll.kernel32.GetTickCount()
+    return ((ticks - info.dwTime) & 0xFFFFFFFF) / 1000
+
+
+def _windows_locked() -> bool:
+    # The input desktop of a locked session belongs to Winlogon and cannot
+    # be opened from the user's session.
+    user32 = ctypes.windll.user32
+    desktop = user32.OpenInputDesktop(0, False, _DESKTOP_SWITCHDESKTOP)
+    if not desktop:
+        return True
+    user32.CloseDesktop(desktop)
+    return False
+
+
+def _macos_idle() -> Optional[float]:
+    output = subprocess.run(
+        ["ioreg", "-c", "IOHIDSystem", "-d", "4"],
+        capture_output=True,
+        timeout=2,
+        check=False,
+    ).stdout
+    match = _HID_IDLE_TIME.search(output)
+    return int(match.group(1)) / 1e9 if match else None
+
+
+class _ScreenSaver:
+    """One X connection kept for MIT-SCREEN-SAVER queries."""
+
+    def __init__(self):
+        self._x11 = xlib.load_xlib()
+        self._xss = xlib.load_xss()
+        self._display = self._x11.XOpenDisplay(None)
+        if not self._display:
+            raise OSError("Cannot open X display")
+        event_base, error_base = ctypes.c_int(), ctypes.c_int()
+        if not self._xss.XScreenSaverQueryExtension(
+            self._display, ctypes.byref(event_base), ctypes.byref(error_base)
+        ):
+            self._x11.XCloseDisplay(self._display)
+            raise OSError("X server does not support MIT-SCREEN-SAVER")
+        self._root = self._x11.XDefaultRootWindow(self._display)
+        self._info = xlib.XScreenSaverInfo()
+        self._lock = threading.Lock()
+
+    def query(self) -> xlib.XScreenSaverInfo:
+        with self._lock:
+            self._xss.XScreenSaverQueryInfo(
+                self._display, self._root, ctypes.byref(self._info)
+            )
+            return xlib.XScreenSaverInfo.from_buffer_copy(self._info)
+
+
+@lru_cache(maxsize=1)
+def _screen_saver() -> Optional[_ScreenSaver]:
+    if os.environ.get("WAYLAND_DISPLAY") or not os.environ.get("DISPLAY"):
+        return None
+    try:
+        return _ScreenSaver()
+    except OSError as e:
+        logger.info(f"User idle time unavailable: {e}")
+        return None
+
+
+def _x11_screen_saver_info() -> Optional[xlib.XScreenSaverInfo]:
+    screen_saver = _screen_saver()
+    return screen_saver.query() if screen_saver is not None else None
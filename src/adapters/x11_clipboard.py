@@ -0,0 +1,457 @@
+"""Persistent X11 clipboard client.
+
+pyperclip runs xclip or xsel for every read and write. ``X11Clipboard``
+keeps one Xlib connection open instead, owned by a dedicated thread:
+reads are a ConvertSelection round trip to the selection owner, writes take
+ownership of the selection and serve the text from memory. Other threads
+hand requests to the connection thread through a queue and a wake-up pipe.
+"""
+
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+import ctypes
+import os
+from queue import Empty, SimpleQueue
+import select
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from src.adapters import xlib
+
+READ_TIMEOUT_SECONDS = 1.0
+
+_PROPERTY_NAME = b"CLIP_FLOW_SELECTION"
+_STAMP_PROPERTY_NAME = b"CLIP_FLOW_TIMESTAMP"
+_ALL_OF_PROPERTY = 0x1FFFFFFF
+
+
+class X11Clipboard:
+    def __init__(self, display: Optional[str] = None, selection: bytes = b"CLIPBOARD"):
+        x11 = xlib.load_xlib()
+        self._x11 = x11
+        self._display = x11.XOpenDisplay(display.encode() if display else None)
+        if not self._display:
+            raise OSError("Cannot open X display")
+
+        d = self._display
+        self._window = x11.XCreateSimpleWindow(
+            d, x11.XDefaultRootWindow(d), 0, 0, 1, 1, 0, 0, 0
+        )
+        x11.XSelectInput(d, self._window, xlib.PROPERTY_CHANGE_MASK)
+        self._selection = x11.XInternAtom(d, selection, False)
+        self._property = x11.XInternAtom(d, _PROPERTY_NAME, False)
+        self._stamp_property = x11.XInternAtom(d, _STAMP_PROPERTY_NAME, False)
+        self._targets = x11.XInternAtom(d, b"TARGETS", False)
+        self._timestamp = x11.XInternAtom(d, b"TIMESTAMP", False)
+        self._incr = x11.XInternAtom(d, b"INCR", False)
+        self._utf8 = x11.XInternAtom(d, b"UTF8_STRING", False)
+        self._utf8_targets = {
+            self._utf8,
+            x11.XInternAtom(d, b"TEXT", False),
+            x11.XInternAtom(d, b"text/plain;charset=utf-8", False),
+        }
+        max_request = x11.XExtendedMaxRequestSize(d) or x11.XMaxRequestSize(d)
+        # Request sizes are in 4-byte units; leave room for the header.
+        self._max_property_bytes = max_request * 4 - 1024
+
+        self._owned: Optional[bytes] = None
+        # Further targets served next to the text, by atom.
+        self._owned_targets: Dict[int, bytes] = {}
+        self._ownerships = 0
+        self._read_futures: List[Future] = []
+        self._read_targets: List[int] = []
+        self._read_deadline = 0.0
+        self._incremental: Optional[bytearray] = None
+        self._stamp_futures: List[Future] = []
+        self._stamp_owner = xlib.NONE
+        self._stamp_deadline = 0.0
+        self._event = xlib.XEvent()
+
+        self._commands: SimpleQueue = SimpleQueue()
+        self._wake_read, self._wake_write = os.pipe()
+        self._closing = False
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="x11-clipboard", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def owned_text(self) -> Optional[str]:
+        """Text we currently serve as selection owner, if any."""
+        owned = self._owned
+        return owned.decode("utf-8", "replace") if owned is not None else None
+
+    def read_text(self) -> Optional[str]:
+        """Text on the clipboard, or None if the owner did not answer in time."""
+        future = self._submit(self._start_read)
+        try:
+            return future.result(READ_TIMEOUT_SECONDS * 2)
+        except FutureTimeout:
+            return None
+
+    def selection_stamp(self) -> Optional[Tuple[int, int]]:
+        """Value that changes whenever the selection changes hands.
+
+        The owner window and the time it took the selection, which owners
+        report as the ICCCM TIMESTAMP target. Applications take the selection
+        again on every copy, so the time moves even when the owner stays the
+        same. None if the owner does not report the time or did not answer in
+        time.
+        """
+        future = self._submit(self._start_stamp)
+        try:
+            return future.result(READ_TIMEOUT_SECONDS * 2)
+        except FutureTimeout:
+            return None
+
+    def write_text(self, text: str, targets: Optional[Dict[str, bytes]] = None) -> bool:
+        """Take ownership of the selection and serve ``text`` from memory.
+
+        ``targets`` maps further target names, such as ``text/html``, to the
+        data served for them next to the text. Returns False, leaving the
+        selection alone, if a value is too large to serve in one property:
+        INCR transfers are only read, not served.
+        """
+        data = text.encode("utf-8")
+        targets = targets or {}
+        largest = max([len(data), *(len(value) for value in targets.values())])
+        if largest > self._max_property_bytes:
+            logger.debug(f"Clipboard value of {largest} bytes is too large.")
+            return False
+        future = self._submit(self._take_ownership, data, targets)
+        try:
+            return future.result(READ_TIMEOUT_SECONDS)
+        except FutureTimeout:
+            return False
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._submit(self._stop)
+        self._thread.join(READ_TIMEOUT_SECONDS)
+        os.close(self._wake_read)
+        os.close(self._wake_write)
+
+    def _submit(self, command: Callable[..., None], *args: object) -> Future:
+        """Queue ``command(future, *args)``; the command resolves ``future``."""
+        future: Future = Future()
+        if not self._thread.is_alive():
+            future.set_exception(OSError("X11 clipboard connection is closed"))
+            return future
+        self._commands.put((command, args, future))
+        os.write(self._wake_write, b"\0")
+        return future
+
+    # Everything below runs on the connection thread.
+
+    def _run(self) -> None:
+        fd = self._x11.XConnectionNumber(self._display)
+        try:
+            while not self._closing:
+                # Events first, so a command sees e.g. a lost ownership that
+                # the server reported before the command was queued.
+                self._handle_events()
+                self._run_commands()
+                self._expire_read()
+                if self._closing:
+                    break
+                # Flushes the commands' requests; loop again if events came in.
+                if self._x11.XPending(self._display):
+                    continue
+                deadlines = [
+                    deadline
+                    for futures, deadline in (
+                        (self._read_futures, self._read_deadline),
+                        (self._stamp_futures, self._stamp_deadline),
+                    )
+                    if futures
+                ]
+                timeout = (
+                    max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+                )
+                ready, _, _ = select.select([fd, self._wake_read], [], [], timeout)
+                if self._wake_read in ready:
+                    os.read(self._wake_read, 4096)
+        except Exception as e:
+            logger.exception(f"X11 clipboard connection failed: {e}")
+        finally:
+            self._finish_read(None)
+            self._finish_stamp(None)
+            self._x11.XDestroyWindow(self._display, self._window)
+            self._x11.XCloseDisplay(self._display)
+
+    def _handle_events(self) -> None:
+        while self._x11.XPending(self._display):
+            self._x11.XNextEvent(self._display, ctypes.byref(self._event))
+            self._dispatch(self._event)
+
+    def _run_commands(self) -> None:
+        while True:
+            try:
+                command, args, future = self._commands.get_nowait()
+            except Empty:
+                return
+            try:
+                command(future, *args)
+            except Exception as e:
+                future.set_exception(e)
+
+    def _stop(self, future: Future) -> None:
+        self._closing = True
+        future.set_result(None)
+
+    def _start_read(self, future: Future) -> None:
+        if self._owned is not None:
+            future.set_result(self._owned.decode("utf-8", "replace"))
+            return
+        self._read_futures.append(future)
+        if len(self._read_futures) == 1:
+            # Concurrent reads share one conversion.
+            self._read_targets = [self._utf8, xlib.XA_STRING]
+            self._read_deadline = time.monotonic() + READ_TIMEOUT_SECONDS
+            self._convert()
+
+    def _start_stamp(self, future: Future) -> None:
+        owner = self._x11.XGetSelectionOwner(self._display, self._selection)
+        if owner == xlib.NONE:
+            future.set_result((xlib.NONE, 0))
+            return
+        if owner == self._window:
+            future.set_result((owner, self._ownerships))
+            return
+        self._stamp_futures.append(future)
+        if len(self._stamp_futures) == 1:
+            self._stamp_owner = owner
+            self._stamp_deadline = time.monotonic() + READ_TIMEOUT_SECONDS
+            self._x11.XConvertSelection(
+                self._display,
+                self._selection,
+                self._timestamp,
+                self._stamp_property,
+                self._window,
+                xlib.CURRENT_TIME,
+            )
+
+    def _finish_stamp(self, stamp: Optional[Tuple[int, int]]) -> None:
+        futures, self._stamp_futures = self._stamp_futures, []
+        for future in futures:
+            future.set_result(stamp)
+
+    def _convert(self) -> None:
+        self._x11.XConvertSelection(
+            self._display,
+            self._selection,
+            self._read_targets[0],
+            self._property,
+            self._window,
+            xlib.CURRENT_TIME,
+        )
+
+    def _expire_read(self) -> None:
+        if self._read_futures and time.monotonic() >= self._read_deadline:
+            logger.warning("Clipboard owner did not answer in time.")
+            self._finish_read(None)
+        if self._stamp_futures and time.monotonic() >= self._stamp_deadline:
+            self._finish_stamp(None)
+
+    def _finish_read(self, data: Optional[bytes], target: int = 0) -> None:
+        text = None
+        if data is not None:
+            encoding = "latin-1" if target == xlib.XA_STRING else "utf-8"
+            text = data.decode(encoding, "replace")
+        futures, self._read_futures = self._read_futures, []
+        self._incremental = None
+        for future in futures:
+            future.set_result(text)
+
+    def _take_ownership(
+        self, future: Future, data: bytes, targets: Dict[str, bytes]
+    ) -> None:
+        self._owned_targets = {
+            self._x11.XInternAtom(self._display, name.encode(), False): value
+            for name, value in targets.items()
+        }
+        self._owned = data
+        self._ownerships += 1
+        self._x11.XSetSelectionOwner(
+            self._display, self._selection, self._window, xlib.CURRENT_TIME
+        )
+        owner = self._x11.XGetSelectionOwner(self._display, self._selection)
+        if owner != self._window:
+            self._owned, self._owned_targets = None, {}
+        future.set_result(owner == self._window)
+
+    def _dispatch(self, event: xlib.XEvent) -> None:
+        if event.type == xlib.SELECTION_NOTIFY:
+            self._on_selection_notify(event.xselection)
+        elif event.type == xlib.PROPERTY_NOTIFY:
+            self._on_property_notify(event.xproperty)
+        elif event.type == xlib.SELECTION_REQUEST:
+            self._on_selection_request(event.xselectionrequest)
+        elif event.type == xlib.SELECTION_CLEAR:
+            if event.xselectionclear.selection == self._selection:
+                self._owned, self._owned_targets = None, {}
+
+    def _on_selection_notify(self, event: xlib.XSelectionEvent) -> None:
+        if event.requestor != self._window:
+            return
+        if event.target == self._timestamp:
+            self._on_stamp_notify(event)
+            return
+        if not self._read_futures:
+            return
+        if event.property == xlib.NONE:
+            # The owner cannot convert to this target; try the next one.
+            self._read_targets.pop(0)
+            if self._read_targets:
+                self._convert()
+            else:
+                self._finish_read(b"")
+            return
+        data_type, data = self._get_property()
+        if data_type == self._incr:
+            # Deleting the INCR property asked the owner to send chunks.
+            self._incremental = bytearray()
+            return
+        self._finish_read(data, self._read_targets[0])
+
+    def _on_stamp_notify(self, event: xlib.XSelectionEvent) -> None:
+        if not self._stamp_futures:
+            return
+        time_taken = 0
+        if event.property != xlib.NONE:
+            _, data = self._get_property(self._stamp_property)
+            # A 32-bit item, which Xlib returns as a native long.
+            if len(data) >= ctypes.sizeof(ctypes.c_ulong):
+                time_taken = int.from_bytes(
+                    data[: ctypes.sizeof(ctypes.c_ulong)], sys.byteorder
+                )
+        self._finish_stamp((self._stamp_owner, time_taken) if time_taken else None)
+
+    def _on_property_notify(self, event: xlib.XPropertyEvent) -> None:
+        if (
+            self._incremental is None
+            or event.window != self._window
+            or event.atom != self._property
+            or event.state != xlib.PROPERTY_NEW_VALUE
+        ):
+            return
+        _, chunk = self._get_property()
+        if chunk:
+            self._incremental.extend(chunk)
+            # More chunks are on their way: keep the read alive.
+            self._read_deadline = time.monotonic() + READ_TIMEOUT_SECONDS
+        else:
+            self._finish_read(bytes(self._incremental), self._read_targets[0])
+
+    def _get_property(self, prop: Optional[int] = None) -> Tuple[int, bytes]:
+        """Read and delete a transfer property; return its type and data."""
+        actual_type = xlib.Atom()
+        actual_format = ctypes.c_int()
+        item_count = ctypes.c_ulong()
+        bytes_after = ctypes.c_ulong()
+        data = ctypes.POINTER(ctypes.c_ubyte)()
+        status = self._x11.XGetWindowProperty(
+            self._display,
+            self._window,
+            prop or self._property,
+            0,
+            _ALL_OF_PROPERTY,
+            True,
+            xlib.ANY_PROPERTY_TYPE,
+            ctypes.byref(actual_type),
+            ctypes.byref(actual_format),
+            ctypes.byref(item_count),
+            ctypes.byref(bytes_after),
+            ctypes.byref(data),
+        )
+        if status != 0 or not data:
+            return actual_type.value, b""
+        try:
+            # Xlib returns 32-bit items as longs.
+            unit = {8: 1, 16: ctypes.sizeof(ctypes.c_short)}.get(
+                actual_format.value, ctypes.sizeof(ctypes.c_long)
+            )
+            return actual_type.value, ctypes.string_at(data, item_count.value * unit)
+        finally:
+            self._x11.XFree(data)
+
+    def _on_selection_request(self, request: xlib.XSelectionRequestEvent) -> None:
+        # The requestor may have gone away since it asked; writing to its
+        # window then fails with BadWindow, which ``load_xlib``'s handler logs.
+        # Obsolete clients leave the property empty and expect the target.
+        target_property = request.property or request.target
+        served = (
+            self._owned is not None
+            and request.selection == self._selection
+            and self._serve(request.requestor, target_property, request.target)
+        )
+        reply = xlib.XEvent()
+        reply.xselection.type = xlib.SELECTION_NOTIFY
+        reply.xselection.display = self._display
+        reply.xselection.requestor = request.requestor
+        reply.xselection.selection = request.selection
+        reply.xselection.target = request.target
+        reply.xselection.property = target_property if served else xlib.NONE
+        reply.xselection.time = request.time
+        self._x11.XSendEvent(
+            self._display, request.requestor, False, 0, ctypes.byref(reply)
+        )
+
+    def _serve(self, requestor: int, target_property: int, target: int) -> bool:
+        if target == self._targets:
+            atoms = [
+                self._targets,
+                *self._utf8_targets,
+                xlib.XA_STRING,
+                *self._owned_targets,
+            ]
+            array = (xlib.Atom * len(atoms))(*atoms)
+            self._x11.XChangeProperty(
+                self._display,
+                requestor,
+                target_property,
+                xlib.XA_ATOM,
+                32,
+                xlib.PROP_MODE_REPLACE,
+                ctypes.cast(array, ctypes.c_void_p),
+                len(atoms),
+            )
+            return True
+
+        if target in self._utf8_targets:
+            data, data_type = self._owned, self._utf8
+        elif target == xlib.XA_STRING:
+            text = self._owned.decode("utf-8", "replace")
+            data, data_type = text.encode("latin-1", "replace"), xlib.XA_STRING
+        elif target in self._owned_targets:
+            data, data_type = self._owned_targets[target], target
+        else:
+            return False
+        self._x11.XChangeProperty(
+            self._display,
+            requestor,
+            target_property,
+            data_type,
+            8,
+            xlib.PROP_MODE_REPLACE,
+            data,
+            len(data),
+        )
+        return True
+
+
+def create_x11_clipboard(selection: bytes = b"CLIPBOARD") -> Optional[X11Clipboard]:
+    """A persistent connection for plain X11 sessions, otherwise None."""
+    if os.environ.get("WAYLAND_DISPLAY") or not os.environ.get("DISPLAY"):
+        return None
+    try:
+        return X11Clipboard(selection=selection)
+    except OSError as e:
+        logger.info(f"Persistent X11 clipboard unavailable: {e}")
+        return None
@@ -0,0 +1,287 @@
+"""ctypes bindings for the parts of Xlib and its extensions used here.
+
+Only what the clipboard adapters need is declared. Structures follow the
+LP64 layout of ``Xlib.h``; ``XEvent`` is padded to 24 longs like the C union.
+
+Loading libX11 also makes it thread-safe and replaces its default error
+handler, which exits the process, with one that logs. Errors are routine
+here: a client that asked for the selection may be gone by the time the
+answer is written to its window.
+"""
+
+import ctypes
+from ctypes.util import find_library
+from functools import lru_cache
+
+from loguru import logger
+
+Display = ctypes.c_void_p
+Window = ctypes.c_ulong
+Atom = ctypes.c_ulong
+Time = ctypes.c_ulong
+Bool = ctypes.c_int
+
+NONE = 0
+CURRENT_TIME = 0
+ANY_PROPERTY_TYPE = 0
+XA_ATOM = 4
+XA_STRING = 31
+PROP_MODE_REPLACE = 0
+PROPERTY_NEW_VALUE = 0
+PROPERTY_CHANGE_MASK = 1 << 22
+
+PROPERTY_NOTIFY = 28
+SELECTION_CLEAR = 29
+SELECTION_REQUEST = 30
+SELECTION_NOTIFY = 31
+
+SCREEN_SAVER_ON = 1
+
+
+class XSelectionRequestEvent(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("serial", ctypes.c_ulong),
+        ("send_event", Bool),
+        ("display", Display),
+        ("owner", Window),
+        ("requestor", Window),
+        ("selection", Atom),
+        ("target", Atom),
+        ("property", Atom),
+        ("time", Time),
+    ]
+
+
+class XSelectionEvent(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("serial", ctypes.c_ulong),
+        ("send_event", Bool),
+        ("display", Display),
+        ("requestor", Window),
+        ("selection", Atom),
+        ("target", Atom),
+        ("property", Atom),
+        ("time", Time),
+    ]
+
+
+class XSelectionClearEvent(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("serial", ctypes.c_ulong),
+        ("send_event", Bool),
+        ("display", Display),
+        ("window", Window),
+        ("selection", Atom),
+        ("time", Time),
+    ]
+
+
+class XPropertyEvent(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("serial", ctypes.c_ulong),
+        ("send_event", Bool),
+        ("display", Display),
+        ("window", Window),
+        ("atom", Atom),
+        ("time", Time),
+        ("state", ctypes.c_int),
+    ]
+
+
+class XFixesSelectionNotifyEvent(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("serial", ctypes.c_ulong),
+        ("send_event", Bool),
+        ("display", Display),
+        ("window", Window),
+        ("subtype", ctypes.c_int),
+        ("owner", Window),
+        ("selection", Atom),
+        ("timestamp", Time),
+        ("selection_timestamp", Time),
+    ]
+
+
+class XErrorEvent(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("display", Display),
+        ("resourceid", ctypes.c_ulong),
+        ("serial", ctypes.c_ulong),
+        ("error_code", ctypes.c_ubyte),
+        ("request_code", ctypes.c_ubyte),
+        ("minor_code", ctypes.c_ubyte),
+    ]
+
+
+class XScreenSaverInfo(ctypes.Structure):
+    _fields_ = [
+        ("window", Window),
+        ("state", ctypes.c_int),
+        ("kind", ctypes.c_int),
+        ("til_or_since", ctypes.c_ulong),
+        ("idle", ctypes.c_ulong),
+        ("event_mask", ctypes.c_ulong),
+    ]
+
+
+class XEvent(ctypes.Union):
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("xselectionrequest", XSelectionRequestEvent),
+        ("xselection", XSelectionEvent),
+        ("xselectionclear", XSelectionClearEvent),
+        ("xproperty", XPropertyEvent),
+        ("xfixesselection", XFixesSelectionNotifyEvent),
+        ("pad", ctypes.c_long * 24),
+    ]
+
+
+XErrorHandler = ctypes.CFUNCTYPE(ctypes.c_int, Display, ctypes.POINTER(XErrorEvent))
+
+
+def _log_error(display: int, event: "ctypes._Pointer[XErrorEvent]") -> int:
+    # Called by Xlib with the display locked: no Xlib calls in here.
+    error = event.contents
+    logger.debug(
+        f"X error {error.error_code} from request {error.request_code} "
+        f"(minor {error.minor_code}) on resource {error.resourceid:#x}"
+    )
+    return 0
+
+
+# Held here for as long as Xlib may call it.
+_ERROR_HANDLER = XErrorHandler(_log_error)
+
+
+@lru_cache(maxsize=1)
+def load_xlib() -> ctypes.CDLL:
+    """libX11 with the signatures used here; raises OSError if missing."""
+    path = find_library("X11")
+    if not path:
+        raise OSError("libX11 not found")
+    x11 = ctypes.CDLL(path)
+
+    # Before any display is opened: connections are used from several threads.
+    _declare(x11.XInitThreads, [])
+    x11.XInitThreads()
+    _declare(x11.XSetErrorHandler, [XErrorHandler], ctypes.c_void_p)
+    x11.XSetErrorHandler(_ERROR_HANDLER)
+
+    _declare(x11.XOpenDisplay, [ctypes.c_char_p], Display)
+    _declare(x11.XCloseDisplay, [Display])
+    _declare(x11.XDefaultRootWindow, [Display], Window)
+    _declare(
+        x11.XCreateSimpleWindow,
+        [
+            Display,
+            Window,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_uint,
+            ctypes.c_uint,
+            ctypes.c_uint,
+            ctypes.c_ulong,
+            ctypes.c_ulong,
+        ],
+        Window,
+    )
+    _declare(x11.XDestroyWindow, [Display, Window])
+    _declare(x11.XSelectInput, [Display, Window, ctypes.c_long])
+    _declare(x11.XInternAtom, [Display, ctypes.c_char_p, Bool], Atom)
+    _declare(x11.XConvertSelection, [Display, Atom, Atom, Atom, Window, Time])
+    _declare(
+        x11.XGetWindowProperty,
+        [
+            Display,
+            Window,
+            Atom,
+            ctypes.c_long,
+            ctypes.c_long,
+            Bool,
+            Atom,
+            ctypes.POINTER(Atom),
+            ctypes.POINTER(ctypes.c_int),
+            ctypes.POINTER(ctypes.c_ulong),
+            ctypes.POINTER(ctypes.c_ulong),
+            ctypes.POINTER(ctypes.POINTER(ctypes.c_ubyte)),
+        ],
+        ctypes.c_int,
+    )
+    _declare(x11.XFree, [ctypes.c_void_p])
+    _declare(
+        x11.XChangeProperty,
+        [
+            Display,
+            Window,
+            Atom,
+            Atom,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_void_p,
+            ctypes.c_int,
+        ],
+    )
+    _declare(
+        x11.XSendEvent,
+        [Display, Window, Bool, ctypes.c_long, ctypes.POINTER(XEvent)],
+        ctypes.c_int,
+    )
+    _declare(x11.XSetSelectionOwner, [Display, Atom, Window, Time])
+    _declare(x11.XGetSelectionOwner, [Display, Atom], Window)
+    _declare(x11.XPending, [Display], ctypes.c_int)
+    _declare(x11.XNextEvent, [Display, ctypes.POINTER(XEvent)])
+    _declare(x11.XConnectionNumber, [Display], ctypes.c_int)
+    _declare(x11.XFlush, [Display])
+    _declare(x11.XMaxRequestSize, [Display], ctypes.c_long)
+    _declare(x11.XExtendedMaxRequestSize, [Display], ctypes.c_long)
+    return x11
+
+
+@lru_cache(maxsize=1)
+def load_xfixes() -> ctypes.CDLL:
+    """libXfixes with the signatures used here; raises OSError if missing."""
+    path = find_library("Xfixes")
+    if not path:
+        raise OSError("libXfixes not found")
+    xfixes = ctypes.CDLL(path)
+    _declare(
+        xfixes.XFixesQueryExtension,
+        [Display, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)],
+        Bool,
+    )
+    _declare(
+        xfixes.XFixesSelectSelectionInput,
+        [Display, Window, Atom, ctypes.c_ulong],
+    )
+    return xfixes
+
+
+@lru_cache(maxsize=1)
+def load_xss() -> ctypes.CDLL:
+    """libXss (MIT-SCREEN-SAVER) for idle time; raises OSError if missing."""
+    path = find_library("Xss")
+    if not path:
+        raise OSError("libXss not found")
+    xss = ctypes.CDLL(path)
+    _declare(
+        xss.XScreenSaverQueryExtension,
+        [Display, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)],
+        Bool,
+    )
+    _declare(
+        xss.XScreenSaverQueryInfo,
+        [Display, Window, ctypes.POINTER(XScreenSaverInfo)],
+        ctypes.c_int,
+    )
+    return xss
+
+
+def _declare(function, argtypes, restype=ctypes.c_int) -> None:
+    function.argtypes = argtypes
+    function.restype = restype
@@ -2,7 +2,9 @@ from loguru import logger
 
 from src.application.clipboard_service import ClipboardService
 from src.ports.clipboard_port import ClipboardPort
+from src.ports.image_store_port import ImageStorePort
 from src.ports.search_port import SearchPort
+from src.ports.settings_port import SettingsServicePort
 from src.ports.storage_port import StoragePort
 from src.ports.ui_port import UIPort
 
@@ -14,12 +16,16 @@ class AppService:
         storage_port: StoragePort,
         ui_port: UIPort,
         search_port: SearchPort,
+        settings_service: SettingsServicePort | None = None,
+        image_store: ImageStorePort | None = None,
     ):
         self.clipboard_service = ClipboardService(
             clipboard_port=clipboard_port,
             storage_port=storage_port,
             ui_port=ui_port,
             search_port=search_port,
+            settings_service=settings_service,
+            image_store=image_store,
         )
         self.ui_port = ui_port
         self._running = False
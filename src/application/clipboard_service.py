@@ -1,13 +1,50 @@
-from typing import List
+from itertools import islice
+import re
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
 
 from loguru import logger
 
-from src.domain.clipboard import ClipboardHistory
-from src.ports.clipboard_port import ClipboardPort
+from src.application.history_view import HistoryView
+from src.application.ingestion_pipeline import (
+    Clip,
+    IngestionPipeline,
+    IngestionStage,
+    LengthFilter,
+    PatternFilter,
+    SecretDetector,
+    SourceAppFilter,
+    StageStats,
+    WhitespaceTrimmer,
+)
+from src.application.service_loop import LoopMetrics, ServiceLoop
+from src.domain.clipboard import (
+    ChangeKind,
+    ClipboardHistory,
+    ClipboardItem,
+    HistoryChange,
+)
+from src.ports.clipboard_port import CLIPBOARD_SELECTION, ClipboardPort
+from src.ports.image_store_port import ImageInfo, ImageStorePort
 from src.ports.search_port import SearchPort
+from src.ports.settings_port import SettingsServicePort
 from src.ports.storage_port import StoragePort
 from src.ports.ui_port import UIPort
 
+SEARCH_FIRST_PAGE_SIZE = 50
+SEARCH_PAGE_SIZE = 500
+# Stored bodies a search reads back per storage query.
+SEARCH_LOAD_BATCH = 256
+BYTES_PER_MB = 1024 * 1024
+BULK_COPY_SEPARATOR = "\n"
+
+STORAGE_LANE = "storage"
+RENDER_LANE = "render"
+CAPTURE_LANE = "capture"
+CAPTURE_LIMIT_SETTINGS = frozenset(
+    ("history.max_clip_size_mb", "history.truncate_large_clips")
+)
+
 
 class ClipboardService:
     def __init__(
@@ -16,27 +53,167 @@ class ClipboardService:
         storage_port: StoragePort,
         ui_port: UIPort,
         search_port: SearchPort,
+        settings_service: SettingsServicePort | None = None,
+        image_store: ImageStorePort | None = None,
     ):
         self.clipboard_port = clipboard_port
         self.storage_port = storage_port
         self.ui_port = ui_port
         self.search_port = search_port
-        self.history: ClipboardHistory = ClipboardHistory(items=[])
+        self.image_store = image_store
+        self._settings_service = settings_service
+        self._loop = ServiceLoop(name="clipboard-service")
+        self._history: ClipboardHistory | None = None
+        self._storage_version = 0
+        self.history = ClipboardHistory(items=[])
+        self.ingestion = IngestionPipeline()
+        # Clipboard changes waiting for the end of their burst.
+        self._burst: List[Clip] = []
+        self._ingestion_config: Tuple[Any, ...] | None = None
 
-        self.ui_port.register_copy_callback(self._on_copy_item)
-        self.ui_port.register_search_callback(self._on_search)
-        self.ui_port.register_clear_callback(self._on_clear_history)
-        self.ui_port.register_delete_callback(self._on_delete_item)
+        self.ui_port.register_copy_callback(self._owned(self._on_copy_item))
+        self.ui_port.register_rich_copy_callback(self._owned(self._on_copy_rich_item))
+        self.ui_port.register_search_callback(self._owned(self._on_search))
+        self.ui_port.register_clear_callback(self._owned(self._on_clear_history))
+        self.ui_port.register_delete_callback(self._owned(self._on_delete_item))
+        self.ui_port.register_bulk_copy_callback(self._owned(self._on_copy_items))
+        self.ui_port.register_bulk_delete_callback(self._owned(self._on_delete_items))
+        self.ui_port.register_bulk_pin_callback(self._owned(self._on_pin_items))
+        # Reads go through snapshots and need no owner; the bridge waits for
+        # the returned content.
+        self.ui_port.register_content_callback(self._on_get_content)
+        self.ui_port.register_thumbnail_callback(self._on_get_thumbnail)
+        self.ui_port.register_image_callback(self._on_get_image)
+        if settings_service:
+            settings_service.register_change_callback(
+                self._owned(self._on_settings_changed)
+            )
 
-        self._current_filtered_items: List[str] = []
+        # Only bumped on the owner loop; render workers just compare against it.
+        self._results_generation = 0
+        # What the UI lists while it shows the whole history in listed order;
+        # changes then reach it as deltas. None while it shows anything else.
+        self._history_view: HistoryView | None = None
+        self._ui_changes: List[HistoryChange] = []
+        self._ui_changes_lock = threading.Lock()
 
         logger.debug("ClipboardService initialized.")
 
+    @property
+    def history(self) -> ClipboardHistory:
+        return self._history
+
+    @history.setter
+    def history(self, history: ClipboardHistory) -> None:
+        if self._history is not None:
+            self._history.unsubscribe(self._on_history_changes)
+        self._history = history
+        self._history_view = None
+        self._storage_version = history.version
+        history.subscribe(self._on_history_changes)
+
+    @property
+    def max_items(self) -> int:
+        if not self._settings_service:
+            return self.history.max_items
+        value = self._settings_service.get_settings().get_value("history.max_items")
+        return value if value is not None else self.history.max_items
+
+    @property
+    def max_bytes(self) -> int | None:
+        if not self._settings_service:
+            return self.history.max_bytes
+        value = self._settings_service.get_settings().get_value("history.max_size_mb")
+        return value * BYTES_PER_MB if value is not None else None
+
+    @property
+    def sort_by_frecency(self) -> bool:
+        if not self._settings_service:
+            return False
+        return bool(
+            self._settings_service.get_settings().get_value("history.sort_by_frecency")
+        )
+
+    @property
+    def collapse_near_duplicates(self) -> bool:
+        if not self._settings_service:
+            return self.history.collapse_near_duplicates
+        return bool(
+            self._settings_service.get_settings().get_value(
+                "history.collapse_near_duplicates"
+            )
+        )
+
+    @property
+    def capture_images(self) -> bool:
+        if self.image_store is None:
+            return False
+        if not self._settings_service:
+            return True
+        return bool(
+            self._settings_service.get_settings().get_value("history.capture_images")
+        )
+
+    @property
+    def capture_formatting(self) -> bool:
+        if not self._settings_service:
+            return True
+        return bool(
+            self._settings_service.get_settings().get_value(
+                "history.capture_formatting"
+            )
+        )
+
+    @property
+    def burst_window(self) -> float:
+        if not self._settings_service:
+            return 0.0
+        value = self._settings_service.get_settings().get_value(
+            "history.burst_window_ms"
+        )
+        return value / 1000 if value else 0.0
+
+    @property
+    def keep_burst_values(self) -> bool:
+        if not self._settings_service:
+            return True
+        return bool(
+            self._settings_service.get_settings().get_value("history.keep_burst_values")
+        )
+
+    @property
+    def max_clip_bytes(self) -> int | None:
+        if not self._settings_service:
+            return None
+        value = self._settings_service.get_settings().get_value(
+            "history.max_clip_size_mb"
+        )
+        return value * BYTES_PER_MB if value is not None else None
+
+    @property
+    def truncate_large_clips(self) -> bool:
+        if not self._settings_service:
+            return False
+        return bool(
+            self._settings_service.get_settings().get_value(
+                "history.truncate_large_clips"
+            )
+        )
+
+    @property
+    def loop_metrics(self) -> LoopMetrics:
+        return self._loop.metrics()
+
+    @property
+    def ingestion_stats(self) -> List[StageStats]:
+        return self.ingestion.stats()
+
     def start(self) -> None:
-        self.history = self.storage_port.load_history()
-        logger.info(f"Loaded {len(self.history.items)} items from storage.")
+        self._load_history()
+        logger.info(f"Loaded {len(self.history)} items from storage.")
 
-        self.clipboard_port.start_monitoring(self._on_clipboard_change)
+        self._loop.start()
+        self._start_clipboard_monitoring()
 
         self._update_ui_display()
 
@@ -46,10 +223,11 @@ class ClipboardService:
 
     def start_monitoring(self) -> None:
         """Запустить только мониторинг буфера обмена без запуска UI"""
-        self.history = self.storage_port.load_history()
-        logger.info(f"Loaded {len(self.history.items)} items from storage.")
+        self._load_history()
+        logger.info(f"Loaded {len(self.history)} items from storage.")
 
-        self.clipboard_port.start_monitoring(self._on_clipboard_change)
+        self._loop.start()
+        self._start_clipboard_monitoring()
 
         self._update_ui_display()
 
@@ -57,58 +235,460 @@ class ClipboardService:
 
     def stop(self) -> None:
         self.clipboard_port.stop_monitoring()
+        self._loop.stop()
+        if self.image_store:
+            self.image_store.close()
         self.ui_port.shutdown()
         logger.info("ClipboardService stopped.")
 
-    def _on_clipboard_change(self, content: str) -> None:
-        if content:
-            logger.debug(f"Clipboard changed: '{content[:30]}...'")
-            self.history.add_item(content)
-            self.storage_port.save_history(self.history)
-            self._update_ui_display()
+    def _owned(self, handler: Callable[..., Any]) -> Callable[..., None]:
+        """Wrap ``handler`` so calls from any thread run on the owner loop."""
+
+        def post(*args: Any) -> None:
+            self._loop.post(handler, *args)
+
+        return post
+
+    def _start_clipboard_monitoring(self) -> None:
+        image_callback = (
+            self._owned(self._on_clipboard_image) if self.capture_images else None
+        )
+        self._push_capture_limit()
+        self.clipboard_port.start_monitoring(
+            self._owned(self._on_clipboard_change), image_callback
+        )
+
+    def _load_history(self) -> None:
+        self.history = self.storage_port.load_history()
+        self._apply_settings()
+        if self.image_store:
+            # Drop image files left behind by an earlier crash.
+            self._loop.offload(
+                STORAGE_LANE, self.image_store.retain, self._image_hashes()
+            )
+
+    def _apply_settings(self) -> None:
+        self.history.set_limits(self.max_items, self.max_bytes)
+        self.history.collapse_near_duplicates = self.collapse_near_duplicates
+
+    def _on_settings_changed(self, keys: List[str]) -> None:
+        if CAPTURE_LIMIT_SETTINGS.intersection(keys):
+            self._push_capture_limit()
+        if any(key.startswith("history.") for key in keys):
+            # Evict down to a lowered limit now, not at the next clip; a new
+            # sort order makes the refresh show the whole history again.
+            self._apply_settings()
+            self._refresh_ui()
+
+    def _push_capture_limit(self) -> None:
+        # Takes effect from the next clip the monitor sees. Only sent when the
+        # setting changes: for an out-of-process monitor each call is a message.
+        self.clipboard_port.set_capture_limit(
+            self.max_clip_bytes, self.truncate_large_clips
+        )
+
+    def _configure_ingestion(self) -> None:
+        """Rebuild the ingestion stages if their settings changed."""
+        config = self._read_ingestion_config()
+        if config == self._ingestion_config:
+            return
+        self._ingestion_config = config
+        ignore_apps, trim, min_length, max_length, ignore_pattern, skip_secrets = config
+        # Cheapest first: a clip dropped early costs none of the later scans.
+        stages: List[IngestionStage] = []
+        if ignore_apps:
+            stages.append(SourceAppFilter(ignore_apps.split(",")))
+        if trim:
+            stages.append(WhitespaceTrimmer())
+        if min_length is not None or max_length is not None:
+            stages.append(LengthFilter(min_length, max_length))
+        if ignore_pattern:
+            try:
+                stages.append(PatternFilter(ignore_pattern))
+            except re.error as e:
+                logger.warning(f"Ignoring invalid ignore pattern: {e}")
+        stages.append(SecretDetector(drop=skip_secrets))
+        self.ingestion.configure(stages)
+
+    def _read_ingestion_config(self) -> Tuple[Any, ...]:
+        if not self._settings_service:
+            return ("", False, None, None, "", False)
+        settings = self._settings_service.get_settings()
+        return (
+            settings.get_value("ingestion.ignore_apps") or "",
+            bool(settings.get_value("ingestion.trim_whitespace")),
+            settings.get_value("ingestion.min_length"),
+            settings.get_value("ingestion.max_length"),
+            settings.get_value("ingestion.ignore_pattern") or "",
+            bool(settings.get_value("ingestion.skip_secrets")),
+        )
+
+    def _on_clipboard_change(
+        self,
+        content: str,
+        formats: Sequence[str] = (),
+        source_app: str | None = None,
+        selection: str = CLIPBOARD_SELECTION,
+    ) -> None:
+        if not content:
+            return
+        # Changes that follow the first of a burst within the window are
+        # committed with it, so a burst costs one storage write and one UI
+        # refresh.
+        self._burst.append(Clip(content, formats, source_app, selection))
+        window = self.burst_window
+        if window <= 0:
+            self._commit_burst()
+        elif len(self._burst) == 1:
+            self._loop.call_later(window, self._commit_burst)
+
+    def _commit_burst(self) -> None:
+        clips, self._burst = self._burst, []
+        if not clips:
+            return
+        if len(clips) > 1:
+            logger.debug(f"Committing a burst of {len(clips)} clipboard changes.")
+        clips = self._coalesce_burst(clips)
+        last = clips[-1]
+        copied = last.content
+
+        self._configure_ingestion()
+        # Dropped clips stop here, before any history, storage or UI work.
+        accepted = []
+        for clip in clips:
+            clip = self.ingestion.process(clip)
+            if clip is None:
+                continue
+            if clip.tags:
+                logger.info(f"Clipboard change classified as {', '.join(clip.tags)}.")
+            accepted.append(clip)
+        if not accepted:
+            return
+
+        with self.history.batch():
+            self._apply_settings()
+            for clip in accepted:
+                logger.debug(
+                    f"Clipboard changed on {clip.selection}: '{clip.content[:30]}...'"
+                )
+                item = self.history.add_item(clip.content, clip.selection)
+        # Only the last value can still be on the clipboard to fetch formats
+        # from, and they describe it as copied, so a trimmed clip goes without.
+        if (
+            accepted[-1] is last
+            and last.formats
+            and last.content == copied
+            and self.capture_formatting
+        ):
+            self._loop.offload(
+                CAPTURE_LANE, self._capture_formats, item, copied, list(last.formats)
+            )
+
+    def _coalesce_burst(self, clips: List[Clip]) -> List[Clip]:
+        """Drop the values of a burst that committing would only overwrite.
+
+        A value repeated on the same selection keeps only its last copy, and
+        unless every value is kept, so does each selection. Clears never get
+        here, so a clear-then-write burst is just its write.
+        """
+        keep_values = self.keep_burst_values
+        coalesced: List[Clip | None] = []
+        latest: Dict[str, int] = {}
+        for clip in clips:
+            previous = latest.get(clip.selection)
+            if previous is not None and (
+                not keep_values or coalesced[previous].content == clip.content
+            ):
+                coalesced[previous] = None
+            latest[clip.selection] = len(coalesced)
+            coalesced.append(clip)
+        return [clip for clip in coalesced if clip is not None]
+
+    def _capture_formats(
+        self, item: ClipboardItem, content: str, media_types: List[str]
+    ) -> None:
+        """Fetch the rich formats offered with ``content``, once per change."""
+        formats = {}
+        for media_type in media_types:
+            data = self.clipboard_port.get_format(media_type)
+            if data:
+                formats[media_type] = data
+        # The formats belong to the text only if nothing replaced it meanwhile.
+        if formats and self.clipboard_port.get_content() == content:
+            self._loop.post(self._attach_formats, item, formats)
 
-    def _on_copy_item(self, index: int) -> None:
-        if 0 <= index < len(self._current_filtered_items):
-            content = self._current_filtered_items[index]
-            self.clipboard_port.set_content(content)
-            logger.info(f"Copied item at index {index} to clipboard.")
+    def _attach_formats(self, item: ClipboardItem, formats: Dict[str, bytes]) -> None:
+        # A use or pin meanwhile replaces the item with a copy of the same clip.
+        current = self.history.get_item(item.id)
+        if current is None or current.content_hash != item.content_hash:
+            return
+        # Queued on the storage lane ahead of the journal write below.
+        self._loop.offload(
+            STORAGE_LANE, self.storage_port.save_formats, item.id, formats
+        )
+        self.history.set_formats(item.id, formats)
+        logger.debug(f"Captured formats of item {item.id}: {', '.join(formats)}")
+
+    def _on_clipboard_image(self, data: bytes) -> None:
+        def store() -> None:
+            image = self.image_store.put(data)
+            self._loop.post(self._add_image, image)
+
+        # Writing the file is blocking; the item is added once it is stored.
+        self._loop.offload(STORAGE_LANE, store)
+
+    def _add_image(self, image: ImageInfo) -> None:
+        logger.debug(f"Clipboard image: {image.label}, {image.size} bytes")
+        with self.history.batch():
+            self._apply_settings()
+            self.history.add_image(
+                image.content_hash, image.size, image.label, image.media_type
+            )
+
+    def _on_copy_item(self, item_id: int) -> None:
+        # The clipboard port does not report our own write back, so the item
+        # is moved to the front here instead of by a second ingest.
+        item = self.history.promote(item_id)
+        if item is None:
+            logger.warning(f"Invalid copy item id: {item_id}")
+        elif item.is_image:
+            self._loop.offload(STORAGE_LANE, self._copy_image, item)
         else:
-            logger.warning(f"Invalid copy index: {index}")
+            # Loading the content and writing the clipboard both block.
+            self._loop.offload(STORAGE_LANE, self._copy_text, item)
+
+    def _copy_text(self, item: ClipboardItem) -> None:
+        self.clipboard_port.set_content(item.content)
+        logger.info(f"Copied item {item.id} to clipboard.")
+
+    def _on_copy_rich_item(self, item_id: int) -> None:
+        item = self.history.get_item(item_id)
+        if item is None or not item.formats:
+            self._on_copy_item(item_id)
+            return
+        self.history.promote(item_id)
+        # Formats stay compressed in storage until they are needed here.
+        self._loop.offload(STORAGE_LANE, self._copy_rich, item)
+
+    def _copy_rich(self, item: ClipboardItem) -> None:
+        formats = self.storage_port.load_formats(item.id)
+        self.clipboard_port.set_rich_content(item.content, formats)
+        logger.info(f"Copied item {item.id} to clipboard with formatting.")
+
+    def _copy_image(self, item: ClipboardItem) -> None:
+        data = self.image_store.get(item.content_hash) if self.image_store else None
+        if data is None:
+            logger.warning(f"Image of item {item.id} is not available")
+            return
+        self.clipboard_port.set_image(data)
+        logger.info(f"Copied image item {item.id} to clipboard.")
+
+    def _on_copy_items(self, item_ids: List[int]) -> None:
+        items = [self.history.get_item(item_id) for item_id in item_ids]
+        items = [item for item in items if item is not None and not item.is_image]
+        with self.history.batch():
+            for item in items:
+                self.history.record_use(item.id)
+        if not items:
+            logger.warning(f"No valid items to copy among ids: {item_ids}")
+            return
+        self._loop.offload(STORAGE_LANE, self._copy_texts, items)
+
+    def _copy_texts(self, items: List[ClipboardItem]) -> None:
+        self.clipboard_port.set_content(
+            BULK_COPY_SEPARATOR.join(item.content for item in items)
+        )
+        logger.info(f"Copied {len(items)} items to clipboard.")
+
+    def _on_get_content(self, item_id: int) -> str | None:
+        item = self.history.get_item(item_id)
+        if item is None:
+            logger.warning(f"Invalid content item id: {item_id}")
+            return None
+        return item.content
+
+    def _on_get_thumbnail(self, item_id: int) -> str | None:
+        item = self.history.get_item(item_id)
+        if item is None or not item.is_image or self.image_store is None:
+            return None
+
+        def on_ready(uri: str) -> None:
+            self._loop.offload(RENDER_LANE, self.ui_port.show_thumbnail, item_id, uri)
+
+        return self.image_store.thumbnail(item.content_hash, on_ready)
+
+    def _on_get_image(self, item_id: int) -> Tuple[str, bytes] | None:
+        item = self.history.get_item(item_id)
+        if item is None or not item.is_image or self.image_store is None:
+            return None
+        data = self.image_store.get(item.content_hash)
+        return (item.media_type, data) if data is not None else None
 
     def _on_search(self, query: str) -> None:
-        filtered_items = self.search_port.search(self.history.items, query)
-        self._current_filtered_items = [item.content for item in filtered_items]
-        self.ui_port.show_history(self._current_filtered_items)
-        logger.debug(f"Search query '{query}' returned {len(filtered_items)} results.")
+        items = self._ordered_items()
+        results = (
+            self.search_port.iter_search_contents(self._with_contents(items), query)
+            if query
+            else items
+        )
+        generation = self._next_results_generation()
+        self._history_view = None
+
+        def scan() -> None:
+            total = self._stream_results(results, generation)
+            if total is not None:
+                logger.debug(f"Search query '{query}' returned {total} results.")
+
+        self._loop.offload(RENDER_LANE, scan)
 
     def _on_clear_history(self) -> None:
         self.history.clear()
-        self.storage_port.clear_storage()
-        self._update_ui_display()
         self.ui_port.show_message("Clipboard history cleared!")
         logger.info("Clipboard history cleared.")
 
-    def _on_delete_item(self, index: int) -> None:
-        if 0 <= index < len(self._current_filtered_items):
-            content_to_delete = self._current_filtered_items[index]
+    def _on_delete_item(self, item_id: int) -> None:
+        if self.history.remove_item_by_id(item_id):
+            logger.info(f"Deleted item {item_id}.")
+        else:
+            logger.warning(f"Invalid delete item id: {item_id}")
+
+    def _on_delete_items(self, item_ids: List[int]) -> None:
+        removed = self.history.remove_items_by_ids(item_ids)
+        logger.info(f"Deleted {removed} of {len(item_ids)} selected items.")
+
+    def _on_pin_items(self, item_ids: List[int], pinned: bool = True) -> None:
+        changed = self.history.set_pinned(item_ids, pinned)
+        action = "Pinned" if pinned else "Unpinned"
+        logger.info(f"{action} {changed} of {len(item_ids)} selected items.")
 
-            # Find the actual index in the full history by content
-            actual_index = -1
-            for i, item in enumerate(self.history.items):
-                if item.content == content_to_delete:
-                    actual_index = i
-                    break
+    def _on_history_changes(self, changes: List[HistoryChange]) -> None:
+        self._loop.offload(STORAGE_LANE, self._sync_storage, changes)
+        if self.image_store:
+            self._loop.offload(STORAGE_LANE, self._sync_images, changes)
+        with self._ui_changes_lock:
+            self._ui_changes.extend(changes)
+        self._loop.coalesce("ui", self._refresh_ui)
 
-            if actual_index != -1 and self.history.remove_item_by_index(actual_index):
+    def _sync_storage(self, changes: List[HistoryChange]) -> None:
+        """Apply changes to storage, catching up first if it fell behind."""
+        if not changes:
+            return
+        if changes[0].version != self._storage_version + 1:
+            missed = self.history.changes_since(self._storage_version)
+            if missed is None:
+                logger.warning("Storage fell behind the history journal; resyncing.")
                 self.storage_port.save_history(self.history)
-                self._update_ui_display()
-                logger.info(f"Deleted item at index {index}.")
-            else:
-                logger.warning(f"Failed to delete item at index {index}")
-        else:
-            logger.warning(f"Invalid delete index: {index}")
+                self._storage_version = self.history.version
+                return
+            if not missed:
+                # An earlier catch-up already wrote these changes.
+                return
+            logger.debug(f"Storage catching up from version {self._storage_version}")
+            changes = missed
+
+        if self.storage_port.apply_changes(changes):
+            self._storage_version = changes[-1].version
+
+    def _sync_images(self, changes: List[HistoryChange]) -> None:
+        """Delete the files of image clips that left the history."""
+        for change in changes:
+            if change.kind is ChangeKind.CLEARED:
+                self.image_store.retain(self._image_hashes())
+            elif (
+                change.kind is ChangeKind.REMOVED
+                and change.item.is_image
+                and not self.history.has_content_hash(change.item.content_hash)
+            ):
+                self.image_store.remove(change.item.content_hash)
+
+    def _image_hashes(self) -> List[bytes]:
+        return [item.content_hash for item in self.history.snapshot() if item.is_image]
+
+    def _refresh_ui(self) -> None:
+        """Bring the UI up to date with the changes since it was last updated."""
+        with self._ui_changes_lock:
+            changes, self._ui_changes = self._ui_changes, []
+        view = self._history_view
+        deltas = (
+            view.apply(changes)
+            if view is not None and not self.sort_by_frecency
+            else None
+        )
+        if deltas is None:
+            self._update_ui_display()
+        elif deltas:
+            # Behind any stream already queued, which the deltas build on.
+            self._loop.offload(RENDER_LANE, self.ui_port.apply_history_deltas, deltas)
 
     def _update_ui_display(self) -> None:
-        content_list = self.history.get_content_list()
-        self._current_filtered_items = content_list
-        self.ui_port.show_history(content_list)
+        """Show the whole history again, from a fresh snapshot."""
+        snapshot = self.history.snapshot()
+        if self.sort_by_frecency:
+            self._history_view = None
+            items = snapshot.by_frecency()
+        else:
+            self._history_view = HistoryView(snapshot)
+            items = snapshot.listed()
+        generation = self._next_results_generation()
+        self._loop.offload(RENDER_LANE, self._stream_results, items, generation)
+
+    def _ordered_items(self) -> Iterator[ClipboardItem]:
+        # Scans run on a snapshot, so the monitor thread can keep adding
+        # items while a long search or render is still in progress.
+        # The snapshot was split into pinned and other items when it was
+        # taken, so pinning meanwhile cannot list an item twice or drop it.
+        snapshot = self.history.snapshot()
+        return snapshot.by_frecency() if self.sort_by_frecency else snapshot.listed()
+
+    def _with_contents(
+        self, items: Iterator[ClipboardItem]
+    ) -> Iterator[Tuple[ClipboardItem, str]]:
+        """Pair items with their content, reading stored bodies in batches.
+
+        A scan reads every body once, so going through the per-item loader
+        would cost a query each and churn its cache.
+        """
+        while True:
+            batch = list(islice(items, SEARCH_LOAD_BATCH))
+            if not batch:
+                return
+            stored = [item.id for item in batch if not item.is_loaded]
+            contents = self.storage_port.load_contents(stored) if stored else {}
+            for item in batch:
+                content = contents.get(item.id)
+                yield item, content if content is not None else item.content
+
+    def _next_results_generation(self) -> int:
+        self._results_generation += 1
+        return self._results_generation
+
+    def _stream_results(
+        self, results: Iterator[ClipboardItem], generation: int | None = None
+    ) -> int | None:
+        """Push results to the UI page by page while they are being produced.
+
+        The first page replaces the displayed list as soon as it is filled, the
+        remaining matches are appended as the scan continues. A newer stream,
+        counted from when it was requested, supersedes an older one, which then
+        stops scanning and returns None.
+        """
+        if generation is None:
+            generation = self._next_results_generation()
+
+        # Pushes block on the UI bridge, so no lock is held around them; a
+        # stream superseded during a push stops at its next page.
+        page = list(islice(results, SEARCH_FIRST_PAGE_SIZE))
+        if generation != self._results_generation:
+            return None
+        self.ui_port.show_history(page)
+        total = len(page)
+
+        while True:
+            page = list(islice(results, SEARCH_PAGE_SIZE))
+            if not page:
+                return total
+            if generation != self._results_generation:
+                logger.debug("Result stream superseded by a newer one.")
+                return None
+            self.ui_port.append_history(page)
+            total += len(page)
@@ -0,0 +1,203 @@
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from src.domain.clipboard import (
+    ChangeKind,
+    ClipboardItem,
+    HistoryChange,
+    HistorySnapshot,
+)
+from src.ports.ui_port import DeltaKind, HistoryDelta
+
+# Slots of removed ids a section keeps before compacting, beyond one per id.
+_SPARE_SLOTS = 64
+
+
+class _Section:
+    """Ids of one part of the list, newest first, located in O(log n).
+
+    Ids are kept oldest first, so a new one is appended instead of shifting
+    the others, and a removed one leaves an empty slot until they outnumber
+    the ids. A Fenwick tree over the slots counts the ids up to a slot, which
+    gives an id's position from the front. Only placing an id anywhere but
+    the front rebuilds the section.
+    """
+
+    def __init__(self, newest_first: Iterable[int] = ()):
+        self._rebuild(list(newest_first)[::-1])
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._slot_of
+
+    def newest_first(self) -> Iterator[int]:
+        return (item_id for item_id in reversed(self._slots) if item_id is not None)
+
+    def position(self, item_id: int) -> int:
+        # The ids in later slots are newer, and listed before it.
+        return len(self._slot_of) - self._count(self._slot_of[item_id] + 1)
+
+    def push_front(self, item_id: int) -> None:
+        self._slot_of[item_id] = len(self._slots)
+        self._slots.append(item_id)
+        # A tree node holds the count of the slots back to its lowest set bit.
+        node = len(self._slots)
+        self._tree.append(1 + self._count(node - 1) - self._count(node & (node - 1)))
+
+    def insert(self, item_id: int, position: int) -> None:
+        if position == 0:
+            self.push_front(item_id)
+            return
+        ids = list(self.newest_first())
+        ids.insert(position, item_id)
+        self._rebuild(ids[::-1])
+
+    def remove(self, item_id: int) -> int:
+        """Remove an id listed here; its position before."""
+        position = self.position(item_id)
+        slot = self._slot_of.pop(item_id)
+        self._slots[slot] = None
+        node = slot + 1
+        while node < len(self._tree):
+            self._tree[node] -= 1
+            node += node & -node
+        if len(self._slots) > 2 * len(self._slot_of) + _SPARE_SLOTS:
+            self._rebuild([item_id for item_id in self._slots if item_id is not None])
+        return position
+
+    def clear(self) -> None:
+        self._rebuild([])
+
+    def _rebuild(self, oldest_first: List[int]) -> None:
+        self._slots: List[Optional[int]] = list(oldest_first)
+        self._slot_of: Dict[int, int] = {
+            item_id: slot for slot, item_id in enumerate(oldest_first)
+        }
+        tree = [0] * (len(oldest_first) + 1)
+        for node in range(1, len(tree)):
+            tree[node] += 1
+            parent = node + (node & -node)
+            if parent < len(tree):
+                tree[parent] += tree[node]
+        self._tree = tree
+
+    def _count(self, slots: int) -> int:
+        """How many ids the first ``slots`` slots hold."""
+        count = 0
+        while slots:
+            count += self._tree[slots]
+            slots &= slots - 1
+        return count
+
+
+class HistoryView:
+    """The history in the order the UI lists it, kept current from its changes.
+
+    Pinned items come first, then the others, each newest first, as in
+    ``HistorySnapshot.listed``. The view starts from a snapshot and follows
+    the change journal from there, turning each change into a delta that
+    updates a display of it in place, so a new clip costs one inserted row
+    instead of the whole list. A change costs O(log n) to locate and
+    place its item, except for pinning or unpinning, which places the item
+    by its age in O(n).
+    """
+
+    def __init__(self, snapshot: HistorySnapshot):
+        self.version = snapshot.version
+        self._pinned = _Section(item.id for item in snapshot.pinned)
+        self._unpinned = _Section(item.id for item in snapshot.unpinned)
+        self._items: Dict[int, ClipboardItem] = {
+            item.id: item for item in snapshot.items
+        }
+
+    def __len__(self) -> int:
+        return len(self._pinned) + len(self._unpinned)
+
+    def ids(self) -> List[int]:
+        return [*self._pinned.newest_first(), *self._unpinned.newest_first()]
+
+    def apply(self, changes: Iterable[HistoryChange]) -> Optional[List[HistoryDelta]]:
+        """Deltas for ``changes``, or None if one is missing before them.
+
+        Changes the view already includes are skipped. After None the view
+        is no longer in step with the history and is to be built again.
+        """
+        deltas: List[HistoryDelta] = []
+        for change in changes:
+            if change.version <= self.version:
+                continue
+            if change.version != self.version + 1:
+                return None
+            self.version = change.version
+            deltas.extend(self._apply(change))
+        return deltas
+
+    def _apply(self, change: HistoryChange) -> List[HistoryDelta]:
+        if change.kind is ChangeKind.CLEARED:
+            self._pinned.clear()
+            self._unpinned.clear()
+            self._items.clear()
+            return [HistoryDelta(DeltaKind.RESET)]
+
+        if change.kind is ChangeKind.REMOVED:
+            position = self._take(change.item_id)
+            if position is None:
+                return []
+            return [HistoryDelta(DeltaKind.REMOVE, position, item_id=change.item_id)]
+
+        # The item may have changed again since; its current state is what
+        # the display has to end up showing.
+        item = change.item
+        if change.kind is ChangeKind.UPDATED:
+            section = self._locate(item.id)
+            if section is None:
+                return []
+            if (section is self._pinned) == item.pinned:
+                self._items[item.id] = item
+                position = self._offset(section) + section.position(item.id)
+                return [HistoryDelta(DeltaKind.REPLACE, position, (item,))]
+            # Pinned or unpinned: it goes to its place in time in the other part.
+            origin = self._take(item.id)
+            position = self._put(item, self._newer_count(item))
+            return [HistoryDelta(DeltaKind.MOVE, position, (item,), item.id, origin)]
+
+        # Added, or copied again: to the front of its part of the list.
+        origin = self._take(item.id)
+        position = self._put(item, 0)
+        if origin is None:
+            return [HistoryDelta(DeltaKind.INSERT, position, (item,))]
+        return [HistoryDelta(DeltaKind.MOVE, position, (item,), item.id, origin)]
+
+    def _locate(self, item_id: int) -> Optional[_Section]:
+        if item_id not in self._items:
+            return None
+        return self._pinned if item_id in self._pinned else self._unpinned
+
+    def _offset(self, section: _Section) -> int:
+        return 0 if section is self._pinned else len(self._pinned)
+
+    def _take(self, item_id: int) -> Optional[int]:
+        """Remove an id; its position before, or None if it was not listed."""
+        section = self._locate(item_id)
+        if section is None:
+            return None
+        index = section.remove(item_id)
+        del self._items[item_id]
+        return self._offset(section) + index
+
+    def _put(self, item: ClipboardItem, index: int) -> int:
+        section = self._pinned if item.pinned else self._unpinned
+        section.insert(item.id, index)
+        self._items[item.id] = item
+        return self._offset(section) + index
+
+    def _newer_count(self, item: ClipboardItem) -> int:
+        # As ClipboardHistory places a re-pinned item: after every newer one.
+        section = self._pinned if item.pinned else self._unpinned
+        count = 0
+        for other_id in section.newest_first():
+            if self._items[other_id].created_timestamp <= item.created_timestamp:
+                break
+            count += 1
+        return count
@@ -0,0 +1,244 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+import math
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from loguru import logger
+
+from src.ports.clipboard_port import CLIPBOARD_SELECTION
+
+
+@dataclass
+class Clip:
+    """A clipboard change on its way into the history."""
+
+    content: str
+    formats: Sequence[str] = ()
+    # Application that put the clip on the clipboard, where the platform tells.
+    source_app: Optional[str] = None
+    # Selection the clip was seen on.
+    selection: str = CLIPBOARD_SELECTION
+    # Labels given by classifying stages, such as the kind of a secret.
+    tags: List[str] = field(default_factory=list)
+
+
+class IngestionStage(ABC):
+    name = "stage"
+
+    @abstractmethod
+    def process(self, clip: Clip) -> Optional[Clip]:
+        """The clip to pass on, possibly changed, or None to drop it."""
+
+
+@dataclass(frozen=True)
+class StageStats:
+    name: str
+    processed: int
+    dropped: int
+    mean_latency: float
+    max_latency: float
+
+
+class _StageCounters:
+    __slots__ = ("processed", "dropped", "total_latency", "max_latency")
+
+    def __init__(self):
+        self.processed = 0
+        self.dropped = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+
+class IngestionPipeline:
+    """Ordered filters and transforms a clip passes before it is stored.
+
+    Stages run in the order given, so cheap ones belong first: the first
+    stage that drops a clip ends the run, and a dropped clip never reaches
+    the history, storage or the UI. Each stage's latency and drop count are
+    kept by stage name and survive ``configure``.
+    """
+
+    def __init__(self, stages: Iterable[IngestionStage] = ()):
+        self._stages: List[IngestionStage] = []
+        self._counters: Dict[str, _StageCounters] = {}
+        self.configure(stages)
+
+    @property
+    def stages(self) -> List[IngestionStage]:
+        return list(self._stages)
+
+    def configure(self, stages: Iterable[IngestionStage]) -> None:
+        self._stages = list(stages)
+        for stage in self._stages:
+            self._counters.setdefault(stage.name, _StageCounters())
+
+    def process(self, clip: Clip) -> Optional[Clip]:
+        for stage in self._stages:
+            counters = self._counters[stage.name]
+            started = time.perf_counter()
+            result = stage.process(clip)
+            latency = time.perf_counter() - started
+            counters.processed += 1
+            counters.total_latency += latency
+            counters.max_latency = max(counters.max_latency, latency)
+            if result is None:
+                counters.dropped += 1
+                logger.debug(f"Clip dropped by the {stage.name} stage.")
+                return None
+            clip = result
+        return clip
+
+    def stats(self) -> List[StageStats]:
+        return [
+            StageStats(
+                name=name,
+                processed=counters.processed,
+                dropped=counters.dropped,
+                mean_latency=(
+                    counters.total_latency / counters.processed
+                    if counters.processed
+                    else 0.0
+                ),
+                max_latency=counters.max_latency,
+            )
+            for name, counters in self._counters.items()
+        ]
+
+
+class SourceAppFilter(IngestionStage):
+    """Drops clips copied from the listed applications.
+
+    Names compare case-insensitively and without an ``.exe`` suffix. Clips
+    whose source is unknown pass.
+    """
+
+    name = "source_app"
+
+    def __init__(self, apps: Iterable[str]):
+        self._apps = {_app_key(app) for app in apps if app.strip()}
+
+    def process(self, clip: Clip) -> Optional[Clip]:
+        if clip.source_app is not None and _app_key(clip.source_app) in self._apps:
+            return None
+        return clip
+
+
+class WhitespaceTrimmer(IngestionStage):
+    """Strips leading and trailing whitespace; drops clips left empty."""
+
+    name = "trim"
+
+    def process(self, clip: Clip) -> Optional[Clip]:
+        content = clip.content.strip()
+        if not content:
+            return None
+        if len(content) != len(clip.content):
+            clip.content = content
+        return clip
+
+
+class LengthFilter(IngestionStage):
+    """Drops clips shorter or longer than the given number of characters."""
+
+    name = "length"
+
+    def __init__(
+        self, min_chars: Optional[int] = None, max_chars: Optional[int] = None
+    ):
+        self._min_chars = min_chars
+        self._max_chars = max_chars
+
+    def process(self, clip: Clip) -> Optional[Clip]:
+        length = len(clip.content)
+        if self._min_chars is not None and length < self._min_chars:
+            return None
+        if self._max_chars is not None and length > self._max_chars:
+            return None
+        return clip
+
+
+class PatternFilter(IngestionStage):
+    """Drops clips in which the regular expression matches anywhere."""
+
+    name = "pattern"
+
+    def __init__(self, pattern: str):
+        self._pattern = re.compile(pattern)
+
+    def process(self, clip: Clip) -> Optional[Clip]:
+        return None if self._pattern.search(clip.content) else clip
+
+
+# Token formats of common services, each a named group of one alternation so
+# a clip is scanned once.
+_SECRET_FORMATS = re.compile(
+    r"(?P<private_key>-----BEGIN (?:[A-Z]+ )*PRIVATE KEY-----)"
+    r"|(?P<aws_access_key>\b(?:AKIA|ASIA)[0-9A-Z]{16}\b)"
+    r"|(?P<github_token>\b(?:gh[pousr]_[A-Za-z0-9]{36,}|github_pat_\w{22,})\b)"
+    r"|(?P<slack_token>\bxox[abprs]-[A-Za-z0-9-]{10,})"
+    r"|(?P<stripe_key>\b[rs]k_live_[A-Za-z0-9]{20,})"
+    r"|(?P<google_api_key>\bAIza[0-9A-Za-z_-]{35}\b)"
+    r"|(?P<jwt>\beyJ[A-Za-z0-9_-]{8,}\.eyJ[A-Za-z0-9_-]{8,}\.[A-Za-z0-9_-]{8,})"
+)
+# A lone token that mixes letter cases and digits at this entropy is far more
+# likely a password or key than a word, a hash or an id.
+_TOKEN_CHARS = (12, 128)
+_MIN_TOKEN_ENTROPY_BITS = 3.5
+
+
+class SecretDetector(IngestionStage):
+    """Tags clips that look like credentials, and drops them if asked to.
+
+    The tag is ``secret:<kind>``, e.g. ``secret:aws_access_key`` or
+    ``secret:password`` for a lone high-entropy token.
+    """
+
+    name = "secrets"
+
+    def __init__(self, drop: bool = False):
+        self._drop = drop
+
+    def process(self, clip: Clip) -> Optional[Clip]:
+        kind = secret_kind(clip.content)
+        if kind is None:
+            return clip
+        if self._drop:
+            return None
+        clip.tags.append(f"secret:{kind}")
+        return clip
+
+
+def secret_kind(content: str) -> Optional[str]:
+    """Kind of credential ``content`` looks like, or None."""
+    match = _SECRET_FORMATS.search(content)
+    if match is not None:
+        return match.lastgroup
+    token = content.strip()
+    if _TOKEN_CHARS[0] <= len(token) <= _TOKEN_CHARS[1] and _is_password_like(token):
+        return "password"
+    return None
+
+
+def _is_password_like(token: str) -> bool:
+    if any(char.isspace() for char in token):
+        return False
+    if not (
+        any(char.islower() for char in token)
+        and any(char.isupper() for char in token)
+        and any(char.isdigit() for char in token)
+    ):
+        return False
+    counts: Dict[str, int] = {}
+    for char in token:
+        counts[char] = counts.get(char, 0) + 1
+    entropy = -sum(
+        count / len(token) * math.log2(count / len(token)) for count in counts.values()
+    )
+    return entropy >= _MIN_TOKEN_ENTROPY_BITS
+
+
+def _app_key(app: str) -> str:
+    key = app.strip().casefold()
+    return key[: -len(".exe")] if key.endswith(".exe") else key
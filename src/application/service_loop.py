@@ -0,0 +1,261 @@
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from loguru import logger
+
+SLOW_HANDLER_SECONDS = 0.1
+
+_STOP = object()
+
+# Handler, its arguments and when it was posted.
+_Message = Tuple[Any, tuple, float]
+
+
+@dataclass(frozen=True)
+class LoopMetrics:
+    queue_depth: int
+    max_queue_depth: int
+    handled: int
+    mean_latency: float
+    max_latency: float
+    max_wait: float
+
+
+class ServiceLoop:
+    """Asyncio loop on a dedicated thread that owns a service's state.
+
+    Callbacks arriving on other threads are posted as messages and run one
+    at a time by a single owner task, so handlers never race each other.
+    Blocking work is offloaded to named lanes, each a single worker executor,
+    which keeps e.g. storage writes in submission order without stalling the
+    owner. ``coalesce`` collapses repeated requests, such as UI refreshes,
+    that arrive before the first one has run, and ``call_later`` posts a
+    handler once a delay has passed.
+
+    Until ``start`` is called, and after ``stop``, everything runs inline on
+    the calling thread.
+    """
+
+    def __init__(self, name: str = "service-loop"):
+        self._name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._lanes: Dict[str, ThreadPoolExecutor] = {}
+        self._coalesced: Set[str] = set()
+        # Timers of ``call_later`` that have not fired yet; only touched on
+        # the loop thread.
+        self._delayed: Dict[int, Tuple[asyncio.TimerHandle, _Message]] = {}
+        self._next_delayed = 0
+        self._lock = threading.Lock()
+        self._max_queue_depth = 0
+        self._handled = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+        self._max_wait = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        return self._loop is not None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            logger.warning(f"{self._name} already running.")
+            return
+        self._ready.clear()
+        self._thread = threading.Thread(
+            target=self._run_thread, name=self._name, daemon=True
+        )
+        self._thread.start()
+        self._ready.wait()
+        logger.debug(f"{self._name} started.")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Handle the messages already posted, then stop and drain all lanes.
+
+        Handlers waiting on ``call_later`` run right away instead of being lost,
+        as do handlers posted from other threads while the stop is draining;
+        the latter are logged since they raced the shutdown.
+        """
+        loop = self._loop
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(self._enqueue, (_STOP, (), time.perf_counter()))
+        self._thread.join(timeout)
+        with self._lock:
+            lanes, self._lanes = list(self._lanes.values()), {}
+        for lane in lanes:
+            lane.shutdown(wait=True)
+        logger.debug(f"{self._name} stopped: {self.metrics()}")
+
+    def post(self, handler: Callable[..., Any], *args: Any) -> None:
+        """Run ``handler(*args)`` on the owner task."""
+        message = (handler, args, time.perf_counter())
+        if not self._send(self._enqueue, message):
+            handler(*args)
+
+    def coalesce(self, key: str, handler: Callable[[], Any]) -> None:
+        """Post ``handler`` unless one for ``key`` is already waiting to run."""
+        if self._loop is None:
+            handler()
+            return
+        with self._lock:
+            if key in self._coalesced:
+                return
+            self._coalesced.add(key)
+
+        def run() -> None:
+            with self._lock:
+                self._coalesced.discard(key)
+            handler()
+
+        self.post(run)
+
+    def call_later(self, delay: float, handler: Callable[..., Any], *args: Any) -> None:
+        """Post ``handler(*args)`` after ``delay`` seconds; inline if not running."""
+        loop = self._loop
+        if loop is None:
+            handler(*args)
+            return
+
+        def schedule() -> None:
+            # Timed from when it is due, so the wait metric leaves out the delay.
+            message = (handler, args, time.perf_counter() + delay)
+            key = self._next_delayed
+            self._next_delayed += 1
+            self._delayed[key] = (loop.call_later(delay, self._fire, key), message)
+
+        if threading.current_thread() is self._thread:
+            # A stop already queued must find the timer when it gets to it.
+            schedule()
+            return
+        if not self._send(schedule):
+            handler(*args)
+
+    def offload(
+        self, lane: str, func: Callable[..., Any], *args: Any
+    ) -> Optional[Future]:
+        """Run blocking ``func(*args)`` on ``lane``; inline if not running."""
+        if self._loop is None:
+            func(*args)
+            return None
+        with self._lock:
+            executor = self._lanes.get(lane)
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix=f"{self._name}-{lane}"
+                )
+                self._lanes[lane] = executor
+        future = executor.submit(func, *args)
+        future.add_done_callback(self._log_failure)
+        return future
+
+    def metrics(self) -> LoopMetrics:
+        return LoopMetrics(
+            queue_depth=self._queue.qsize() if self._queue else 0,
+            max_queue_depth=self._max_queue_depth,
+            handled=self._handled,
+            mean_latency=self._total_latency / self._handled if self._handled else 0.0,
+            max_latency=self._max_latency,
+            max_wait=self._max_wait,
+        )
+
+    def _send(self, callback: Callable[..., Any], *args: Any) -> bool:
+        """Schedule ``callback`` on the loop; False once the loop is gone.
+
+        Holding the lock means the loop thread cannot retire the loop between
+        the check and the call, so whatever is sent here reaches ``_late``.
+        """
+        with self._lock:
+            loop = self._loop
+            if loop is None:
+                return False
+            loop.call_soon_threadsafe(callback, *args)
+            return True
+
+    def _run_thread(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._queue = asyncio.Queue()
+        self._loop = loop
+        self._ready.set()
+        try:
+            loop.run_until_complete(self._owner())
+        finally:
+            with self._lock:
+                self._loop = None
+            # Posts sent while the owner drained sit in the loop's ready queue.
+            loop.run_until_complete(self._late())
+            loop.close()
+
+    def _fire(self, key: int) -> None:
+        _, message = self._delayed.pop(key)
+        self._enqueue(message)
+
+    def _enqueue(self, message: _Message) -> None:
+        self._queue.put_nowait(message)
+        self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+
+    async def _owner(self) -> None:
+        while True:
+            handler, args, posted_at = await self._queue.get()
+            if handler is _STOP:
+                break
+            self._handle(handler, args, posted_at)
+        # Handlers whose timer fired after the stop was posted, or is still
+        # waiting, run now rather than being lost.
+        self._drain()
+
+    async def _late(self) -> None:
+        # Callbacks already scheduled with the loop have run by the time this
+        # starts, so their messages are in the queue or waiting on a timer.
+        late = self._drain()
+        if late:
+            logger.warning(
+                f"{self._name} ran {late} handler(s) posted while it was stopping."
+            )
+
+    def _drain(self) -> int:
+        drained = 0
+        while not self._queue.empty() or self._delayed:
+            while not self._queue.empty():
+                self._handle(*self._queue.get_nowait())
+                drained += 1
+            while self._delayed:
+                key = next(iter(self._delayed))
+                timer, message = self._delayed.pop(key)
+                timer.cancel()
+                self._handle(*message)
+                drained += 1
+        return drained
+
+    def _handle(
+        self, handler: Callable[..., Any], args: tuple, posted_at: float
+    ) -> None:
+        started = time.perf_counter()
+        try:
+            handler(*args)
+        except Exception as e:
+            logger.exception(f"Error in {self._name} handler: {e}")
+        finished = time.perf_counter()
+        self._record(started - posted_at, finished - started, handler)
+
+    def _record(self, wait: float, latency: float, handler: Callable) -> None:
+        self._handled += 1
+        self._total_latency += latency
+        self._max_latency = max(self._max_latency, latency)
+        self._max_wait = max(self._max_wait, wait)
+        if latency > SLOW_HANDLER_SECONDS:
+            name = getattr(handler, "__name__", repr(handler))
+            logger.warning(f"Slow {self._name} handler {name}: {latency:.3f}s")
+
+    def _log_failure(self, future: Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logger.opt(exception=future.exception()).error(
+                f"Error in {self._name} background task"
+            )
@@ -1,4 +1,4 @@
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List
 
 from loguru import logger
 
@@ -10,6 +10,7 @@ class SettingsService(SettingsServicePort):
     def __init__(self, repository: SettingsRepositoryPort, settings: Settings):
         self._repository = repository
         self._settings = settings
+        self._change_callbacks: List[Callable[[List[str]], None]] = []
         self._load_from_repository()
 
     def _load_from_repository(self) -> None:
@@ -32,6 +33,7 @@ class SettingsService(SettingsServicePort):
         success = self._settings.set_value(key, value)
         if success:
             logger.debug(f"Setting '{key}' updated to '{value}'")
+            self._notify_changed([key])
         else:
             logger.warning(f"Failed to update setting '{key}' to '{value}'")
         return success
@@ -40,6 +42,7 @@ class SettingsService(SettingsServicePort):
         results = self._settings.update_values(values)
         successful_updates = sum(1 for success in results.values() if success)
         logger.debug(f"Updated {successful_updates}/{len(values)} settings")
+        self._notify_changed([key for key, success in results.items() if success])
         return results
 
     def save_settings(self) -> bool:
@@ -55,7 +58,17 @@ class SettingsService(SettingsServicePort):
         try:
             self._load_from_repository()
             logger.debug("Settings reloaded from repository")
+            self._notify_changed(list(self._settings.get_all_values()))
             return True
         except Exception as e:
             logger.error(f"Failed to reload settings: {e}")
             return False
+
+    def register_change_callback(self, callback: Callable[[List[str]], None]) -> None:
+        self._change_callbacks.append(callback)
+
+    def _notify_changed(self, keys: List[str]) -> None:
+        if not keys:
+            return
+        for callback in self._change_callbacks:
+            callback(keys)
@@ -1,4 +1,12 @@
 from .clipboard_history import ClipboardHistory
 from .clipboard_item import ClipboardItem
+from .history_change import ChangeKind, HistoryChange
+from .history_snapshot import HistorySnapshot
 
-__all__ = ["ClipboardItem", "ClipboardHistory"]
+__all__ = [
+    "ClipboardItem",
+    "ClipboardHistory",
+    "ChangeKind",
+    "HistoryChange",
+    "HistorySnapshot",
+]
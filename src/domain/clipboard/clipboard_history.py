@@ -1,43 +1,541 @@
-from dataclasses import dataclass
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List
+from itertools import chain, islice
+import threading
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 
-from src.domain.clipboard.clipboard_item import ClipboardItem
+from src.domain.clipboard.clipboard_item import (
+    DEFAULT_SOURCE,
+    ClipboardItem,
+    hash_content,
+    to_timestamp,
+)
+from src.domain.clipboard.frecency_index import FrecencyIndex
+from src.domain.clipboard.history_change import ChangeKind, HistoryChange
+from src.domain.clipboard.history_snapshot import HistorySnapshot
+from src.domain.clipboard.near_duplicate_index import (
+    NearDuplicateIndex,
+    content_signature,
+)
+
+DEFAULT_MAX_ITEMS = 1000
+JOURNAL_CAPACITY = 1024
+
+ChangeListener = Callable[[List[HistoryChange]], None]
 
 
-@dataclass
 class ClipboardHistory:
-    items: List[ClipboardItem]
-    max_items: int = 1000
+    """Most-recent-first clipboard history with O(1) dedup and eviction.
 
-    def __post_init__(self):
-        if self.max_items <= 0:
-            raise ValueError("Max items must be positive")
+    Items are kept in ordered maps keyed by their stable id, oldest first, so
+    membership checks, move-to-front and tail eviction never walk the list.
+    A secondary index maps content hashes to ids. Pinned items have a map of
+    their own, which keeps them out of the way of eviction. Items without an
+    id are assigned the next free one, which storage uses as the row id.
+
+    Besides ``max_items`` the history can be bounded by ``max_bytes``, the
+    total UTF-8 size of all contents. The running total is kept up to date on
+    every insert and removal, and the oldest items are evicted until both
+    limits hold. The newest item is never evicted, even if it alone exceeds
+    the byte budget.
+
+    A frecency index over all items is maintained incrementally, so
+    ``iter_by_frecency`` and ``top_by_frecency`` never sort the history.
+
+    With ``collapse_near_duplicates`` a new clip that is a near-duplicate of an
+    existing one (see ``near_duplicate_index``) replaces it in place: it keeps
+    the id and usage of the old entry and bumps its ``variant_count``. The
+    near-duplicate index, and with it every content signature, only exists
+    while collapsing is on. ``signature_loader`` may supply the signatures
+    storage keeps, by id, when the index is built.
+
+    Pinned items count towards the limits but are skipped by eviction.
+
+    Every mutation is recorded in a change journal (see ``HistoryChange``)
+    with a monotonically increasing ``version``. Subscribers receive the
+    changes of each mutation, or of a whole ``batch()``, in one call and can
+    apply them in O(delta). A consumer that missed changes can catch up with
+    ``changes_since`` as long as they are still in the bounded journal.
+
+    The history may be mutated from several threads. Mutations hold a short
+    internal lock; subscribers are notified after it is released, one batch
+    at a time and in version order. Readers on other threads use
+    ``snapshot()``, an immutable view that is built at most once per version
+    and never blocks on a search or on another reader. Items are never
+    changed once they are in the history: a use, pin or new format replaces
+    the entry with a changed copy, so snapshots keep the item they had.
+    """
+
+    def __init__(
+        self,
+        items: Optional[Iterable[ClipboardItem]] = None,
+        max_items: int = DEFAULT_MAX_ITEMS,
+        max_bytes: Optional[int] = None,
+        collapse_near_duplicates: bool = False,
+        signature_loader: Optional[Callable[[], Dict[int, int]]] = None,
+    ):
+        self._validate_limits(max_items, max_bytes)
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._unpinned: OrderedDict[int, ClipboardItem] = OrderedDict()
+        self._pinned: OrderedDict[int, ClipboardItem] = OrderedDict()
+        self._newest_id: Optional[int] = None
+        self._ids_by_hash: Dict[bytes, int] = {}
+        self._total_bytes = 0
+        self._frecency = FrecencyIndex()
+        self._near_duplicates: Optional[NearDuplicateIndex] = None
+        self._signature_loader = signature_loader
+        self._version = 0
+        self._journal: Deque[HistoryChange] = deque(maxlen=JOURNAL_CAPACITY)
+        self._pending: List[HistoryChange] = []
+        self._batch_depth = 0
+        self._listeners: List[ChangeListener] = []
+        self._lock = threading.RLock()
+        self._publish_lock = threading.RLock()
+        self._snapshot: Optional[HistorySnapshot] = None
+        items = list(items or [])
+        self._next_id = max((item.id or 0 for item in items), default=0) + 1
+        # Incoming items are newest first; insert oldest first so the first
+        # occurrence of duplicated content wins, as it did with the list.
+        for item in reversed(items):
+            existing_id = self._ids_by_hash.get(item.content_hash)
+            if existing_id is not None:
+                self._discard(existing_id)
+            if item.id is None or self._get(item.id) is not None:
+                item.id = self._allocate_id()
+            self._insert(item)
         self._enforce_limit()
+        self.collapse_near_duplicates = collapse_near_duplicates
+        # The initial contents are the baseline, not changes.
+        self._pending.clear()
+        self._journal.clear()
+        self._version = 0
+
+    @property
+    def items(self) -> List[ClipboardItem]:
+        return list(self.snapshot().items)
+
+    @property
+    def collapse_near_duplicates(self) -> bool:
+        return self._near_duplicates is not None
+
+    @collapse_near_duplicates.setter
+    def collapse_near_duplicates(self, enabled: bool) -> None:
+        with self._lock:
+            if enabled == self.collapse_near_duplicates:
+                return
+            if not enabled:
+                self._near_duplicates = None
+                return
+            # Stored signatures spare reading back the bodies of lazy items.
+            stored = self._signature_loader() if self._signature_loader else {}
+            index = NearDuplicateIndex()
+            for item in self._all_items():
+                if not item.is_image:
+                    signature = stored.get(item.id)
+                    if signature is None:
+                        signature = content_signature(item.content, item.size)
+                    index.add(item.id, signature, item.size)
+            self._near_duplicates = index
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
 
-    def add_item(self, content: str) -> None:
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def snapshot(self) -> HistorySnapshot:
+        """Immutable view of the current version, shared until the next change."""
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self._version:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != self._version:
+                pinned = tuple(reversed(self._pinned.values()))
+                unpinned = tuple(reversed(self._unpinned.values()))
+                snapshot = HistorySnapshot(
+                    self._version,
+                    self._merge_by_time(pinned, unpinned),
+                    pinned,
+                    unpinned,
+                    self._frecency.copy(),
+                )
+                self._snapshot = snapshot
+            return snapshot
+
+    def subscribe(self, listener: ChangeListener) -> None:
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: ChangeListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def changes_since(self, version: int) -> Optional[List[HistoryChange]]:
+        """Changes after ``version``, or None if they left the journal."""
+        with self._lock:
+            if version >= self._version:
+                return []
+            if not self._journal or self._journal[0].version > version + 1:
+                return None
+            return [change for change in self._journal if change.version > version]
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Apply the mutations inside atomically and deliver them together."""
+        outermost = False
+        try:
+            with self._lock:
+                self._batch_depth += 1
+                try:
+                    yield
+                finally:
+                    self._batch_depth -= 1
+                    outermost = not self._batch_depth
+        finally:
+            # Deliver outside the lock so slow subscribers never block writers
+            # on other threads or readers building a snapshot.
+            if outermost:
+                self._publish()
+
+    def __len__(self) -> int:
+        return len(self._unpinned) + len(self._pinned)
+
+    def __iter__(self) -> Iterator[ClipboardItem]:
+        return iter(self.snapshot())
+
+    def __contains__(self, content: str) -> bool:
+        return hash_content(content) in self._ids_by_hash
+
+    def has_content_hash(self, content_hash: bytes) -> bool:
+        return content_hash in self._ids_by_hash
+
+    def add_item(
+        self, content: str, source: str = DEFAULT_SOURCE
+    ) -> Optional[ClipboardItem]:
         if not content:
-            return
+            return None
+        with self.batch():
+            return self._add_item(
+                ClipboardItem(content=content, created_at=datetime.now(), source=source)
+            )
 
-        self.items = [item for item in self.items if item.content != content]
+    def add_image(
+        self,
+        content_hash: bytes,
+        size: int,
+        label: str,
+        media_type: str = "image/png",
+    ) -> ClipboardItem:
+        """Add an image clip whose data is kept elsewhere under ``content_hash``."""
+        with self.batch():
+            return self._add_item(
+                ClipboardItem.image(
+                    content_hash, size, label, datetime.now(), media_type
+                )
+            )
 
-        new_item = ClipboardItem(content=content, created_at=datetime.now())
-        self.items.insert(0, new_item)
+    def _add_item(self, new_item: ClipboardItem) -> ClipboardItem:
+        existing_id = self._ids_by_hash.get(new_item.content_hash)
+        collapsed = False
+        signature = None
+        if self._near_duplicates is not None and not new_item.is_image:
+            signature = content_signature(new_item.content, new_item.size)
+            if existing_id is None:
+                existing_id = self._near_duplicates.find(signature, new_item.size)
+                collapsed = existing_id is not None
+        if existing_id is not None:
+            existing = self._discard(existing_id)
+            new_item.inherit_usage(existing)
+            new_item.variant_count = existing.variant_count + int(collapsed)
+            if not collapsed:
+                # Same text: formatting captured earlier still applies.
+                new_item.formats = existing.formats
+            new_item.id = existing_id
+            self._insert(new_item, signature)
+            self._record(ChangeKind.MOVED, new_item.id, new_item)
+        else:
+            new_item.id = self._allocate_id()
+            self._insert(new_item, signature)
+            self._record(ChangeKind.ADDED, new_item.id, new_item)
 
         self._enforce_limit()
+        return new_item
+
+    def get_item(self, item_id: int) -> Optional[ClipboardItem]:
+        return self._get(item_id)
+
+    def record_use(
+        self, item_id: int, when: Optional[datetime] = None
+    ) -> Optional[ClipboardItem]:
+        with self.batch():
+            item = self._get(item_id)
+            if item is None:
+                return None
+            item = self._swap_in_copy(item)
+            item.record_use(to_timestamp(when or datetime.now()))
+            self._frecency.update(item.id, item.frecency)
+            self._record(ChangeKind.UPDATED, item.id, item)
+            return item
+
+    def promote(
+        self, item_id: int, when: Optional[datetime] = None
+    ) -> Optional[ClipboardItem]:
+        """Move an item to the front as if copied again, counting one use."""
+        with self.batch():
+            item = self._get(item_id)
+            if item is None:
+                return None
+            item = self._swap_in_copy(item)
+            timestamp = to_timestamp(when or datetime.now())
+            # Counted first: an unused item derives its frecency from its
+            # creation time.
+            item.record_use(timestamp)
+            item.created_timestamp = timestamp
+            self._order_of(item).move_to_end(item_id)
+            self._newest_id = item_id
+            self._frecency.update(item.id, item.frecency)
+            self._record(ChangeKind.MOVED, item.id, item)
+            return item
+
+    def set_pinned(self, item_ids: Iterable[int], pinned: bool = True) -> int:
+        """Pin or unpin items as one batch; return how many changed."""
+        changed = 0
+        with self.batch():
+            for item_id in item_ids:
+                item = self._get(item_id)
+                if item is None or item.pinned == pinned:
+                    continue
+                self._order_of(item).pop(item_id)
+                item = item.copy()
+                item.pinned = pinned
+                self._insert_by_time(self._order_of(item), item)
+                self._record(ChangeKind.UPDATED, item.id, item)
+                changed += 1
+            if not pinned:
+                self._enforce_limit()
+        return changed
+
+    def set_formats(self, item_id: int, formats: Iterable[str]) -> bool:
+        """Record which rich formats are stored for an item."""
+        with self.batch():
+            item = self._get(item_id)
+            if item is None:
+                return False
+            item = self._swap_in_copy(item)
+            item.formats = tuple(formats)
+            self._record(ChangeKind.UPDATED, item.id, item)
+            return True
+
+    def iter_by_frecency(self) -> Iterator[ClipboardItem]:
+        for item_id in self._frecency:
+            item = self._get(item_id)
+            if item is not None:
+                yield item
+
+    def top_by_frecency(self, count: int) -> List[ClipboardItem]:
+        with self._lock:
+            return list(islice(self.iter_by_frecency(), count))
+
+    def set_limits(self, max_items: int, max_bytes: Optional[int] = None) -> None:
+        self._validate_limits(max_items, max_bytes)
+        with self.batch():
+            self.max_items = max_items
+            self.max_bytes = max_bytes
+            self._enforce_limit()
 
     def clear(self) -> None:
-        self.items.clear()
+        with self.batch():
+            self._unpinned.clear()
+            self._pinned.clear()
+            self._newest_id = None
+            self._ids_by_hash.clear()
+            self._total_bytes = 0
+            self._frecency.clear()
+            if self._near_duplicates is not None:
+                self._near_duplicates.clear()
+            self._record(ChangeKind.CLEARED)
 
-    def remove_item_by_index(self, index: int) -> bool:
-        if 0 <= index < len(self.items):
-            self.items.pop(index)
+    def remove_item(self, item: ClipboardItem) -> bool:
+        return self.remove_item_by_id(item.id)
+
+    def remove_item_by_id(self, item_id: int) -> bool:
+        with self.batch():
+            item = self._discard(item_id)
+            if item is None:
+                return False
+            self._record(ChangeKind.REMOVED, item_id, item)
             return True
+
+    def remove_items_by_ids(self, item_ids: Iterable[int]) -> int:
+        """Remove items as one batch; return how many were removed."""
+        removed = 0
+        with self.batch():
+            for item_id in item_ids:
+                item = self._discard(item_id)
+                if item is not None:
+                    self._record(ChangeKind.REMOVED, item_id, item)
+                    removed += 1
+        return removed
+
+    def remove_content(self, content: str) -> bool:
+        item_id = self._ids_by_hash.get(hash_content(content))
+        return item_id is not None and self.remove_item_by_id(item_id)
+
+    def remove_item_by_index(self, index: int) -> bool:
+        items = self.snapshot().items
+        if 0 <= index < len(items):
+            return self.remove_item(items[index])
         return False
 
     def get_content_list(self) -> List[str]:
-        return [item.content for item in self.items]
+        return [item.content for item in self]
+
+    def _allocate_id(self) -> int:
+        item_id = self._next_id
+        self._next_id += 1
+        return item_id
+
+    def _get(self, item_id: int) -> Optional[ClipboardItem]:
+        item = self._unpinned.get(item_id)
+        return item if item is not None else self._pinned.get(item_id)
+
+    def _order_of(self, item: ClipboardItem) -> OrderedDict[int, ClipboardItem]:
+        return self._pinned if item.pinned else self._unpinned
+
+    def _all_items(self) -> Iterator[ClipboardItem]:
+        return chain(self._unpinned.values(), self._pinned.values())
+
+    @staticmethod
+    def _merge_by_time(
+        pinned: Tuple[ClipboardItem, ...], unpinned: Tuple[ClipboardItem, ...]
+    ) -> Tuple[ClipboardItem, ...]:
+        """All items newest first, pinned ones at their place in time."""
+        if not pinned:
+            return unpinned
+        parts: List[Tuple[ClipboardItem, ...]] = []
+        start = 0
+        for item in pinned:
+            position = bisect_left(
+                unpinned,
+                -item.created_timestamp,
+                lo=start,
+                key=lambda other: -other.created_timestamp,
+            )
+            parts.append(unpinned[start:position])
+            parts.append((item,))
+            start = position
+        parts.append(unpinned[start:])
+        return tuple(chain.from_iterable(parts))
+
+    @staticmethod
+    def _insert_by_time(
+        order: OrderedDict[int, ClipboardItem], item: ClipboardItem
+    ) -> None:
+        """Put ``item`` at its place in time; only newer items are moved."""
+        newer = []
+        for other_id in reversed(order):
+            if order[other_id].created_timestamp <= item.created_timestamp:
+                break
+            newer.append(other_id)
+        order[item.id] = item
+        for other_id in reversed(newer):
+            order.move_to_end(other_id)
+
+    def _swap_in_copy(self, item: ClipboardItem) -> ClipboardItem:
+        """Put a copy of ``item`` in its place, to change; return the copy."""
+        copy = item.copy()
+        self._order_of(item)[item.id] = copy
+        return copy
+
+    def _insert(self, item: ClipboardItem, signature: Optional[int] = None) -> None:
+        self._order_of(item)[item.id] = item
+        self._newest_id = item.id
+        self._ids_by_hash[item.content_hash] = item.id
+        self._total_bytes += item.size
+        self._frecency.update(item.id, item.frecency)
+        if self._near_duplicates is not None and not item.is_image:
+            if signature is None:
+                signature = content_signature(item.content, item.size)
+            self._near_duplicates.add(item.id, signature, item.size)
+
+    def _discard(self, item_id: int) -> Optional[ClipboardItem]:
+        item = self._unpinned.pop(item_id, None)
+        if item is None:
+            item = self._pinned.pop(item_id, None)
+        if item is None:
+            return None
+        if item_id == self._newest_id:
+            self._newest_id = None
+        del self._ids_by_hash[item.content_hash]
+        self._total_bytes -= item.size
+        self._frecency.remove(item_id)
+        if self._near_duplicates is not None:
+            self._near_duplicates.remove(item_id)
+        return item
+
+    def _record(
+        self,
+        kind: ChangeKind,
+        item_id: Optional[int] = None,
+        item: Optional[ClipboardItem] = None,
+    ) -> None:
+        self._version += 1
+        change = HistoryChange(
+            version=self._version, kind=kind, item_id=item_id, item=item
+        )
+        self._journal.append(change)
+        self._pending.append(change)
+
+    def _publish(self) -> None:
+        # Pending changes are taken under the publish lock, so batches from
+        # different threads reach subscribers in version order.
+        with self._publish_lock:
+            with self._lock:
+                if self._batch_depth or not self._pending:
+                    return
+                changes, self._pending = self._pending, []
+            for listener in list(self._listeners):
+                listener(changes)
+
+    def _is_over_limit(self) -> bool:
+        if len(self) > self.max_items:
+            return True
+        return (
+            self.max_bytes is not None
+            and self._total_bytes > self.max_bytes
+            and len(self) > 1
+        )
 
     def _enforce_limit(self) -> None:
-        if len(self.items) > self.max_items:
-            self.items = self.items[: self.max_items]
+        while self._is_over_limit():
+            item_id = self._eviction_candidate()
+            if item_id is None:
+                return
+            item = self._discard(item_id)
+            self._record(ChangeKind.REMOVED, item_id, item)
+
+    def _eviction_candidate(self) -> Optional[int]:
+        """Oldest unpinned item other than the newest one, if any."""
+        item_id = next(iter(self._unpinned), None)
+        return None if item_id == self._newest_id else item_id
+
+    @staticmethod
+    def _validate_limits(max_items: int, max_bytes: Optional[int]) -> None:
+        if max_items <= 0:
+            raise ValueError("Max items must be positive")
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError("Max bytes must be positive")
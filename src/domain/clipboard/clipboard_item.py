@@ -1,18 +1,303 @@
-from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
+import hashlib
+from typing import Callable, Optional, Tuple
+
+from src.domain.clipboard.frecency_index import add_use, use_weight
+
+PREVIEW_LENGTH = 200
+# The selection a clip is taken from unless it says otherwise; on X11 clips
+# can also come from the primary selection (see ``clipboard_port``).
+DEFAULT_SOURCE = "clipboard"
+
+# use_count, last_used_timestamp, frecency, variant_count
+_Usage = Tuple[int, Optional[int], float, int]
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def encode_content(content: str) -> bytes:
+    return content.encode("utf-8", "surrogatepass")
+
+
+def hash_content(content: str) -> bytes:
+    return _hash_encoded(encode_content(content))
+
+
+def _hash_encoded(encoded: bytes) -> bytes:
+    return hashlib.blake2b(encoded, digest_size=16).digest()
+
+
+def hash_bytes(data: bytes) -> bytes:
+    """Content hash of binary clip data, e.g. an encoded image."""
+    return _hash_encoded(data)
+
+
+def to_timestamp(moment: datetime) -> int:
+    """Convert a naive local datetime to integer microseconds since 1970."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone().replace(tzinfo=None)
+    return (moment - _EPOCH) // _MICROSECOND
+
+
+def from_timestamp(timestamp: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=timestamp)
 
 
-@dataclass
 class ClipboardItem:
-    content: str
-    created_at: datetime
+    """A single clip.
+
+    Items are slotted and keep their creation time as integer microseconds
+    instead of a datetime object, which keeps large histories compact. ``size``
+    is the UTF-8 length of the content in bytes.
+
+    An item can also be lazy: it then holds only its metadata and the first
+    ``PREVIEW_LENGTH`` characters, and ``content`` fetches the full body through
+    a loader on access. Previews shorter than that never touch the loader.
+
+    ``use_count`` and ``last_used_timestamp`` record copies back from history.
+    ``frecency`` is the log-space frecency key (see ``frecency_index``); the
+    creation of an item counts as its first use. ``variant_count`` is the
+    number of near-identical clips collapsed into this one. Most clips are
+    never used again, so the four share one tuple that is only allocated
+    once one of them leaves its default.
+
+    Pinned items are listed first and never evicted by history limits.
+
+    Image clips have a ``media_type``; their ``content`` is only a short label,
+    ``content_hash`` and ``size`` describe the image data, which lives in an
+    image store keyed by that hash.
+
+    ``formats`` names the rich formats (media types such as ``text/html``)
+    stored for a text clip; their data is kept by storage and read only when
+    the clip is copied back with its formatting.
+
+    ``source`` is the selection the clip was captured from.
+    """
 
-    def __post_init__(self):
-        if not self.content:
+    __slots__ = (
+        "id",
+        "content_hash",
+        "size",
+        "created_timestamp",
+        "_usage",
+        "pinned",
+        "media_type",
+        "formats",
+        "source",
+        "_content",
+        "_head",
+        "_loader",
+    )
+
+    def __init__(
+        self,
+        content: str,
+        created_at: datetime,
+        id: int | None = None,
+        source: str = DEFAULT_SOURCE,
+    ):
+        if not content:
+            raise ValueError("Clipboard item content cannot be empty")
+        self.id = id
+        encoded = encode_content(content)
+        self.content_hash = _hash_encoded(encoded)
+        self.size = len(encoded)
+        self.created_timestamp = to_timestamp(created_at)
+        self._usage: Optional[_Usage] = None
+        self.pinned = False
+        self.media_type: Optional[str] = None
+        self.formats: Tuple[str, ...] = ()
+        self.source = source
+        self._content: Optional[str] = content
+        self._head: Optional[str] = None
+        self._loader: Optional[Callable[[int], Optional[str]]] = None
+
+    @classmethod
+    def lazy(
+        cls,
+        id: int,
+        head: str,
+        content_hash: bytes,
+        size: int,
+        created_timestamp: int,
+        loader: Callable[[int], Optional[str]],
+        use_count: int = 0,
+        last_used_timestamp: Optional[int] = None,
+        frecency: Optional[float] = None,
+        variant_count: int = 1,
+        pinned: bool = False,
+        media_type: Optional[str] = None,
+        formats: Tuple[str, ...] = (),
+        source: str = DEFAULT_SOURCE,
+    ) -> "ClipboardItem":
+        if not head:
             raise ValueError("Clipboard item content cannot be empty")
+        item = cls.__new__(cls)
+        item.id = id
+        item.content_hash = content_hash
+        item.size = size
+        item.created_timestamp = created_timestamp
+        item._usage = None
+        item._set_usage(
+            use_count,
+            last_used_timestamp,
+            frecency if frecency is not None else use_weight(created_timestamp),
+            variant_count,
+        )
+        item.pinned = pinned
+        item.media_type = media_type
+        item.formats = tuple(formats)
+        item.source = source
+        item._content = None
+        item._head = head[:PREVIEW_LENGTH]
+        item._loader = loader
+        return item
+
+    @classmethod
+    def image(
+        cls,
+        content_hash: bytes,
+        size: int,
+        label: str,
+        created_at: datetime,
+        media_type: str = "image/png",
+    ) -> "ClipboardItem":
+        item = cls(content=label, created_at=created_at)
+        item.content_hash = content_hash
+        item.size = size
+        item.media_type = media_type
+        return item
+
+    def copy(self) -> "ClipboardItem":
+        """Shallow copy to change without touching this item."""
+        item = ClipboardItem.__new__(ClipboardItem)
+        for slot in self.__slots__:
+            setattr(item, slot, getattr(self, slot))
+        return item
+
+    @property
+    def is_image(self) -> bool:
+        return self.media_type is not None and self.media_type.startswith("image/")
+
+    @property
+    def content(self) -> str:
+        # Read once: storage may release the body from another thread.
+        content = self._content
+        if content is not None:
+            return content
+        content = self._loader(self.id) if self.id is not None else None
+        # The body can only be missing if the row was removed meanwhile; the
+        # preview is the best remaining answer.
+        return content if content is not None else self._head
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._content is not None
+
+    def release_content(self, loader: Callable[[int], Optional[str]]) -> None:
+        """Drop the resident body; later reads go through ``loader``."""
+        if self._content is None or self.id is None:
+            return
+        self._head = self._content[:PREVIEW_LENGTH]
+        self._loader = loader
+        self._content = None
+
+    @property
+    def use_count(self) -> int:
+        usage = self._usage
+        return usage[0] if usage is not None else 0
+
+    @property
+    def last_used_timestamp(self) -> Optional[int]:
+        usage = self._usage
+        return usage[1] if usage is not None else None
+
+    @property
+    def frecency(self) -> float:
+        usage = self._usage
+        return usage[2] if usage is not None else use_weight(self.created_timestamp)
+
+    @property
+    def variant_count(self) -> int:
+        usage = self._usage
+        return usage[3] if usage is not None else 1
+
+    @variant_count.setter
+    def variant_count(self, variant_count: int) -> None:
+        self._set_usage(
+            self.use_count, self.last_used_timestamp, self.frecency, variant_count
+        )
+
+    def record_use(self, timestamp: int) -> None:
+        self._set_usage(
+            self.use_count + 1,
+            timestamp,
+            add_use(self.frecency, timestamp),
+            self.variant_count,
+        )
+
+    def inherit_usage(self, previous: "ClipboardItem") -> None:
+        """Carry usage over from the item this one replaces, plus this use."""
+        self.pinned = previous.pinned
+        self._set_usage(
+            previous.use_count,
+            previous.last_used_timestamp,
+            add_use(previous.frecency, self.created_timestamp),
+            self.variant_count,
+        )
+
+    def _set_usage(
+        self,
+        use_count: int,
+        last_used_timestamp: Optional[int],
+        frecency: float,
+        variant_count: int,
+    ) -> None:
+        if (
+            use_count == 0
+            and last_used_timestamp is None
+            and variant_count == 1
+            and frecency == use_weight(self.created_timestamp)
+        ):
+            self._usage = None
+        else:
+            self._usage = (use_count, last_used_timestamp, frecency, variant_count)
+
+    @property
+    def last_used_at(self) -> Optional[datetime]:
+        if self.last_used_timestamp is None:
+            return None
+        return from_timestamp(self.last_used_timestamp)
+
+    @property
+    def created_at(self) -> datetime:
+        return from_timestamp(self.created_timestamp)
 
     def preview(self, max_length: int = 50) -> str:
-        preview = self.content.replace("\n", " ").replace("\r", " ")
+        text = self._content
+        if text is None:
+            text = self._head
+            if len(text) >= PREVIEW_LENGTH and max_length >= PREVIEW_LENGTH:
+                text = self.content
+        preview = text.replace("\n", " ").replace("\r", " ")
         if len(preview) > max_length:
             return preview[: max_length - 3] + "..."
         return preview
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ClipboardItem):
+            return NotImplemented
+        return (
+            self.content_hash == other.content_hash
+            and self.created_timestamp == other.created_timestamp
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.content_hash, self.created_timestamp))
+
+    def __repr__(self) -> str:
+        return (
+            f"ClipboardItem(id={self.id!r}, content={self.preview()!r}, "
+            f"created_at={self.created_at!r})"
+        )
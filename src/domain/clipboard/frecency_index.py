@@ -0,0 +1,117 @@
+from datetime import timedelta
+import heapq
+import math
+from typing import Dict, Iterator, List, Optional, Tuple
+
+FRECENCY_HALF_LIFE = timedelta(days=3)
+
+_DECAY_PER_MICROSECOND = math.log(2) / (FRECENCY_HALF_LIFE / timedelta(microseconds=1))
+
+
+def use_weight(timestamp: int) -> float:
+    """Log-space weight of a single use at ``timestamp`` (microseconds).
+
+    Every use contributes ``exp(-decay * age)`` to an item's frecency. Keeping
+    the sum as ``log(sum(exp(decay * t_use)))`` makes it independent of the
+    current time, so keys never need to be recomputed as time passes and the
+    ordering of already indexed items stays valid.
+    """
+    return _DECAY_PER_MICROSECOND * timestamp
+
+
+def add_use(key: Optional[float], timestamp: int) -> float:
+    weight = use_weight(timestamp)
+    if key is None:
+        return weight
+    high, low = max(key, weight), min(key, weight)
+    return high + math.log1p(math.exp(low - high))
+
+
+def decayed_score(key: float, now: int) -> float:
+    """Current frecency, i.e. the sum of the decayed weights of all uses."""
+    return math.exp(key - use_weight(now))
+
+
+class FrecencyIndex:
+    """Max-heap of item ids ordered by frecency key with lazy invalidation.
+
+    Updates push a new heap entry and leave the old one behind; stale entries
+    are skipped when read and dropped by an occasional rebuild. Reading the
+    top ``k`` walks the heap tree with a small frontier heap, which costs
+    O(k log k) and leaves the index untouched.
+
+    The heap is only built once the order is first read, here or in a copy,
+    and kept up to date from then on; until then an update just sets the key.
+    """
+
+    def __init__(self):
+        self._keys: Dict[int, float] = {}
+        self._heap: Optional[List[Tuple[float, int]]] = None
+        # Shared with copies, which are what snapshots read the order from.
+        self._order_read = [False]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def update(self, item_id: int, key: float) -> None:
+        self._keys[item_id] = key
+        if self._heap is not None:
+            heapq.heappush(self._heap, (-key, item_id))
+            self._compact_if_needed()
+
+    def remove(self, item_id: int) -> None:
+        if self._keys.pop(item_id, None) is not None and self._heap is not None:
+            self._compact_if_needed()
+
+    def clear(self) -> None:
+        self._keys.clear()
+        if self._heap is not None:
+            self._heap.clear()
+
+    def key(self, item_id: int) -> Optional[float]:
+        return self._keys.get(item_id)
+
+    def copy(self) -> "FrecencyIndex":
+        """Independent copy to read from while this index keeps changing."""
+        if self._heap is None and self._order_read[0]:
+            self._build_heap()
+        clone = FrecencyIndex()
+        clone._keys = dict(self._keys)
+        clone._heap = list(self._heap) if self._heap is not None else None
+        clone._order_read = self._order_read
+        return clone
+
+    def top(self, count: int) -> List[int]:
+        result = []
+        for item_id in self:
+            if len(result) >= count:
+                break
+            result.append(item_id)
+        return result
+
+    def __iter__(self) -> Iterator[int]:
+        if self._heap is None:
+            self._order_read[0] = True
+            self._build_heap()
+        heap = self._heap
+        frontier: List[Tuple[float, int]] = [(heap[0][0], 0)] if heap else []
+        seen = set()
+        while frontier:
+            _, position = heapq.heappop(frontier)
+            if position >= len(heap):
+                continue
+            negative_key, item_id = heap[position]
+            if self._keys.get(item_id) == -negative_key and item_id not in seen:
+                seen.add(item_id)
+                yield item_id
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child][0], child))
+
+    def _compact_if_needed(self) -> None:
+        if len(self._heap) > 2 * len(self._keys) + 64:
+            self._build_heap()
+
+    def _build_heap(self) -> None:
+        self._heap = [(-key, item_id) for item_id, key in self._keys.items()]
+        heapq.heapify(self._heap)
@@ -0,0 +1,30 @@
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional
+
+from src.domain.clipboard.clipboard_item import ClipboardItem
+
+
+class ChangeKind(Enum):
+    ADDED = "added"
+    MOVED = "moved"
+    UPDATED = "updated"
+    REMOVED = "removed"
+    CLEARED = "cleared"
+
+
+@dataclass(frozen=True)
+class HistoryChange:
+    """One entry of the history change journal.
+
+    ``ADDED`` puts a new item at the front, ``MOVED`` moves an existing id to
+    the front (its item may have new content, e.g. a collapsed variant),
+    ``UPDATED`` changes an item in place, ``REMOVED`` drops an id and
+    ``CLEARED`` empties the history. ``item`` is set for all but ``CLEARED``;
+    for ``REMOVED`` it is the item that was dropped.
+    """
+
+    version: int
+    kind: ChangeKind
+    item_id: Optional[int] = None
+    item: Optional[ClipboardItem] = None
@@ -0,0 +1,62 @@
+from itertools import chain
+from typing import Dict, Iterator, Optional, Tuple
+
+from src.domain.clipboard.clipboard_item import ClipboardItem
+from src.domain.clipboard.frecency_index import FrecencyIndex
+
+
+class HistorySnapshot:
+    """Immutable view of a ``ClipboardHistory`` at one ``version``.
+
+    Holds the items newest first, split into pinned and other items as they
+    were when the snapshot was taken, together with a copy of the frecency
+    index, so it can be iterated, searched and rendered from any thread while
+    the history keeps changing. The items themselves are shared with the
+    history, which replaces rather than changes them.
+    """
+
+    __slots__ = ("version", "items", "pinned", "unpinned", "_frecency", "_by_id")
+
+    def __init__(
+        self,
+        version: int,
+        items: Tuple[ClipboardItem, ...],
+        pinned: Tuple[ClipboardItem, ...],
+        unpinned: Tuple[ClipboardItem, ...],
+        frecency: FrecencyIndex,
+    ):
+        self.version = version
+        self.items = items
+        self.pinned = pinned
+        self.unpinned = unpinned
+        self._frecency = frecency
+        self._by_id: Optional[Dict[int, ClipboardItem]] = None
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __iter__(self) -> Iterator[ClipboardItem]:
+        return iter(self.items)
+
+    def __getitem__(self, index: int) -> ClipboardItem:
+        return self.items[index]
+
+    def listed(self) -> Iterator[ClipboardItem]:
+        """Pinned items first, then the others, each newest first."""
+        return chain(self.pinned, self.unpinned)
+
+    def by_frecency(self) -> Iterator[ClipboardItem]:
+        """Pinned items first, then the others, each by frecency highest first.
+
+        The other items are streamed from the frecency heap, so the first page
+        needs no sort of the whole history.
+        """
+        key = self._frecency.key
+        yield from sorted(self.pinned, key=lambda item: (-key(item.id), item.id))
+        if self._by_id is None:
+            self._by_id = {item.id: item for item in self.unpinned}
+        by_id = self._by_id
+        for item_id in self._frecency:
+            item = by_id.get(item_id)
+            if item is not None:
+                yield item
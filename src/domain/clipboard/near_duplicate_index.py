@@ -0,0 +1,183 @@
+import hashlib
+import re
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+SIGNATURE_BITS = 64
+BAND_COUNT = 4
+BAND_BITS = SIGNATURE_BITS // BAND_COUNT
+MAX_HAMMING_DISTANCE = BAND_COUNT - 1
+MIN_SIMHASH_BYTES = 64
+SIGNATURE_CHARS = 8192
+
+_BAND_MASK = (1 << BAND_BITS) - 1
+# Dates and times of day. Other numbers, such as ids or amounts, stay
+# significant: clips that differ in them are different clips.
+_TIMESTAMPS = re.compile(
+    r"(?<!\d)\d{4}[-/.]\d{1,2}[-/.]\d{1,2}(?!\d)"
+    r"|(?<![\d:])\d{1,2}:\d{2}(?::\d{2})?(?:[.,]\d+)?(?![\d:])"
+)
+
+# SimHash needs, per signature bit, how many features have that bit set.
+# Each bit gets its own 16-bit lane in one big integer, so adding a feature is
+# eight table lookups instead of 64 bit tests.
+_LANE_BITS = 16
+_LANE_MASK = (1 << _LANE_BITS) - 1
+_BYTE_LANES = [
+    sum(((byte >> bit) & 1) << (bit * _LANE_BITS) for bit in range(8))
+    for byte in range(256)
+]
+
+# A bucket holds a single id until a second one arrives, which keeps the
+# common case of one item per bucket at the cost of a dict entry.
+Bucket = Union[int, List[int]]
+
+
+def uses_simhash(size: int) -> bool:
+    return size >= MIN_SIMHASH_BYTES
+
+
+def normalize(content: str) -> str:
+    """Whitespace-collapsed text with timestamps masked."""
+    return _TIMESTAMPS.sub("0", " ".join(content.split()))
+
+
+def content_signature(content: str, size: int) -> int:
+    """64-bit near-duplicate signature of ``content``.
+
+    Short clips get a plain hash of their normalized text, so they only
+    collapse when they differ in whitespace or a timestamp alone. Longer clips
+    get a SimHash over word uni- and bigrams of the first ``SIGNATURE_CHARS``
+    characters of that text, which keeps lines that differ by a timestamp
+    within a few bits. Anything past that is covered by an exact
+    hash mixed into the signature: two clips whose remainders differ end up
+    about 32 bits apart and never match.
+    """
+    text = normalize(content)
+    if not uses_simhash(size):
+        return _feature_hash(text)
+
+    tokens = text[:SIGNATURE_CHARS].split(" ")
+    features: List[str] = tokens + [
+        f"{first} {second}" for first, second in zip(tokens, tokens[1:])
+    ]
+    signature = _simhash(features)
+    if len(text) > SIGNATURE_CHARS:
+        signature ^= _feature_hash(text[SIGNATURE_CHARS:])
+    return signature
+
+
+def hamming_distance(first: int, second: int) -> int:
+    return (first ^ second).bit_count()
+
+
+def sizes_are_close(first: int, second: int) -> bool:
+    return abs(first - second) <= max(16, max(first, second) // 20)
+
+
+def _feature_hash(feature: str) -> int:
+    digest = hashlib.blake2b(
+        feature.encode("utf-8", "surrogatepass"), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big")
+
+
+def _simhash(features: List[str]) -> int:
+    lanes = 0
+    for feature in features:
+        for position, byte in enumerate(_feature_hash(feature).to_bytes(8, "little")):
+            lanes += _BYTE_LANES[byte] << (position * 8 * _LANE_BITS)
+
+    signature = 0
+    for bit in range(SIGNATURE_BITS):
+        if 2 * (lanes >> (bit * _LANE_BITS) & _LANE_MASK) > len(features):
+            signature |= 1 << bit
+    return signature
+
+
+class NearDuplicateIndex:
+    """LSH index over item signatures.
+
+    SimHash signatures are split into ``BAND_COUNT`` bands; two signatures
+    within ``MAX_HAMMING_DISTANCE`` bits always share at least one band, so a
+    lookup only compares the items in four buckets. Short clips, whose
+    signature is an exact hash, are matched by equality instead.
+
+    The index holds the signature and size of each of its items, so neither
+    is kept on items, or computed, while no index exists.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[int, Tuple[int, int]] = {}
+        self._exact: Dict[int, Bucket] = {}
+        self._bands: Dict[int, Bucket] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, item_id: int, signature: int, size: int) -> None:
+        self._entries[item_id] = (signature, size)
+        for key, buckets in self._bucket_keys(signature, size):
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = item_id
+            elif isinstance(bucket, list):
+                bucket.append(item_id)
+            else:
+                buckets[key] = [bucket, item_id]
+
+    def remove(self, item_id: int) -> None:
+        entry = self._entries.pop(item_id, None)
+        if entry is None:
+            return
+        for key, buckets in self._bucket_keys(*entry):
+            bucket = buckets.get(key)
+            if bucket == item_id:
+                del buckets[key]
+            elif isinstance(bucket, list) and item_id in bucket:
+                bucket.remove(item_id)
+                if len(bucket) == 1:
+                    buckets[key] = bucket[0]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._exact.clear()
+        self._bands.clear()
+
+    def find(self, signature: int, size: int) -> Optional[int]:
+        """Return the id of the closest near-duplicate, if any."""
+        best_id, best_distance = None, MAX_HAMMING_DISTANCE + 1
+        for item_id in self._candidates(signature, size):
+            other_signature, other_size = self._entries[item_id]
+            if uses_simhash(other_size) != uses_simhash(size):
+                continue
+            if uses_simhash(size) and not sizes_are_close(size, other_size):
+                continue
+            distance = hamming_distance(signature, other_signature)
+            if distance > MAX_HAMMING_DISTANCE:
+                continue
+            if distance < best_distance or (
+                distance == best_distance and item_id > best_id
+            ):
+                best_id, best_distance = item_id, distance
+        return best_id
+
+    def _candidates(self, signature: int, size: int) -> Iterator[int]:
+        for key, buckets in self._bucket_keys(signature, size):
+            bucket = buckets.get(key)
+            if isinstance(bucket, list):
+                yield from bucket
+            elif bucket is not None:
+                yield bucket
+
+    def _bucket_keys(
+        self, signature: int, size: int
+    ) -> List[Tuple[int, Dict[int, Bucket]]]:
+        if not uses_simhash(size):
+            return [(signature, self._exact)]
+        return [
+            (
+                band << BAND_BITS | signature >> (band * BAND_BITS) & _BAND_MASK,
+                self._bands,
+            )
+            for band in range(BAND_COUNT)
+        ]
@@ -4,6 +4,7 @@ from .setting_metadata import SettingMetadata
 from .setting_type import SettingType
 from .settings import Settings
 from .settings_group import SettingsGroup
+from .string_setting import StringSetting
 
 
 def create_app_settings() -> Settings:
@@ -78,7 +79,282 @@ def create_app_settings() -> Settings:
         },
     )
 
+    max_items_setting = IntegerSetting(
+        SettingMetadata(
+            key="history.max_items",
+            display_name="Maximum Items",
+            description=(
+                "Maximum number of clips kept in history. Oldest clips are removed "
+                "first."
+            ),
+            setting_type=SettingType.INTEGER,
+            default_value=1000,
+            min_value=1,
+            max_value=100000,
+        )
+    )
+
+    max_size_mb_setting = IntegerSetting(
+        SettingMetadata(
+            key="history.max_size_mb",
+            display_name="Maximum Size (MB)",
+            description=(
+                "Maximum total size of all clips in history. Oldest clips are removed "
+                "first. Set to None for unlimited."
+            ),
+            setting_type=SettingType.INTEGER,
+            default_value=100,
+            min_value=1,
+            max_value=10240,
+        )
+    )
+
+    sort_by_frecency_setting = BooleanSetting(
+        SettingMetadata(
+            key="history.sort_by_frecency",
+            display_name="Sort by Frecency",
+            description=(
+                "Order the list and search results by how often and how recently clips "
+                "were used instead of by recency alone."
+            ),
+            setting_type=SettingType.BOOLEAN,
+            default_value=False,
+        )
+    )
+
+    collapse_near_duplicates_setting = BooleanSetting(
+        SettingMetadata(
+            key="history.collapse_near_duplicates",
+            display_name="Collapse Near-Duplicates",
+            description=(
+                "Merge clips that differ only in whitespace or timestamps into a "
+                "single entry that shows the latest variant. Earlier variants are "
+                "not kept."
+            ),
+            setting_type=SettingType.BOOLEAN,
+            default_value=False,
+        )
+    )
+
+    capture_images_setting = BooleanSetting(
+        SettingMetadata(
+            key="history.capture_images",
+            display_name="Capture Images",
+            description="Keep copied images in history. Takes effect after a restart.",
+            setting_type=SettingType.BOOLEAN,
+            default_value=True,
+        )
+    )
+
+    capture_formatting_setting = BooleanSetting(
+        SettingMetadata(
+            key="history.capture_formatting",
+            display_name="Capture Formatting",
+            description=(
+                "Keep the HTML and RTF versions of copied text so clips can be copied "
+                "back with their formatting."
+            ),
+            setting_type=SettingType.BOOLEAN,
+            default_value=True,
+        )
+    )
+
+    max_clip_size_mb_setting = IntegerSetting(
+        SettingMetadata(
+            key="history.max_clip_size_mb",
+            display_name="Maximum Clip Size (MB)",
+            description=(
+                "Clips larger than this are not captured. Where the size is known "
+                "up front, they are not even read."
+            ),
+            setting_type=SettingType.INTEGER,
+            default_value=10,
+            min_value=1,
+            max_value=1024,
+        )
+    )
+
+    truncate_large_clips_setting = BooleanSetting(
+        SettingMetadata(
+            key="history.truncate_large_clips",
+            display_name="Truncate Large Clips",
+            description=(
+                "Keep the beginning of text clips over the maximum clip size instead "
+                "of skipping them."
+            ),
+            setting_type=SettingType.BOOLEAN,
+            default_value=False,
+        )
+    )
+
+    burst_window_ms_setting = IntegerSetting(
+        SettingMetadata(
+            key="history.burst_window_ms",
+            display_name="Burst Window (ms)",
+            description=(
+                "Clipboard changes within this time of the first one are committed "
+                "together, as one write and one list refresh. Set to 0 to commit "
+                "each change on its own."
+            ),
+            setting_type=SettingType.INTEGER,
+            default_value=100,
+            min_value=0,
+            max_value=5000,
+        )
+    )
+
+    keep_burst_values_setting = BooleanSetting(
+        SettingMetadata(
+            key="history.keep_burst_values",
+            display_name="Keep Burst Values",
+            description=(
+                "Keep every distinct value of a burst of clipboard changes instead "
+                "of only the last one of each selection."
+            ),
+            setting_type=SettingType.BOOLEAN,
+            default_value=True,
+        )
+    )
+
+    history_group = SettingsGroup(
+        name="history",
+        display_name="History",
+        description="Limits for the stored clipboard history",
+        settings={
+            "history.max_items": max_items_setting,
+            "history.max_size_mb": max_size_mb_setting,
+            "history.sort_by_frecency": sort_by_frecency_setting,
+            "history.collapse_near_duplicates": collapse_near_duplicates_setting,
+            "history.capture_images": capture_images_setting,
+            "history.capture_formatting": capture_formatting_setting,
+            "history.max_clip_size_mb": max_clip_size_mb_setting,
+            "history.truncate_large_clips": truncate_large_clips_setting,
+            "history.burst_window_ms": burst_window_ms_setting,
+            "history.keep_burst_values": keep_burst_values_setting,
+        },
+    )
+
+    ignore_apps_setting = StringSetting(
+        SettingMetadata(
+            key="ingestion.ignore_apps",
+            display_name="Ignored Applications",
+            description=(
+                "Comma-separated names of applications whose clips are not kept, "
+                "e.g. KeePassXC, 1Password. Only known on Windows and macOS."
+            ),
+            setting_type=SettingType.STRING,
+            default_value="",
+        )
+    )
+
+    ignore_pattern_setting = StringSetting(
+        SettingMetadata(
+            key="ingestion.ignore_pattern",
+            display_name="Ignore Pattern",
+            description=(
+                "Regular expression; clips in which it matches anywhere are not kept."
+            ),
+            setting_type=SettingType.STRING,
+            default_value="",
+        )
+    )
+
+    trim_whitespace_setting = BooleanSetting(
+        SettingMetadata(
+            key="ingestion.trim_whitespace",
+            display_name="Trim Whitespace",
+            description="Strip leading and trailing whitespace from copied text.",
+            setting_type=SettingType.BOOLEAN,
+            default_value=False,
+        )
+    )
+
+    min_length_setting = IntegerSetting(
+        SettingMetadata(
+            key="ingestion.min_length",
+            display_name="Minimum Length",
+            description="Clips with fewer characters than this are not kept.",
+            setting_type=SettingType.INTEGER,
+            default_value=None,
+            min_value=1,
+            max_value=10000,
+        )
+    )
+
+    max_length_setting = IntegerSetting(
+        SettingMetadata(
+            key="ingestion.max_length",
+            display_name="Maximum Length",
+            description=(
+                "Clips with more characters than this are not kept. Set to None for "
+                "unlimited."
+            ),
+            setting_type=SettingType.INTEGER,
+            default_value=None,
+            min_value=1,
+            max_value=100000000,
+        )
+    )
+
+    skip_secrets_setting = BooleanSetting(
+        SettingMetadata(
+            key="ingestion.skip_secrets",
+            display_name="Skip Secrets",
+            description=(
+                "Do not keep clips that look like passwords, API tokens or private "
+                "keys."
+            ),
+            setting_type=SettingType.BOOLEAN,
+            default_value=False,
+        )
+    )
+
+    capture_primary_setting = BooleanSetting(
+        SettingMetadata(
+            key="ingestion.capture_primary_selection",
+            display_name="Capture Selected Text",
+            description=(
+                "Linux only: also keep text that is merely selected (the PRIMARY "
+                "selection), once the selection stops changing. Takes effect after "
+                "a restart."
+            ),
+            setting_type=SettingType.BOOLEAN,
+            default_value=False,
+        )
+    )
+
+    monitor_process_setting = BooleanSetting(
+        SettingMetadata(
+            key="ingestion.monitor_in_separate_process",
+            display_name="Separate Monitor Process",
+            description=(
+                "Watch the clipboard from a separate process, so a busy window never "
+                "delays capture. Takes effect after a restart."
+            ),
+            setting_type=SettingType.BOOLEAN,
+            default_value=False,
+        )
+    )
+
+    ingestion_group = SettingsGroup(
+        name="ingestion",
+        display_name="Capture Filters",
+        description="Which copied clips make it into the history",
+        settings={
+            "ingestion.ignore_apps": ignore_apps_setting,
+            "ingestion.ignore_pattern": ignore_pattern_setting,
+            "ingestion.trim_whitespace": trim_whitespace_setting,
+            "ingestion.min_length": min_length_setting,
+            "ingestion.max_length": max_length_setting,
+            "ingestion.skip_secrets": skip_secrets_setting,
+            "ingestion.capture_primary_selection": capture_primary_setting,
+            "ingestion.monitor_in_separate_process": monitor_process_setting,
+        },
+    )
+
     all_groups = {
+        "history": history_group,
+        "ingestion": ingestion_group,
         "fuzzy_search": fuzzy_search_group,
     }
 
@@ -1,9 +1,14 @@
+from functools import partial
+import sys
 import time
 
 from loguru import logger
 
+from src.adapters.event_clipboard_adapter import EventClipboardAdapter
+from src.adapters.file_image_store import FileImageStore
 from src.adapters.fuzzy_search_adapter import FuzzySearchAdapter
 from src.adapters.json_settings_adapter import JsonSettingsAdapter
+from src.adapters.process_clipboard_adapter import ProcessClipboardAdapter
 from src.adapters.pyperclip_adapter import PyperclipAdapter
 from src.adapters.sqlite_storage_adapter import SqliteStorageAdapter
 from src.adapters.system_tray_adapter import SystemTrayAdapter
@@ -15,15 +20,32 @@ from src.domain.settings.app_settings import create_app_settings
 
 class Container:
     def __init__(self):
-        self.clipboard_adapter = PyperclipAdapter()
-        self.storage_adapter = SqliteStorageAdapter()
-
         self.settings_repository = JsonSettingsAdapter()
         app_settings = create_app_settings()
         self.settings_service = SettingsService(
             repository=self.settings_repository, settings=app_settings
         )
 
+        settings = self.settings_service.get_settings()
+        # A class or a partial of one, so the monitor process can rebuild it.
+        adapter_factory = (
+            partial(
+                EventClipboardAdapter,
+                watch_primary=bool(
+                    settings.get_value("ingestion.capture_primary_selection")
+                ),
+            )
+            if sys.platform.startswith("linux")
+            else PyperclipAdapter
+        )
+        self.clipboard_adapter = (
+            ProcessClipboardAdapter(adapter_factory)
+            if settings.get_value("ingestion.monitor_in_separate_process")
+            else adapter_factory()
+        )
+        self.storage_adapter = SqliteStorageAdapter()
+        self.image_store = FileImageStore()
+
         self.ui_adapter = PyWebViewUIAdapter()
         self.ui_adapter.set_settings_service(self.settings_service)
         self.search_adapter = FuzzySearchAdapter(settings_service=self.settings_service)
@@ -34,10 +56,13 @@ class Container:
             storage_port=self.storage_adapter,
             ui_port=self.ui_adapter,
             search_port=self.search_adapter,
+            settings_service=self.settings_service,
+            image_store=self.image_store,
         )
 
     def setup_system_integration(self) -> None:
         def show_window():
+            self.clipboard_adapter.notify_activity()
             self.ui_adapter.show_window()
 
         def quit_application():
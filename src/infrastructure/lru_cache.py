@@ -0,0 +1,68 @@
+from collections import OrderedDict
+import threading
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """Thread-safe LRU cache bounded by entry count and total weight."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_weight: Optional[int] = None,
+        weigh: Callable[[V], int] = len,
+    ):
+        if max_entries <= 0:
+            raise ValueError("Max entries must be positive")
+        self._max_entries = max_entries
+        self._max_weight = max_weight
+        self._weigh = weigh
+        self._entries: OrderedDict[K, V] = OrderedDict()
+        self._weight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def weight(self) -> int:
+        return self._weight
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> Optional[V]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: K, value: V) -> None:
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = value
+            self._weight += self._weigh(value)
+            while len(self._entries) > 1 and self._is_over_limit():
+                _, evicted = self._entries.popitem(last=False)
+                self._weight -= self._weigh(evicted)
+
+    def pop(self, key: K) -> Optional[V]:
+        with self._lock:
+            return self._discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._weight = 0
+
+    def _discard(self, key: K) -> Optional[V]:
+        value = self._entries.pop(key, None)
+        if value is not None:
+            self._weight -= self._weigh(value)
+        return value
+
+    def _is_over_limit(self) -> bool:
+        if len(self._entries) > self._max_entries:
+            return True
+        return self._max_weight is not None and self._weight > self._max_weight
@@ -28,5 +28,9 @@ def get_database_file_path() -> Path:
     return Path(user_data_dir("clip_flow", appauthor=False)) / "clipboard_history.db"
 
 
+def get_images_dir() -> Path:
+    return Path(user_data_dir("clip_flow", appauthor=False)) / "images"
+
+
 def get_config_dir() -> Path:
     return Path(user_config_dir("clip_flow", appauthor=False))
@@ -1,5 +1,10 @@
 from abc import ABC, abstractmethod
-from typing import Callable
+from typing import Callable, Dict, List, Optional
+
+# Where a text change was seen: the clipboard proper, or on X11 and Wayland
+# the PRIMARY selection that follows whatever text is selected.
+CLIPBOARD_SELECTION = "clipboard"
+PRIMARY_SELECTION = "primary"
 
 
 class ClipboardPort(ABC):
@@ -9,12 +14,76 @@ class ClipboardPort(ABC):
 
     @abstractmethod
     def set_content(self, content: str) -> None:
-        """Set clipboard content."""
+        """Set clipboard content.
+
+        The change this causes must not be reported to the monitoring callback.
+        """
+
+    @abstractmethod
+    def get_formats(self) -> List[str]:
+        """Media types of the rich formats offered next to the plain text.
+
+        Only lists what is available without reading any data, so it is cheap
+        enough to call on every clipboard change.
+        """
+
+    @abstractmethod
+    def get_format(self, media_type: str) -> Optional[bytes]:
+        """Get the data of one rich format, if it is on the clipboard."""
+
+    @abstractmethod
+    def set_rich_content(self, content: str, formats: Dict[str, bytes]) -> None:
+        """Set plain text together with rich formats keyed by media type.
+
+        Like ``set_content``, the change must not be reported back.
+        """
+
+    @abstractmethod
+    def get_image(self) -> Optional[bytes]:
+        """Get the encoded image on the clipboard, if there is one."""
+
+    @abstractmethod
+    def set_image(self, data: bytes) -> None:
+        """Set an encoded image as clipboard content.
+
+        Like ``set_content``, the change must not be reported back.
+        """
 
     @abstractmethod
-    def start_monitoring(self, callback: Callable[[str], None]) -> None:
-        """Start monitoring clipboard changes."""
+    def start_monitoring(
+        self,
+        callback: Callable[[str, List[str], Optional[str], str], None],
+        image_callback: Optional[Callable[[bytes], None]] = None,
+    ) -> None:
+        """Start monitoring clipboard changes.
+
+        Text changes go to ``callback`` together with the media types of the
+        rich formats offered with the text (see ``get_formats``), the name of
+        the application that copied it, or None if it is not known, and the
+        selection it was seen on (``CLIPBOARD_SELECTION`` or
+        ``PRIMARY_SELECTION``). A value seen on both is reported once. When
+        ``image_callback`` is given, new images are passed to it as encoded
+        bytes.
+        """
 
     @abstractmethod
     def stop_monitoring(self) -> None:
         """Stop monitoring clipboard changes."""
+
+    @abstractmethod
+    def set_capture_limit(self, max_bytes: Optional[int], truncate: bool) -> None:
+        """Limit the size of the clips reported to the monitoring callbacks.
+
+        Text over ``max_bytes`` in UTF-8 is cut to that size if ``truncate``
+        is set and not reported otherwise; larger images are never reported.
+        Where the size is known before reading, skipped clips are not read.
+        None lifts the limit.
+        """
+
+    @abstractmethod
+    def notify_activity(self) -> None:
+        """The user is interacting with the app; check the clipboard promptly.
+
+        Monitors that poll slow down while nothing changes and pause while the
+        user is away; this brings them back to their fastest rate.
+        """
@@ -0,0 +1,52 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+
+@dataclass(frozen=True)
+class ImageInfo:
+    content_hash: bytes
+    size: int
+    media_type: str
+    width: int
+    height: int
+
+    @property
+    def label(self) -> str:
+        if self.width and self.height:
+            return f"Image {self.width}×{self.height}"
+        return "Image"
+
+
+class ImageStorePort(ABC):
+    """Port for image clip data, addressed by content hash."""
+
+    @abstractmethod
+    def put(self, data: bytes) -> ImageInfo:
+        """Store encoded image data, once per distinct content."""
+
+    @abstractmethod
+    def get(self, content_hash: bytes) -> Optional[bytes]:
+        """Load the full-resolution image data."""
+
+    @abstractmethod
+    def thumbnail(
+        self, content_hash: bytes, on_ready: Callable[[str], None]
+    ) -> Optional[str]:
+        """Return a cached thumbnail data URI, or None and generate it.
+
+        Generation happens in the background; ``on_ready`` is then called
+        with the data URI from a worker thread.
+        """
+
+    @abstractmethod
+    def remove(self, content_hash: bytes) -> None:
+        """Delete an image and its thumbnail."""
+
+    @abstractmethod
+    def retain(self, content_hashes: Iterable[bytes]) -> None:
+        """Delete every stored image not listed in ``content_hashes``."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Stop background work."""
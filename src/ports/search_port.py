@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterable, Iterator, List, Tuple
 
 from ..domain.clipboard import ClipboardItem
 
@@ -9,6 +9,18 @@ class SearchPort(ABC):
     def search(self, items: List[ClipboardItem], query: str) -> List[ClipboardItem]:
         """Search through items using the provided query."""
 
+    @abstractmethod
+    def iter_search(
+        self, items: Iterable[ClipboardItem], query: str
+    ) -> Iterator[ClipboardItem]:
+        """Lazily yield matching items in the order they are given."""
+
+    @abstractmethod
+    def iter_search_contents(
+        self, entries: Iterable[Tuple[ClipboardItem, str]], query: str
+    ) -> Iterator[ClipboardItem]:
+        """Like ``iter_search``, for items paired with their loaded content."""
+
     @abstractmethod
     def is_match(self, item: ClipboardItem, query: str) -> bool:
         """Check if a single item matches the search query."""
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from src.domain.settings import Settings
 
@@ -38,3 +38,7 @@ class SettingsServicePort(ABC):
     @abstractmethod
     def reload_settings(self) -> bool:
         pass
+
+    @abstractmethod
+    def register_change_callback(self, callback: Callable[[List[str]], None]) -> None:
+        """Call ``callback`` with the keys of the settings that were changed."""
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional
 
-from src.domain.clipboard import ClipboardHistory
+from src.domain.clipboard import ClipboardHistory, HistoryChange
 
 
 class StoragePort(ABC):
@@ -10,10 +11,30 @@ class StoragePort(ABC):
     def save_history(self, history: ClipboardHistory) -> None:
         """Save clipboard history to storage."""
 
+    @abstractmethod
+    def apply_changes(self, changes: List[HistoryChange]) -> bool:
+        """Apply journal changes incrementally; return False if they failed."""
+
     @abstractmethod
     def load_history(self) -> ClipboardHistory:
         """Load clipboard history from storage."""
 
+    @abstractmethod
+    def load_content(self, item_id: int) -> Optional[str]:
+        """Load the full content of a stored item."""
+
+    @abstractmethod
+    def load_contents(self, item_ids: Iterable[int]) -> Dict[int, str]:
+        """Load the full contents of several stored items, by id, in bulk."""
+
+    @abstractmethod
+    def save_formats(self, item_id: int, formats: Dict[str, bytes]) -> None:
+        """Store the rich formats of an item by media type, replacing any."""
+
+    @abstractmethod
+    def load_formats(self, item_id: int) -> Dict[str, bytes]:
+        """Load the rich formats stored for an item."""
+
     @abstractmethod
     def clear_storage(self) -> None:
         """Clear all stored data."""
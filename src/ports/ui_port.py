@@ -1,11 +1,53 @@
 from abc import ABC, abstractmethod
-from typing import Callable, List
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, List, Optional, Tuple
+
+from src.domain.clipboard import ClipboardItem
+
+
+class DeltaKind(Enum):
+    INSERT = "insert"
+    REMOVE = "remove"
+    MOVE = "move"
+    REPLACE = "replace"
+    RESET = "reset"
+
+
+@dataclass(frozen=True)
+class HistoryDelta:
+    """One step of an in-place update of the displayed list.
+
+    ``INSERT`` puts ``items`` at ``position``; ``REMOVE`` drops ``item_id``
+    from ``position``; ``MOVE`` takes ``item_id`` from ``origin`` to
+    ``position``, counted after it was taken out, and shows it as
+    ``items[0]``; ``REPLACE`` shows ``items`` in the rows from ``position``;
+    ``RESET`` replaces the whole list with ``items``.
+    """
+
+    kind: DeltaKind
+    position: int = 0
+    items: Tuple[ClipboardItem, ...] = ()
+    item_id: Optional[int] = None
+    origin: Optional[int] = None
 
 
 class UIPort(ABC):
     @abstractmethod
-    def show_history(self, items: List[str]) -> None:
-        """Display history items in the UI."""
+    def show_history(self, items: List[ClipboardItem]) -> None:
+        """Display history items in the UI, replacing the current list."""
+
+    @abstractmethod
+    def append_history(self, items: List[ClipboardItem]) -> None:
+        """Append items to the list currently displayed in the UI."""
+
+    @abstractmethod
+    def apply_history_deltas(self, deltas: List[HistoryDelta]) -> None:
+        """Update the list displayed by ``show_history`` in place, in order."""
+
+    @abstractmethod
+    def show_thumbnail(self, item_id: int, uri: str) -> None:
+        """Show a thumbnail that became available for an image item."""
 
     @abstractmethod
     def show_message(self, message: str, message_type: str = "info") -> None:
@@ -17,7 +59,11 @@ class UIPort(ABC):
 
     @abstractmethod
     def register_copy_callback(self, callback: Callable[[int], None]) -> None:
-        """Register callback for when user wants to copy an item."""
+        """Register callback for when user wants to copy an item by its id."""
+
+    @abstractmethod
+    def register_rich_copy_callback(self, callback: Callable[[int], None]) -> None:
+        """Register callback for copying an item with its formatting."""
 
     @abstractmethod
     def register_search_callback(self, callback: Callable[[str], None]) -> None:
@@ -29,7 +75,47 @@ class UIPort(ABC):
 
     @abstractmethod
     def register_delete_callback(self, callback: Callable[[int], None]) -> None:
-        """Register callback for delete item action."""
+        """Register callback for deleting an item by its id."""
+
+    @abstractmethod
+    def register_bulk_copy_callback(
+        self, callback: Callable[[List[int]], None]
+    ) -> None:
+        """Register callback for copying several items, joined, by their ids."""
+
+    @abstractmethod
+    def register_bulk_delete_callback(
+        self, callback: Callable[[List[int]], None]
+    ) -> None:
+        """Register callback for deleting several items by their ids."""
+
+    @abstractmethod
+    def register_bulk_pin_callback(
+        self, callback: Callable[[List[int], bool], None]
+    ) -> None:
+        """Register callback for pinning or unpinning several items by id."""
+
+    @abstractmethod
+    def register_content_callback(
+        self, callback: Callable[[int], Optional[str]]
+    ) -> None:
+        """Register callback that returns the full content of an item by id."""
+
+    @abstractmethod
+    def register_thumbnail_callback(
+        self, callback: Callable[[int], Optional[str]]
+    ) -> None:
+        """Register callback that returns an image item's cached thumbnail URI.
+
+        It returns None while the thumbnail is being generated; it is then
+        delivered through ``show_thumbnail``.
+        """
+
+    @abstractmethod
+    def register_image_callback(
+        self, callback: Callable[[int], Optional[Tuple[str, bytes]]]
+    ) -> None:
+        """Register callback returning an image item's media type and data."""
 
     @abstractmethod
     def shutdown(self) -> None:
@@ -0,0 +1,33 @@
+import hashlib
+import sys
+
+from src.adapters import clipboard_changes
+from src.adapters.clipboard_changes import STREAM_CHUNK_BYTES, stream_digest
+
+
+class TestStreamDigest:
+    def _serve(self, monkeypatch, data: bytes):
+        # Written as a run of one byte, to keep the command line short.
+        script = f"import sys; sys.stdout.buffer.write({data[:1]!r} * {len(data)})"
+        monkeypatch.setattr(
+            clipboard_changes, "text_command", lambda: [sys.executable, "-c", script]
+        )
+
+    def test_hashes_the_text_across_chunks(self, monkeypatch):
+        data = b"x" * (STREAM_CHUNK_BYTES + 10)
+        self._serve(monkeypatch, data)
+
+        signal = stream_digest()
+
+        assert signal.token == hashlib.blake2b(data, digest_size=16).digest()
+        assert signal.size == len(data)
+        assert not signal.counts_changes
+        assert signal.spawned
+
+    def test_empty_clipboard_gives_no_signal(self, monkeypatch):
+        self._serve(monkeypatch, b"")
+        assert stream_digest() is None
+
+    def test_no_clipboard_tool_gives_no_signal(self, monkeypatch):
+        monkeypatch.setattr(clipboard_changes, "text_command", lambda: None)
+        assert stream_digest() is None
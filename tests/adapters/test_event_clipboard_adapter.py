@@ -0,0 +1,343 @@
+import os
+import threading
+import time
+
+import pytest
+
+from src.adapters import event_clipboard_adapter, pyperclip_adapter
+from src.adapters.clipboard_watchers import ClipboardWatcher, XFixesWatcher
+from src.adapters.event_clipboard_adapter import EventClipboardAdapter
+from src.adapters.poll_scheduler import PollScheduler
+from src.adapters.xlib import load_xlib
+from src.ports.clipboard_port import CLIPBOARD_SELECTION, PRIMARY_SELECTION
+
+
+class FakeWatcher(ClipboardWatcher):
+    def __init__(self):
+        self.changed = threading.Event()
+        self.selections = {CLIPBOARD_SELECTION}
+        self.failed = False
+        self.closed = False
+
+    def wait(self, timeout):
+        if self.failed:
+            raise OSError("watcher gone")
+        changed = self.changed.wait(timeout)
+        self.changed.clear()
+        return set(self.selections) if changed else set()
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self):
+        self.value = ""
+        self.answers = True
+        self.failed = False
+        self.closed = False
+        self.max_bytes = 1024
+        self.stamp = None
+        self.targets = {}
+
+    @property
+    def owned_text(self):
+        return self.value or None
+
+    def read_text(self):
+        if self.failed:
+            raise OSError("connection lost")
+        return self.value if self.answers else None
+
+    def selection_stamp(self):
+        if self.failed:
+            raise OSError("connection lost")
+        return self.stamp
+
+    def write_text(self, text, targets=None):
+        if self.failed:
+            raise OSError("connection lost")
+        if len(text) > self.max_bytes:
+            return False
+        self.value = text
+        self.targets = targets or {}
+        return True
+
+    def close(self):
+        self.closed = True
+
+
+class TestEventClipboardAdapter:
+    @pytest.fixture
+    def clipboard(self, monkeypatch):
+        state = {"value": ""}
+        monkeypatch.setattr(
+            pyperclip_adapter.pyperclip, "paste", lambda: state["value"]
+        )
+        monkeypatch.setattr(
+            pyperclip_adapter.clipboard_formats, "list_formats", lambda: []
+        )
+        monkeypatch.setattr(
+            pyperclip_adapter.clipboard_changes, "current_signal", lambda: None
+        )
+        return state
+
+    @pytest.fixture
+    def watcher(self):
+        return FakeWatcher()
+
+    @pytest.fixture
+    def adapter(self, clipboard, watcher):
+        adapter = EventClipboardAdapter(
+            watcher_factory=lambda: watcher,
+            connection_factory=lambda: None,
+            scheduler=PollScheduler(),
+        )
+        yield adapter
+        adapter.stop_monitoring()
+
+    def _wait_for(self, condition, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.005)
+        return condition()
+
+    def test_clipboard_is_read_on_notification_only(
+        self, adapter, clipboard, watcher, monkeypatch
+    ):
+        reads = []
+        monkeypatch.setattr(
+            pyperclip_adapter.pyperclip,
+            "paste",
+            lambda: reads.append(1) or clipboard["value"],
+        )
+        seen = []
+        adapter.start_monitoring(
+            lambda value, formats, source, selection: seen.append(value)
+        )
+        assert self._wait_for(lambda: len(reads) == 1)
+
+        clipboard["value"] = "first"
+        clipboard["value"] = "second"
+        time.sleep(0.05)
+        assert seen == []
+
+        watcher.changed.set()
+        assert self._wait_for(lambda: seen == ["second"])
+
+    def test_failed_watcher_falls_back_to_polling(self, adapter, clipboard, watcher):
+        watcher.failed = True
+        seen = []
+        adapter.start_monitoring(
+            lambda value, formats, source, selection: seen.append(value)
+        )
+
+        clipboard["value"] = "polled"
+
+        assert self._wait_for(lambda: seen == ["polled"])
+        assert watcher.closed
+
+
+class TestPrimarySelection:
+    @pytest.fixture
+    def primary(self, monkeypatch):
+        monkeypatch.setattr(event_clipboard_adapter, "PRIMARY_SETTLE_SECONDS", 0.05)
+        connection = FakeConnection()
+        reads = []
+        read_text = connection.read_text
+        connection.read_text = lambda: reads.append(1) or read_text()
+        connection.reads = reads
+        return connection
+
+    @pytest.fixture
+    def watcher(self):
+        watcher = FakeWatcher()
+        watcher.selections = {PRIMARY_SELECTION}
+        return watcher
+
+    @pytest.fixture
+    def adapter(self, primary, watcher, monkeypatch):
+        monkeypatch.setattr(pyperclip_adapter.pyperclip, "paste", lambda: "copied")
+        monkeypatch.setattr(
+            pyperclip_adapter.clipboard_formats, "list_formats", lambda: []
+        )
+        monkeypatch.setattr(
+            pyperclip_adapter.clipboard_changes, "current_signal", lambda: None
+        )
+        adapter = EventClipboardAdapter(
+            watcher_factory=lambda: watcher,
+            connection_factory=lambda: None,
+            scheduler=PollScheduler(),
+            watch_primary=True,
+            primary_connection_factory=lambda: primary,
+        )
+        yield adapter
+        adapter.stop_monitoring()
+
+    def _changes(self, adapter):
+        seen = []
+        adapter.start_monitoring(
+            lambda value, formats, source, selection: seen.append((value, selection))
+        )
+        return seen
+
+    def test_selection_drag_is_read_once_it_settles(self, adapter, primary, watcher):
+        seen = self._changes(adapter)
+        for length in range(1, 21):
+            primary.value = "dragged text"[:length]
+            watcher.changed.set()
+            time.sleep(0.005)
+        time.sleep(0.2)
+
+        assert seen == [
+            ("copied", CLIPBOARD_SELECTION),
+            ("dragged text", PRIMARY_SELECTION),
+        ]
+        assert len(primary.reads) == 1
+
+    def test_value_already_on_the_clipboard_is_not_reported_again(
+        self, adapter, primary, watcher
+    ):
+        seen = self._changes(adapter)
+        primary.value = "copied"
+        watcher.changed.set()
+        time.sleep(0.2)
+
+        assert seen == [("copied", CLIPBOARD_SELECTION)]
+
+
+class TestPersistentConnection:
+    @pytest.fixture
+    def connection(self):
+        return FakeConnection()
+
+    @pytest.fixture
+    def pyperclip_calls(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            pyperclip_adapter.pyperclip,
+            "paste",
+            lambda: calls.append("paste") or "from pyperclip",
+        )
+        monkeypatch.setattr(
+            pyperclip_adapter.pyperclip, "copy", lambda value: calls.append(value)
+        )
+        monkeypatch.setattr(
+            pyperclip_adapter.clipboard_changes, "current_signal", lambda: None
+        )
+        return calls
+
+    @pytest.fixture
+    def adapter(self, connection, pyperclip_calls):
+        return EventClipboardAdapter(
+            watcher_factory=lambda: None, connection_factory=lambda: connection
+        )
+
+    def test_reads_and_writes_use_the_connection(
+        self, adapter, connection, pyperclip_calls
+    ):
+        adapter.set_content("copied")
+        assert connection.value == "copied"
+        assert adapter.get_content() == "copied"
+        assert pyperclip_calls == []
+
+    def test_unanswered_read_keeps_last_value(self, adapter, connection):
+        adapter._last_value = "last"
+        connection.answers = False
+        assert adapter.get_content() == "last"
+
+    def test_lost_connection_falls_back_to_pyperclip(self, adapter, connection):
+        connection.failed = True
+        assert adapter.get_content() == "from pyperclip"
+        assert connection.closed
+
+    def test_rich_content_is_served_with_the_text(
+        self, adapter, connection, pyperclip_calls
+    ):
+        adapter.set_rich_content("bold", {"text/rtf": b"{\\rtf1 bold}"})
+
+        assert connection.value == "bold"
+        assert connection.targets == {
+            "text/rtf": b"{\\rtf1 bold}",
+            "application/rtf": b"{\\rtf1 bold}",
+        }
+        assert pyperclip_calls == []
+
+    def test_value_too_large_to_serve_goes_through_pyperclip(
+        self, adapter, connection, pyperclip_calls
+    ):
+        connection.max_bytes = 4
+        adapter.set_content("too large")
+        assert connection.value == ""
+        assert pyperclip_calls == ["too large"]
+
+    def test_connection_lost_on_two_threads_is_closed_once(
+        self, adapter, connection, monkeypatch
+    ):
+        closes = []
+        monkeypatch.setattr(connection, "close", lambda: closes.append(1))
+        connection.failed = True
+        threads = [
+            threading.Thread(target=adapter.set_content, args=(f"clip {i}",))
+            for i in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert closes == [1]
+        assert adapter._connection is None
+
+    def test_selection_stamp_gates_reads_when_polling(
+        self, adapter, connection, monkeypatch
+    ):
+        reads = []
+        adapter._image_callback = lambda data: None
+        monkeypatch.setattr(
+            pyperclip_adapter.clipboard_images,
+            "read_image",
+            lambda: reads.append(1) or b"image",
+        )
+        connection.stamp = (7, 100)
+
+        adapter._poll_once()
+        adapter._poll_once()
+        connection.stamp = (7, 200)
+        adapter._poll_once()
+
+        assert len(reads) == 2
+
+    def test_owned_value_is_handed_over_on_stop(
+        self, adapter, connection, pyperclip_calls
+    ):
+        adapter.set_content("keep me")
+        adapter.stop_monitoring()
+        assert connection.closed
+        assert pyperclip_calls == ["keep me"]
+
+
+@pytest.mark.skipif(not os.environ.get("DISPLAY"), reason="needs an X server")
+class TestXFixesWatcher:
+    def test_selection_owner_change_is_notified(self):
+        try:
+            watcher = XFixesWatcher()
+        except OSError as e:
+            pytest.skip(str(e))
+        x11 = load_xlib()
+        # A second client takes ownership, as another application would.
+        owner = x11.XOpenDisplay(None)
+        try:
+            window = x11.XCreateSimpleWindow(
+                owner, x11.XDefaultRootWindow(owner), 0, 0, 1, 1, 0, 0, 0
+            )
+            clipboard = x11.XInternAtom(owner, b"CLIPBOARD", False)
+            assert not watcher.wait(0.05)
+
+            x11.XSetSelectionOwner(owner, clipboard, window, 0)
+            x11.XFlush(owner)
+
+            assert watcher.wait(2.0) == {CLIPBOARD_SELECTION}
+        finally:
+            x11.XCloseDisplay(owner)
+            watcher.close()
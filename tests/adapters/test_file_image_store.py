@@ -0,0 +1,78 @@
+import io
+import struct
+import threading
+
+import pytest
+
+from src.adapters.file_image_store import FileImageStore, image_header
+from src.domain.clipboard.clipboard_item import hash_bytes
+
+
+def fake_png(width, height, payload=b""):
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + b"\x00\x00\x00\rIHDR"
+        + struct.pack(">II", width, height)
+        + payload
+    )
+
+
+class TestFileImageStore:
+    @pytest.fixture
+    def store(self, tmp_path):
+        store = FileImageStore(tmp_path)
+        yield store
+        store.close()
+
+    def test_put_reads_dimensions_from_header(self, store):
+        info = store.put(fake_png(640, 480))
+
+        assert (info.media_type, info.width, info.height) == ("image/png", 640, 480)
+        assert info.label == "Image 640×480"
+        assert info.content_hash == hash_bytes(fake_png(640, 480))
+
+    def test_bmp_header_is_recognized(self):
+        header = b"BM" + b"\x00" * 16 + struct.pack("<ii", 32, -16)
+        assert image_header(header) == ("image/bmp", 32, 16)
+
+    def test_same_image_is_stored_once(self, store, tmp_path):
+        first = store.put(fake_png(1, 1))
+        second = store.put(fake_png(1, 1))
+
+        assert first == second
+        assert len([path for path in tmp_path.iterdir() if path.is_file()]) == 1
+
+    def test_get_returns_full_data(self, store):
+        data = fake_png(2, 2, b"pixels")
+        info = store.put(data)
+        assert store.get(info.content_hash) == data
+
+    def test_remove_and_retain(self, store):
+        kept = store.put(fake_png(1, 1, b"kept"))
+        dropped = store.put(fake_png(1, 1, b"dropped"))
+        removed = store.put(fake_png(1, 1, b"removed"))
+
+        store.remove(removed.content_hash)
+        store.retain([kept.content_hash])
+
+        assert store.get(kept.content_hash) is not None
+        assert store.get(dropped.content_hash) is None
+        assert store.get(removed.content_hash) is None
+
+    def test_thumbnail_is_generated_in_background_and_cached(self, store):
+        image_module = pytest.importorskip("PIL.Image")
+        buffer = io.BytesIO()
+        image_module.new("RGB", (400, 200), "red").save(buffer, "PNG")
+        info = store.put(buffer.getvalue())
+        ready = threading.Event()
+        delivered = []
+
+        def on_ready(uri):
+            delivered.append(uri)
+            ready.set()
+
+        assert store.thumbnail(info.content_hash, on_ready) is None
+        assert ready.wait(5)
+
+        assert delivered[0].startswith("data:image/png;base64,")
+        assert store.thumbnail(info.content_hash, on_ready) == delivered[0]
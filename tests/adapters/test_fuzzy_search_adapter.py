@@ -110,3 +110,20 @@ class TestFuzzySearchAdapter:
         adapter = FuzzySearchAdapter(settings_service=mock_settings_service)
         assert adapter.max_l_dist == 1  # default from app_settings.py
         assert adapter.case_sensitive is False  # default from app_settings.py
+
+    def test_iter_search_is_lazy(self, adapter, sample_items):
+        results = adapter.iter_search(iter(sample_items), "o")
+        assert next(results).content == "Hello World"
+        assert next(results).content == "Python Programming"
+
+    def test_iter_search_empty_query_yields_all_items(self, adapter, sample_items):
+        assert list(adapter.iter_search(sample_items, "")) == sample_items
+
+    def test_iter_search_contents_matches_the_given_content(
+        self, adapter, sample_items
+    ):
+        entries = [(item, f"body of {item.content}") for item in sample_items]
+
+        results = list(adapter.iter_search_contents(entries, "body of Quick"))
+
+        assert results == [sample_items[4]]
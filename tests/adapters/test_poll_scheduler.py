@@ -0,0 +1,123 @@
+import pytest
+
+from src.adapters.poll_scheduler import PAUSE_CHECK_SECONDS, PollScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPollScheduler:
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def away(self):
+        return {"value": False}
+
+    @pytest.fixture
+    def scheduler(self, clock, away):
+        return PollScheduler(
+            active_interval=0.1,
+            idle_interval=1.0,
+            is_away=lambda: away["value"],
+            clock=clock,
+        )
+
+    def test_interval_backs_off_up_to_the_idle_interval(self, scheduler):
+        delays = []
+        for _ in range(6):
+            delays.append(scheduler.next_delay())
+            scheduler.record_poll(False)
+
+        assert delays == pytest.approx([0.1, 0.2, 0.4, 0.8, 1.0, 1.0])
+
+    def test_change_restores_the_active_interval(self, scheduler):
+        for _ in range(3):
+            scheduler.record_poll(False)
+        scheduler.record_poll(True)
+
+        assert scheduler.next_delay() == pytest.approx(0.1)
+
+    def test_changes_after_backing_off_count_as_late(self, scheduler):
+        scheduler.record_poll(True)
+        scheduler.record_poll(False)
+        scheduler.record_poll(False)
+        scheduler.record_poll(True)
+
+        stats = scheduler.stats()
+        assert stats.changes == 2
+        assert stats.late_changes == 1
+        assert stats.max_detection_delay == pytest.approx(0.4)
+
+    def test_costly_polls_come_no_faster_than_the_costly_interval(self, clock):
+        scheduler = PollScheduler(
+            active_interval=0.1, idle_interval=1.0, clock=clock, costly_interval=0.5
+        )
+
+        scheduler.set_costly_polls(True)
+        delays = [scheduler.next_delay()]
+        scheduler.record_poll(False)
+        delays.append(scheduler.next_delay())
+        scheduler.record_poll(True)
+        delays.append(scheduler.next_delay())
+        scheduler.set_costly_polls(False)
+        scheduler.record_poll(True)
+        delays.append(scheduler.next_delay())
+
+        assert delays == pytest.approx([0.5, 1.0, 0.5, 0.1])
+
+    def test_activity_restores_the_active_interval(self, scheduler):
+        for _ in range(5):
+            scheduler.record_poll(False)
+        scheduler.notify_activity()
+
+        assert scheduler.next_delay() == pytest.approx(0.1)
+
+    def test_pauses_while_the_user_is_away(self, scheduler, clock, away):
+        away["value"] = True
+
+        assert scheduler.next_delay() == PAUSE_CHECK_SECONDS
+        assert scheduler.paused
+
+        clock.now += 30
+        assert scheduler.stats().paused_seconds == pytest.approx(30)
+
+    def test_away_state_is_checked_at_most_every_pause_check(
+        self, scheduler, clock, away
+    ):
+        scheduler.next_delay()
+        away["value"] = True
+
+        scheduler.next_delay()
+        assert not scheduler.paused
+
+        clock.now += PAUSE_CHECK_SECONDS
+        scheduler.next_delay()
+        assert scheduler.paused
+
+    def test_activity_resumes_a_pause(self, scheduler, clock, away):
+        away["value"] = True
+        scheduler.next_delay()
+        clock.now += 10
+
+        scheduler.notify_activity()
+
+        stats = scheduler.stats()
+        assert not stats.paused
+        assert stats.paused_seconds == pytest.approx(10)
+        assert scheduler.next_delay() == pytest.approx(0.1)
+
+    def test_failing_away_check_keeps_polling(self, clock):
+        def is_away():
+            raise OSError("no display")
+
+        scheduler = PollScheduler(is_away=is_away, clock=clock)
+
+        scheduler.next_delay()
+        assert not scheduler.paused
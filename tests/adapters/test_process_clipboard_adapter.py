@@ -0,0 +1,133 @@
+from functools import partial
+import os
+from pathlib import Path
+import time
+from unittest.mock import Mock
+
+from src.adapters import process_clipboard_adapter
+from src.adapters.process_clipboard_adapter import ProcessClipboardAdapter
+from src.ports.clipboard_port import CLIPBOARD_SELECTION, ClipboardPort
+
+
+class ScriptedAdapter(ClipboardPort):
+    """Reports a fixed set of changes; runs in the monitor process."""
+
+    def __init__(self, workdir: str, crash_once: bool = False, values=()):
+        self._workdir = Path(workdir)
+        self._crash_once = crash_once
+        self._values = values
+
+    def get_content(self):
+        return "local"
+
+    def set_content(self, content):
+        (self._workdir / "written").write_text(content)
+
+    def get_formats(self):
+        return []
+
+    def get_format(self, media_type):
+        return None
+
+    def set_rich_content(self, content, formats):
+        self.set_content(content)
+
+    def get_image(self):
+        return None
+
+    def set_image(self, data):
+        pass
+
+    def set_capture_limit(self, max_bytes, truncate):
+        pass
+
+    def notify_activity(self):
+        pass
+
+    def start_monitoring(self, callback, image_callback=None):
+        marker = self._workdir / "started"
+        if self._crash_once and not marker.exists():
+            marker.touch()
+            os._exit(3)
+        if self._values:
+            for value in self._values:
+                callback(value, [], None, CLIPBOARD_SELECTION)
+            return
+        callback("small", ["text/html"], "App", CLIPBOARD_SELECTION)
+        callback("x" * 1000, [], None, CLIPBOARD_SELECTION)
+        if image_callback:
+            image_callback(b"image bytes")
+
+    def stop_monitoring(self):
+        pass
+
+
+class TestProcessClipboardAdapter:
+    def _wait_for(self, condition, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return condition()
+
+    def _start(self, adapter):
+        texts, images = [], []
+        adapter.start_monitoring(lambda *change: texts.append(change), images.append)
+        return texts, images
+
+    def test_changes_are_handed_over_from_the_monitor_process(self, tmp_path):
+        # Smaller than the second value, which then takes the pipe.
+        adapter = ProcessClipboardAdapter(
+            partial(ScriptedAdapter, str(tmp_path)), ring_bytes=256
+        )
+        texts, images = self._start(adapter)
+        try:
+            assert self._wait_for(lambda: len(texts) == 2 and images)
+            adapter.set_content("from the app")
+            assert self._wait_for(lambda: (tmp_path / "written").exists())
+        finally:
+            adapter.stop_monitoring()
+
+        assert texts == [
+            ("small", ["text/html"], "App", CLIPBOARD_SELECTION),
+            ("x" * 1000, [], None, CLIPBOARD_SELECTION),
+        ]
+        assert images == [b"image bytes"]
+        assert (tmp_path / "written").read_text() == "from the app"
+        assert adapter.get_content() == "local"
+
+    def test_record_sent_over_the_pipe_keeps_its_place(self, tmp_path):
+        values = ("x" * 1000, "small", "y" * 1000, "after")
+        adapter = ProcessClipboardAdapter(
+            partial(ScriptedAdapter, str(tmp_path), values=values), ring_bytes=256
+        )
+        texts, _ = self._start(adapter)
+        try:
+            assert self._wait_for(lambda: len(texts) == len(values))
+        finally:
+            adapter.stop_monitoring()
+
+        assert [change[0] for change in texts] == list(values)
+
+    def test_crashed_monitor_process_is_restarted(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(process_clipboard_adapter, "RESTART_BACKOFF_SECONDS", 0.01)
+        adapter = ProcessClipboardAdapter(
+            partial(ScriptedAdapter, str(tmp_path), crash_once=True)
+        )
+        texts, _ = self._start(adapter)
+        try:
+            assert self._wait_for(lambda: len(texts) == 2)
+        finally:
+            adapter.stop_monitoring()
+
+        assert adapter.restarts == 1
+
+    def test_stopping_releases_the_local_adapter(self):
+        local = Mock(spec=ClipboardPort)
+        adapter = ProcessClipboardAdapter(lambda: local)
+
+        adapter.set_content("no monitor yet")
+        adapter.stop_monitoring()
+
+        local.set_content.assert_called_once_with("no monitor yet")
+        local.start_monitoring.assert_not_called()
+        local.stop_monitoring.assert_called_once()
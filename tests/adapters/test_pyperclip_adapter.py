@@ -0,0 +1,312 @@
+import threading
+import time
+
+import pytest
+
+from src.adapters import pyperclip_adapter
+from src.adapters.clipboard_changes import ChangeSignal
+from src.adapters.poll_scheduler import PollScheduler
+from src.adapters.pyperclip_adapter import SELF_WRITE_WINDOW, PyperclipAdapter
+
+
+class TestPyperclipAdapter:
+    @pytest.fixture
+    def clipboard(self, monkeypatch):
+        state = {"value": "", "formats": []}
+        monkeypatch.setattr(
+            pyperclip_adapter.pyperclip, "paste", lambda: state["value"]
+        )
+        monkeypatch.setattr(
+            pyperclip_adapter.pyperclip,
+            "copy",
+            lambda value: state.__setitem__("value", value),
+        )
+        monkeypatch.setattr(
+            pyperclip_adapter.clipboard_formats,
+            "list_formats",
+            lambda: state["formats"],
+        )
+        monkeypatch.setattr(
+            pyperclip_adapter.clipboard_changes, "current_signal", lambda: None
+        )
+        return state
+
+    @pytest.fixture
+    def counter(self, monkeypatch):
+        counter = {"value": 1}
+        monkeypatch.setattr(
+            pyperclip_adapter.clipboard_changes,
+            "current_signal",
+            lambda: ChangeSignal(counter["value"], counts_changes=True),
+        )
+        return counter
+
+    @pytest.fixture
+    def seen(self):
+        return []
+
+    @pytest.fixture
+    def adapter(self, clipboard, seen):
+        adapter = PyperclipAdapter(PollScheduler())
+        adapter._callback = lambda value, formats, source, selection: seen.append(value)
+        return adapter
+
+    def test_external_changes_are_reported(self, adapter, clipboard, seen):
+        clipboard["value"] = "from another app"
+        adapter._poll_once()
+        assert seen == ["from another app"]
+
+    def test_poll_tells_whether_the_clipboard_changed(self, adapter, clipboard):
+        clipboard["value"] = "new"
+        assert adapter._poll_once()
+        assert not adapter._poll_once()
+
+    def test_own_writes_are_not_reported(self, adapter, seen):
+        adapter.set_content("from history")
+        adapter._poll_once()
+        assert seen == []
+
+    def test_same_value_copied_externally_later_is_reported(
+        self, adapter, clipboard, seen
+    ):
+        adapter.set_content("text")
+        adapter._poll_once()
+        clipboard["value"] = "other"
+        adapter._poll_once()
+        clipboard["value"] = "text"
+        adapter._poll_once()
+
+        assert seen == ["other", "text"]
+
+    def test_unseen_writes_are_forgotten(self, adapter, clipboard, seen):
+        for i in range(SELF_WRITE_WINDOW + 1):
+            adapter._tag_self_write(f"write {i}")
+
+        clipboard["value"] = "write 0"
+        adapter._poll_once()
+
+        assert seen == ["write 0"]
+
+    def test_unseen_write_expires_at_the_next_change(
+        self, adapter, clipboard, seen, monkeypatch
+    ):
+        monkeypatch.setattr(pyperclip_adapter.pyperclip, "copy", lambda value: None)
+        adapter.set_content("text")
+
+        clipboard["value"] = "other"
+        adapter._poll_once()
+        clipboard["value"] = "text"
+        adapter._poll_once()
+
+        assert seen == ["other", "text"]
+
+    def test_write_still_in_flight_is_not_expired(self, adapter, clipboard, seen):
+        # Tagged, but the write has not finished when the change is seen.
+        adapter._tag_self_write("text")
+        clipboard["value"] = "other"
+        adapter._poll_once()
+        clipboard["value"] = "text"
+        adapter._poll_once()
+
+        assert seen == ["other"]
+
+    def test_changes_come_with_the_offered_formats(self, adapter, clipboard):
+        reported = []
+        adapter._callback = lambda value, formats, source, selection: reported.append(
+            formats
+        )
+        clipboard["value"] = "<b>bold</b>"
+        clipboard["formats"] = ["text/html"]
+
+        adapter._poll_once()
+
+        assert reported == [["text/html"]]
+
+    def test_own_rich_writes_are_not_reported(self, adapter, seen, monkeypatch):
+        def write_formats(text, formats):
+            pyperclip_adapter.pyperclip.copy(text)
+            return True
+
+        monkeypatch.setattr(
+            pyperclip_adapter.clipboard_formats, "write_formats", write_formats
+        )
+
+        adapter.set_rich_content("bold", {"text/html": b"<b>bold</b>"})
+        adapter._poll_once()
+
+        assert seen == []
+
+    def test_rich_write_falls_back_to_the_plain_text(
+        self, adapter, clipboard, seen, monkeypatch
+    ):
+        monkeypatch.setattr(
+            pyperclip_adapter.clipboard_formats,
+            "write_formats",
+            lambda text, formats: False,
+        )
+
+        adapter.set_rich_content("bold", {"text/html": b"<b>bold</b>"})
+        adapter._poll_once()
+
+        assert clipboard["value"] == "bold"
+        assert seen == []
+
+    def test_new_images_are_reported_once(self, adapter, monkeypatch):
+        images = []
+        adapter._image_callback = images.append
+        monkeypatch.setattr(
+            pyperclip_adapter.clipboard_images, "read_image", lambda: b"image"
+        )
+
+        adapter._poll_once()
+        adapter._poll_once()
+
+        assert images == [b"image"]
+
+    def test_image_is_only_read_when_the_change_counter_moves(
+        self, adapter, counter, monkeypatch
+    ):
+        images, reads = [], []
+        adapter._image_callback = images.append
+        monkeypatch.setattr(
+            pyperclip_adapter.clipboard_images,
+            "read_image",
+            lambda: reads.append(1) or b"image %d" % counter["value"],
+        )
+
+        adapter._poll_once()
+        adapter._poll_once()
+        counter["value"] = 2
+        adapter._poll_once()
+
+        assert len(reads) == 2
+        assert images == [b"image 1", b"image 2"]
+
+    def test_text_is_not_read_while_the_counter_stays(
+        self, adapter, clipboard, counter, monkeypatch
+    ):
+        reads = []
+        monkeypatch.setattr(
+            pyperclip_adapter.pyperclip,
+            "paste",
+            lambda: reads.append(1) or clipboard["value"],
+        )
+        clipboard["value"] = "first"
+
+        assert adapter._poll_once()
+        assert not adapter._poll_once()
+        counter["value"] = 2
+        clipboard["value"] = "second"
+        assert adapter._poll_once()
+
+        assert len(reads) == 2
+
+    def test_counter_jumps_are_counted_as_missed_changes(
+        self, adapter, clipboard, counter, seen
+    ):
+        clipboard["value"] = "first"
+        adapter._poll_once()
+        adapter.set_content("own write")
+        counter["value"] = 5
+        clipboard["value"] = "last"
+        adapter._poll_once()
+
+        # Four changes: our write, "last" and two that nobody saw.
+        assert seen == ["first", "last"]
+        assert adapter.poll_stats.missed_changes == 2
+
+    def test_clips_over_the_capture_limit_are_skipped(self, adapter, clipboard, seen):
+        adapter.set_capture_limit(8, truncate=False)
+        clipboard["value"] = "much too long"
+        adapter._poll_once()
+        clipboard["value"] = "short"
+        adapter._poll_once()
+
+        assert seen == ["short"]
+
+    def test_clips_over_the_capture_limit_can_be_truncated(
+        self, adapter, clipboard, seen
+    ):
+        adapter.set_capture_limit(8, truncate=True)
+        clipboard["value"] = "much too long"
+        adapter._poll_once()
+
+        assert seen == ["much too"]
+
+    def test_clip_known_to_be_too_large_is_not_read(
+        self, adapter, clipboard, seen, monkeypatch
+    ):
+        reads = []
+        monkeypatch.setattr(
+            pyperclip_adapter.pyperclip, "paste", lambda: reads.append(1) or "big"
+        )
+        monkeypatch.setattr(
+            pyperclip_adapter.clipboard_changes,
+            "current_signal",
+            lambda: ChangeSignal(b"digest", size=100 * 1024 * 1024),
+        )
+        adapter.set_capture_limit(1024, truncate=False)
+
+        assert adapter._poll_once()
+        assert reads == []
+        assert seen == []
+
+    def test_digest_signal_slows_polling_down(self, clipboard, monkeypatch):
+        monkeypatch.setattr(
+            pyperclip_adapter.clipboard_changes,
+            "current_signal",
+            lambda: ChangeSignal(b"digest", size=3, spawned=True),
+        )
+        adapter = PyperclipAdapter(PollScheduler(0.1, 1.0, costly_interval=0.5))
+        clipboard["value"] = "new"
+
+        adapter._scheduler.record_poll(adapter._poll_once())
+
+        assert adapter.poll_stats.interval == pytest.approx(0.5)
+
+    def test_own_images_are_not_reported(self, adapter, monkeypatch):
+        images = []
+        adapter._image_callback = images.append
+        monkeypatch.setattr(
+            pyperclip_adapter.clipboard_images, "write_image", lambda data: True
+        )
+        monkeypatch.setattr(
+            pyperclip_adapter.clipboard_images, "read_image", lambda: b"image"
+        )
+
+        adapter.set_image(b"image")
+        adapter._poll_once()
+
+        assert images == []
+
+
+class TestPollingSchedule:
+    @pytest.fixture
+    def reads(self, monkeypatch):
+        reads = []
+        monkeypatch.setattr(
+            pyperclip_adapter.pyperclip, "paste", lambda: reads.append(1) or ""
+        )
+        monkeypatch.setattr(
+            pyperclip_adapter.clipboard_changes, "current_signal", lambda: None
+        )
+        return reads
+
+    def test_nothing_is_read_while_the_user_is_away(self, reads):
+        away = threading.Event()
+        away.set()
+        adapter = PyperclipAdapter(PollScheduler(0.01, 0.01, is_away=away.is_set))
+        adapter.start_monitoring(lambda value, formats, source, selection: None)
+        try:
+            time.sleep(0.1)
+            assert len(reads) == 1  # the initial read only
+            assert adapter.poll_stats.paused
+
+            away.clear()
+            adapter.notify_activity()
+            deadline = time.monotonic() + 2.0
+            while len(reads) < 3 and time.monotonic() < deadline:
+                time.sleep(0.005)
+            assert len(reads) >= 3
+        finally:
+            adapter.stop_monitoring()
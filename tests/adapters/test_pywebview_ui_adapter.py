@@ -0,0 +1,127 @@
+from datetime import datetime
+
+import pytest
+
+from src.adapters.ui.pywebview_ui_adapter import (
+    MAX_ROWS_PER_REQUEST,
+    PyWebViewUIAdapter,
+)
+from src.domain.clipboard import ClipboardItem
+from src.ports.ui_port import DeltaKind, HistoryDelta
+
+
+def make_items(count, first_id=1):
+    return [
+        ClipboardItem(content=f"item {i}", created_at=datetime.now(), id=first_id + i)
+        for i in range(count)
+    ]
+
+
+class TestRowRanges:
+    @pytest.fixture
+    def ui(self):
+        return PyWebViewUIAdapter()
+
+    def test_rows_come_from_the_requested_range(self, ui):
+        ui.show_history(make_items(100))
+
+        reply = ui.handle_js_get_rows(10, 3)
+
+        assert reply["total"] == 100
+        assert reply["start"] == 10
+        assert [row["id"] for row in reply["rows"]] == [11, 12, 13]
+        assert reply["rows"][0]["preview"] == "item 10"
+
+    def test_range_past_the_end_is_cut_short(self, ui):
+        ui.show_history(make_items(5))
+
+        reply = ui.handle_js_get_rows(3, 10)
+
+        assert [row["id"] for row in reply["rows"]] == [4, 5]
+        assert ui.handle_js_get_rows(50, 10)["rows"] == []
+
+    def test_request_size_is_capped(self, ui):
+        ui.show_history(make_items(MAX_ROWS_PER_REQUEST + 100))
+
+        reply = ui.handle_js_get_rows(0, MAX_ROWS_PER_REQUEST + 100)
+
+        assert len(reply["rows"]) == MAX_ROWS_PER_REQUEST
+
+    def test_replacing_results_changes_version_appending_does_not(self, ui):
+        ui.show_history(make_items(3))
+        version = ui.handle_js_get_rows(0, 1)["version"]
+
+        ui.append_history(make_items(2, first_id=4))
+        appended = ui.handle_js_get_rows(0, 10)
+        ui.show_history(make_items(1))
+        replaced = ui.handle_js_get_rows(0, 10)
+
+        assert appended["version"] == version
+        assert appended["total"] == 5
+        assert replaced["version"] == version + 1
+        assert replaced["total"] == 1
+
+    def test_ids_between_follow_list_order(self, ui):
+        ui.show_history(make_items(10))
+
+        assert ui.handle_js_get_ids_between(7, 4) == [4, 5, 6, 7]
+        assert ui.handle_js_get_ids_between(3, 3) == [3]
+        assert ui.handle_js_get_ids_between(3, 99) == []
+
+    def test_bulk_copy_joins_in_list_order(self, ui):
+        copied = []
+        ui.register_bulk_copy_callback(copied.append)
+        ui.show_history(make_items(5))
+
+        ui.handle_js_copy_many([4, 1, 3])
+
+        assert copied == [[1, 3, 4]]
+
+
+class TestHistoryDeltas:
+    @pytest.fixture
+    def ui(self):
+        ui = PyWebViewUIAdapter()
+        ui.show_history(make_items(5))
+        return ui
+
+    def _ids(self, ui):
+        return [row["id"] for row in ui.handle_js_get_rows(0, 100)["rows"]]
+
+    def test_deltas_update_rows_in_place(self, ui):
+        new, moved = make_items(1, first_id=10)[0], make_items(1, first_id=4)[0]
+        version = ui.handle_js_get_rows(0, 1)["version"]
+
+        ui.apply_history_deltas(
+            [
+                HistoryDelta(DeltaKind.INSERT, 0, (new,)),
+                HistoryDelta(DeltaKind.REMOVE, 2, item_id=2),
+                HistoryDelta(DeltaKind.MOVE, 0, (moved,), item_id=4, origin=3),
+            ]
+        )
+
+        assert self._ids(ui) == [4, 10, 1, 3, 5]
+        assert ui.handle_js_get_rows(0, 1)["version"] == version + 1
+
+    def test_stale_positions_are_resolved_by_id(self, ui):
+        ui.apply_history_deltas([HistoryDelta(DeltaKind.REMOVE, 0, item_id=3)])
+
+        assert self._ids(ui) == [1, 2, 4, 5]
+
+    def test_deltas_for_unlisted_items_change_nothing(self, ui):
+        version = ui.handle_js_get_rows(0, 1)["version"]
+
+        ui.apply_history_deltas(
+            [
+                HistoryDelta(DeltaKind.REMOVE, 0, item_id=99),
+                HistoryDelta(DeltaKind.REPLACE, 0, make_items(1, first_id=99)),
+            ]
+        )
+
+        assert self._ids(ui) == [1, 2, 3, 4, 5]
+        assert ui.handle_js_get_rows(0, 1)["version"] == version
+
+    def test_reset_replaces_the_rows(self, ui):
+        ui.apply_history_deltas([HistoryDelta(DeltaKind.RESET)])
+
+        assert ui.handle_js_get_rows(0, 10)["total"] == 0
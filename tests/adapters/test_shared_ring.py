@@ -0,0 +1,42 @@
+import pytest
+
+from src.adapters.shared_ring import SharedRing
+
+
+class TestSharedRing:
+    @pytest.fixture
+    def ring(self):
+        ring = SharedRing(capacity=64)
+        yield ring
+        ring.close()
+
+    def test_records_come_out_in_order(self, ring):
+        assert ring.put(b"one")
+        assert ring.put(b"two")
+
+        assert ring.get() == b"one"
+        assert ring.get() == b"two"
+        assert ring.get() is None
+
+    def test_records_wrap_around_the_end(self, ring):
+        for i in range(20):
+            record = bytes([i]) * 20
+            assert ring.put(record)
+            assert ring.get() == record
+
+    def test_full_ring_refuses_records(self, ring):
+        assert ring.put(b"x" * 40)
+        assert not ring.put(b"y" * 40)
+        assert not ring.fits(64)
+
+        assert ring.get() == b"x" * 40
+        assert ring.put(b"y" * 40)
+
+    def test_other_process_attaches_by_name(self, ring):
+        reader = SharedRing(ring.name)
+        try:
+            ring.put(b"shared")
+            assert reader.get() == b"shared"
+            assert ring.get() is None
+        finally:
+            reader.close()
@@ -7,6 +7,7 @@ import pytest
 
 from src.adapters.sqlite_storage_adapter import SqliteStorageAdapter
 from src.domain.clipboard import ClipboardHistory, ClipboardItem
+from src.domain.clipboard.near_duplicate_index import content_signature
 
 
 class TestSqliteStorageAdapter:
@@ -111,6 +112,14 @@ class TestSqliteStorageAdapter:
         assert loaded_history.items[1].content == "Second item"
         assert loaded_history.items[2].content == "First item"
 
+    def test_load_history_preserves_item_ids(self, adapter, sample_history):
+        adapter.save_history(sample_history)
+        loaded_history = adapter.load_history()
+
+        saved_ids = {item.content: item.id for item in sample_history.items}
+        loaded_ids = {item.content: item.id for item in loaded_history.items}
+        assert loaded_ids == saved_ids
+
     def test_load_history_preserves_datetime_format(self, adapter, sample_history):
         adapter.save_history(sample_history)
         loaded_history = adapter.load_history()
@@ -151,6 +160,18 @@ class TestSqliteStorageAdapter:
         loaded_history = adapter.load_history()
         assert loaded_history.max_items == 1000
 
+    def test_load_history_is_not_capped_by_the_default_limit(self, adapter):
+        items = [
+            ClipboardItem(content=f"item {i}", created_at=datetime(2024, 1, 1))
+            for i in range(1500)
+        ]
+        adapter.save_history(ClipboardHistory(items=items, max_items=1500))
+
+        loaded_history = adapter.load_history()
+
+        assert len(loaded_history) == 1500
+        assert loaded_history.changes_since(0) == []
+
     def test_database_error_handling_on_init(self):
         invalid_path = "/invalid/path/database.db"
         with pytest.raises(sqlite3.Error):
@@ -191,3 +212,238 @@ class TestSqliteStorageAdapter:
             )
             settings_table_exists = cursor.fetchone() is None
             assert settings_table_exists  # Assert that settings table does NOT exist
+
+    def test_load_history_keeps_bodies_out_of_memory(self, adapter, sample_history):
+        adapter.save_history(sample_history)
+        loaded_history = adapter.load_history()
+
+        assert not any(item.is_loaded for item in loaded_history.items)
+        assert loaded_history.items[0].preview() == "Third item"
+
+    def test_load_content_reads_body_by_id(self, adapter, temp_db_path):
+        history = ClipboardHistory(
+            items=[ClipboardItem(content="x" * 1000, created_at=datetime.now())]
+        )
+        adapter.save_history(history)
+        item_id = history.items[0].id
+
+        reopened = SqliteStorageAdapter(temp_db_path)
+        assert reopened.load_content(item_id) == "x" * 1000
+        assert reopened.load_content(item_id + 1) is None
+
+    def test_load_content_reuses_one_connection(
+        self, adapter, sample_history, monkeypatch
+    ):
+        adapter.save_history(sample_history)
+        connect = sqlite3.connect
+        opened = []
+        monkeypatch.setattr(
+            sqlite3,
+            "connect",
+            lambda *args, **kwargs: opened.append(args) or connect(*args, **kwargs),
+        )
+        adapter._content_cache.clear()
+
+        contents = [adapter.load_content(item.id) for item in sample_history.items]
+
+        assert contents == ["First item", "Second item", "Third item"]
+        assert len(opened) == 1
+
+    def test_load_contents_reads_bodies_in_bulk(self, adapter, sample_history):
+        adapter.save_history(sample_history)
+        adapter._content_cache.clear()
+        ids = [item.id for item in sample_history.items]
+
+        contents = adapter.load_contents(ids + [max(ids) + 1])
+
+        assert contents == dict(zip(ids, ["First item", "Second item", "Third item"]))
+        # A scan leaves the cache to the bodies read one by one.
+        assert len(adapter._content_cache) == 0
+
+    def test_bodies_are_read_again_after_clearing_storage(
+        self, adapter, sample_history, temp_db_path
+    ):
+        adapter.save_history(sample_history)
+        assert adapter.load_content(sample_history.items[0].id) == "First item"
+
+        adapter.clear_storage()
+        reopened = SqliteStorageAdapter(temp_db_path)
+        history = ClipboardHistory(
+            items=[ClipboardItem(content="New item", created_at=datetime.now())]
+        )
+        reopened.save_history(history)
+
+        assert adapter.load_content(history.items[0].id) == "New item"
+
+    def test_save_history_releases_saved_bodies(self, adapter, sample_history):
+        adapter.save_history(sample_history)
+
+        assert not any(item.is_loaded for item in sample_history.items)
+        assert sample_history.items[0].content == "First item"
+
+    def test_save_history_keeps_lazy_rows(self, adapter, sample_history):
+        adapter.save_history(sample_history)
+        loaded_history = adapter.load_history()
+        loaded_history.add_item("Fourth item")
+        loaded_history.remove_content("Second item")
+
+        adapter.save_history(loaded_history)
+
+        contents = [item.content for item in adapter.load_history().items]
+        assert contents == ["Fourth item", "Third item", "First item"]
+
+    def test_load_history_backfills_legacy_rows(self, adapter, temp_db_path):
+        with sqlite3.connect(temp_db_path) as conn:
+            conn.execute(
+                "INSERT INTO clipboard_history (content, created_at) VALUES (?, ?)",
+                ("Legacy item", datetime.now().isoformat()),
+            )
+
+        loaded_history = adapter.load_history()
+
+        assert "Legacy item" in loaded_history
+        assert loaded_history.items[0].size == len("Legacy item")
+
+    def test_usage_is_persisted(self, adapter, sample_history):
+        item = sample_history.record_use(sample_history.items[0].id)
+        adapter.save_history(sample_history)
+
+        loaded = adapter.load_history().get_item(item.id)
+
+        assert loaded.use_count == 1
+        assert loaded.last_used_at == item.last_used_at
+        assert loaded.frecency == item.frecency
+
+    def test_source_is_persisted(self, adapter):
+        history = ClipboardHistory(items=[])
+        selected = history.add_item("selected text", "primary")
+        copied = history.add_item("copied text")
+        adapter.save_history(history)
+
+        loaded = adapter.load_history()
+
+        assert loaded.get_item(selected.id).source == "primary"
+        assert loaded.get_item(copied.id).source == "clipboard"
+
+    def test_variants_are_persisted(self, adapter):
+        history = ClipboardHistory(items=[], collapse_near_duplicates=True)
+        line = "2024-05-01 12:00:{:02d} INFO worker-3 processed batch {} from queue=ok"
+        history.add_item(line.format(1, 100))
+        item = history.add_item(line.format(2, 100))
+        adapter.save_history(history)
+
+        loaded = adapter.load_history().get_item(item.id)
+
+        assert loaded.variant_count == 2
+
+    def test_signatures_are_computed_once_collapsing_needs_them(
+        self, adapter, sample_history, temp_db_path
+    ):
+        adapter.save_history(sample_history)
+        loaded = adapter.load_history()
+        with sqlite3.connect(temp_db_path) as conn:
+            stored = conn.execute(
+                "SELECT COUNT(*) FROM clipboard_history WHERE signature IS NOT NULL"
+            ).fetchone()
+
+        loaded.collapse_near_duplicates = True
+
+        assert stored == (0,)
+        assert adapter.load_signatures() == {
+            item.id: content_signature(item.content, item.size)
+            for item in sample_history
+        }
+
+    def test_signatures_of_an_older_version_are_recomputed(
+        self, adapter, sample_history, temp_db_path
+    ):
+        adapter.save_history(sample_history)
+        adapter.load_signatures()
+        with sqlite3.connect(temp_db_path) as conn:
+            conn.execute("UPDATE clipboard_history SET signature = 42")
+            conn.execute("PRAGMA user_version = 1")
+
+        signatures = SqliteStorageAdapter(temp_db_path).load_signatures()
+
+        for item in sample_history:
+            assert signatures[item.id] == content_signature(item.content, item.size)
+
+    def test_apply_changes_writes_only_changed_rows(self, adapter, temp_db_path):
+        history = ClipboardHistory(items=[], max_items=100)
+        journal = []
+        history.subscribe(journal.extend)
+        first = history.add_item("first")
+        second = history.add_item("second")
+        assert adapter.apply_changes(journal)
+
+        journal.clear()
+        history.remove_item_by_id(first.id)
+        history.record_use(second.id)
+        assert adapter.apply_changes(journal)
+
+        loaded = adapter.load_history()
+        assert [item.id for item in loaded.items] == [second.id]
+        assert loaded.items[0].use_count == 1
+
+    def test_apply_changes_handles_clear(self, adapter, sample_history):
+        adapter.save_history(sample_history)
+        journal = []
+        sample_history.subscribe(journal.extend)
+        sample_history.clear()
+        sample_history.add_item("after clear")
+
+        assert adapter.apply_changes(journal)
+
+        assert adapter.load_history().get_content_list() == ["after clear"]
+
+    def test_pinned_flag_is_persisted(self, adapter, sample_history):
+        adapter.save_history(sample_history)
+        item = sample_history.items[1]
+        sample_history.set_pinned([item.id])
+        adapter.save_history(sample_history)
+
+        loaded = adapter.load_history()
+
+        assert [it.id for it in loaded.items if it.pinned] == [item.id]
+
+    def test_image_items_are_persisted(self, adapter):
+        history = ClipboardHistory(items=[], max_items=100)
+        item = history.add_image(b"h" * 16, 2048, "Image 32×32")
+        adapter.save_history(history)
+
+        loaded = adapter.load_history().get_item(item.id)
+
+        assert loaded.is_image
+        assert loaded.content_hash == b"h" * 16
+        assert loaded.size == 2048
+        assert loaded.content == "Image 32×32"
+
+    def test_formats_are_stored_compressed_and_loaded_on_demand(
+        self, adapter, temp_db_path
+    ):
+        history = ClipboardHistory(items=[], max_items=100)
+        item = history.add_item("bold")
+        history.set_formats(item.id, ["text/html"])
+        adapter.save_history(history)
+        html = b"<p><b>bold</b></p>" * 100
+        adapter.save_formats(item.id, {"text/html": html})
+
+        with sqlite3.connect(temp_db_path) as conn:
+            (stored,) = conn.execute("SELECT data FROM clipboard_formats").fetchone()
+        assert len(stored) < len(html)
+
+        assert adapter.load_history().get_item(item.id).formats == ("text/html",)
+        assert adapter.load_formats(item.id) == {"text/html": html}
+
+    def test_formats_are_deleted_with_their_item(self, adapter):
+        history = ClipboardHistory(items=[], max_items=100)
+        item = history.add_item("bold")
+        adapter.save_history(history)
+        adapter.save_formats(item.id, {"text/html": b"<b>bold</b>"})
+        changes = []
+        history.subscribe(changes.extend)
+
+        history.remove_item_by_id(item.id)
+        adapter.apply_changes(changes)
+
+        assert adapter.load_formats(item.id) == {}
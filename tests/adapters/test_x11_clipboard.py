@@ -0,0 +1,154 @@
+import ctypes
+import os
+import time
+
+import pytest
+
+from src.adapters import xlib
+from src.adapters.x11_clipboard import X11Clipboard
+
+
+class RawRequestor:
+    """A bare Xlib client that asks the clipboard owner for any target."""
+
+    def __init__(self):
+        self.x11 = xlib.load_xlib()
+        self.display = self.x11.XOpenDisplay(None)
+        self.window = self.x11.XCreateSimpleWindow(
+            self.display, self.x11.XDefaultRootWindow(self.display), 0, 0, 1, 1, 0, 0, 0
+        )
+        self.property = self._atom(b"RAW_REQUEST")
+
+    def _atom(self, name):
+        return self.x11.XInternAtom(self.display, name, False)
+
+    def convert(self, target):
+        self.x11.XConvertSelection(
+            self.display,
+            self._atom(b"CLIPBOARD"),
+            self._atom(target),
+            self.property,
+            self.window,
+            xlib.CURRENT_TIME,
+        )
+        self.x11.XFlush(self.display)
+
+    def request(self, target, timeout=2.0):
+        """The data served for ``target``, or None if it was refused."""
+        self.convert(target)
+        event = xlib.XEvent()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if not self.x11.XPending(self.display):
+                time.sleep(0.01)
+                continue
+            self.x11.XNextEvent(self.display, ctypes.byref(event))
+            if event.type != xlib.SELECTION_NOTIFY:
+                continue
+            if event.xselection.property == xlib.NONE:
+                return None
+            return self._read_property()
+        raise TimeoutError(f"No answer for {target!r}")
+
+    def _read_property(self):
+        actual_type = xlib.Atom()
+        actual_format = ctypes.c_int()
+        item_count = ctypes.c_ulong()
+        bytes_after = ctypes.c_ulong()
+        data = ctypes.POINTER(ctypes.c_ubyte)()
+        self.x11.XGetWindowProperty(
+            self.display,
+            self.window,
+            self.property,
+            0,
+            1 << 20,
+            True,
+            xlib.ANY_PROPERTY_TYPE,
+            ctypes.byref(actual_type),
+            ctypes.byref(actual_format),
+            ctypes.byref(item_count),
+            ctypes.byref(bytes_after),
+            ctypes.byref(data),
+        )
+        try:
+            return ctypes.string_at(data, item_count.value)
+        finally:
+            self.x11.XFree(data)
+
+    def close(self):
+        self.x11.XDestroyWindow(self.display, self.window)
+        self.x11.XCloseDisplay(self.display)
+
+
+@pytest.mark.skipif(not os.environ.get("DISPLAY"), reason="needs an X server")
+class TestX11Clipboard:
+    @pytest.fixture
+    def owner(self):
+        try:
+            clipboard = X11Clipboard()
+        except OSError as e:
+            pytest.skip(str(e))
+        yield clipboard
+        clipboard.close()
+
+    @pytest.fixture
+    def reader(self, owner):
+        clipboard = X11Clipboard()
+        yield clipboard
+        clipboard.close()
+
+    def test_text_round_trips_between_clients(self, owner, reader):
+        assert owner.write_text("héllo wörld ✓")
+        assert reader.read_text() == "héllo wörld ✓"
+
+    def test_owner_reads_its_own_value_without_round_trip(self, owner):
+        owner.write_text("mine")
+        assert owner.owned_text == "mine"
+        assert owner.read_text() == "mine"
+
+    def test_taking_ownership_clears_the_previous_owner(self, owner, reader):
+        owner.write_text("first")
+        reader.write_text("second")
+
+        assert reader.read_text() == "second"
+        assert owner.read_text() == "second"
+        assert owner.owned_text is None
+
+    def test_own_selection_stamp_moves_with_each_write(self, owner):
+        owner.write_text("first")
+        first = owner.selection_stamp()
+        owner.write_text("second")
+
+        assert first is not None
+        assert owner.selection_stamp() != first
+
+    @pytest.fixture
+    def requestor(self, owner):
+        requestor = RawRequestor()
+        yield requestor
+        requestor.close()
+
+    def test_rich_targets_are_offered_next_to_the_text(self, owner, reader):
+        owner.write_text("bold", {"text/html": b"<b>bold</b>"})
+
+        assert reader.read_text() == "bold"
+        assert owner.owned_text == "bold"
+
+    def test_rich_target_round_trips_to_another_client(self, owner, requestor):
+        owner.write_text("bold", {"text/html": b"<b>bold</b>"})
+
+        assert requestor.request(b"text/html") == b"<b>bold</b>"
+        assert requestor.request(b"image/png") is None
+
+    def test_requestor_gone_before_the_answer_does_not_stop_the_owner(
+        self, owner, reader
+    ):
+        owner.write_text("still served", {"text/html": b"<b>html</b>"})
+        gone = RawRequestor()
+        gone.convert(b"text/html")
+        # Destroys the window in the same flush, before the owner can answer.
+        gone.close()
+
+        # With Xlib's default handler the BadWindow would have exited pytest.
+        assert reader.read_text() == "still served"
+        assert owner.owned_text == "still served"
@@ -0,0 +1,581 @@
+from datetime import datetime
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from src.adapters.fuzzy_search_adapter import FuzzySearchAdapter
+from src.application.clipboard_service import (
+    SEARCH_FIRST_PAGE_SIZE,
+    SEARCH_PAGE_SIZE,
+    ClipboardService,
+)
+from src.application.settings_service import SettingsService
+from src.domain.clipboard import ChangeKind, ClipboardHistory, ClipboardItem
+from src.domain.clipboard.clipboard_history import JOURNAL_CAPACITY
+from src.domain.settings.app_settings import create_app_settings
+from src.ports.clipboard_port import CLIPBOARD_SELECTION, PRIMARY_SELECTION
+from src.ports.ui_port import DeltaKind
+
+
+class TestClipboardService:
+    @pytest.fixture
+    def settings_service(self):
+        mock_repository = Mock()
+        mock_repository.exists.return_value = False
+        return SettingsService(
+            repository=mock_repository, settings=create_app_settings()
+        )
+
+    @pytest.fixture
+    def ui_port(self):
+        return Mock()
+
+    @pytest.fixture
+    def clipboard_port(self):
+        return Mock()
+
+    @pytest.fixture
+    def storage_port(self):
+        return Mock()
+
+    @pytest.fixture
+    def service(self, settings_service, ui_port, clipboard_port, storage_port):
+        return ClipboardService(
+            clipboard_port=clipboard_port,
+            storage_port=storage_port,
+            ui_port=ui_port,
+            search_port=FuzzySearchAdapter(settings_service=settings_service),
+            settings_service=settings_service,
+        )
+
+    def _fill_history(self, service, count):
+        items = [
+            ClipboardItem(content=f"item {i}", created_at=datetime.now())
+            for i in range(count)
+        ]
+        service.history = ClipboardHistory(items=items, max_items=count)
+
+    def _contents(self, items):
+        return [item.content for item in items]
+
+    def test_search_pushes_first_page_then_appends_rest(self, service, ui_port):
+        total = SEARCH_FIRST_PAGE_SIZE + SEARCH_PAGE_SIZE + 10
+        self._fill_history(service, total)
+
+        service._on_search("item")
+
+        first_page = ui_port.show_history.call_args.args[0]
+        assert first_page[0].content == "item 0"
+        assert len(first_page) == SEARCH_FIRST_PAGE_SIZE
+        appended = [call.args[0] for call in ui_port.append_history.call_args_list]
+        assert [len(page) for page in appended] == [SEARCH_PAGE_SIZE, 10]
+
+    def test_small_result_set_is_not_appended(self, service, ui_port):
+        self._fill_history(service, 3)
+
+        service._on_search("")
+
+        ui_port.show_history.assert_called_once()
+        shown = ui_port.show_history.call_args.args[0]
+        assert self._contents(shown) == ["item 0", "item 1", "item 2"]
+        ui_port.append_history.assert_not_called()
+
+    def test_search_reads_stored_bodies_in_batches(
+        self, service, ui_port, storage_port
+    ):
+        bodies = {1: "alpha", 2: "bravo", 3: "charlie"}
+        storage_port.load_contents.side_effect = lambda ids: {
+            item_id: bodies[item_id] for item_id in ids
+        }
+        service.history = ClipboardHistory(
+            items=[
+                ClipboardItem.lazy(
+                    id=item_id,
+                    head="head",
+                    content_hash=bytes([item_id]),
+                    size=len(body),
+                    created_timestamp=item_id,
+                    loader=storage_port.load_content,
+                )
+                for item_id, body in bodies.items()
+            ]
+        )
+
+        service._on_search("bravo")
+
+        storage_port.load_contents.assert_called_once_with([1, 2, 3])
+        storage_port.load_content.assert_not_called()
+        assert [item.id for item in ui_port.show_history.call_args.args[0]] == [2]
+
+    def test_newer_search_supersedes_running_stream(self, service, ui_port):
+        self._fill_history(service, SEARCH_FIRST_PAGE_SIZE + SEARCH_PAGE_SIZE)
+
+        def slow_scan():
+            for index, item in enumerate(service.history.items):
+                if index == SEARCH_FIRST_PAGE_SIZE + 1:
+                    service._on_search("1")
+                yield item
+
+        assert service._stream_results(slow_scan()) is None
+        assert ui_port.show_history.call_count == 2
+        newest = ui_port.show_history.call_args.args[0]
+        appended = ui_port.append_history.call_args.args[0]
+        assert all("1" in item.content for item in newest + appended)
+
+    def test_copy_item_resolves_by_id(self, service, clipboard_port):
+        self._fill_history(service, 3)
+        item = service.history.items[1]
+
+        service._on_copy_item(item.id)
+
+        clipboard_port.set_content.assert_called_once_with(item.content)
+
+    def test_copy_item_moves_to_front_and_records_use(self, service, storage_port):
+        self._fill_history(service, 3)
+        item = service.history.items[2]
+
+        service._on_copy_item(item.id)
+
+        assert service.history.get_item(item.id).use_count == 1
+        assert service.history.items[0].id == item.id
+        (changes,) = storage_port.apply_changes.call_args.args
+        assert [change.kind for change in changes] == [ChangeKind.MOVED]
+        assert changes[0].item_id == item.id
+
+    def test_list_follows_frecency_when_enabled(
+        self, service, ui_port, settings_service
+    ):
+        settings_service.update_setting("history.sort_by_frecency", True)
+        self._fill_history(service, 3)
+        service.history.record_use(service.history.items[2].id)
+
+        service._update_ui_display()
+
+        shown = ui_port.show_history.call_args.args[0]
+        assert self._contents(shown)[0] == "item 2"
+
+    def test_copy_unknown_id_does_nothing(self, service, clipboard_port):
+        self._fill_history(service, 3)
+
+        service._on_copy_item(999)
+
+        clipboard_port.set_content.assert_not_called()
+
+    def test_delete_item_resolves_by_id(self, service, storage_port):
+        self._fill_history(service, 3)
+        item = service.history.items[1]
+
+        service._on_delete_item(item.id)
+
+        assert service.history.get_item(item.id) is None
+        assert self._contents(service.history.items) == ["item 0", "item 2"]
+        (changes,) = storage_port.apply_changes.call_args.args
+        assert [change.kind for change in changes] == [ChangeKind.REMOVED]
+        storage_port.save_history.assert_not_called()
+
+    def test_failed_changes_are_replayed_on_next_sync(self, service, storage_port):
+        self._fill_history(service, 3)
+        storage_port.apply_changes.return_value = False
+        service.history.record_use(service.history.items[0].id)
+
+        storage_port.apply_changes.return_value = True
+        service.history.record_use(service.history.items[1].id)
+
+        (changes,) = storage_port.apply_changes.call_args.args
+        assert [change.version for change in changes] == [1, 2]
+
+    def test_storage_resyncs_when_journal_was_dropped(self, service, storage_port):
+        self._fill_history(service, 3)
+        storage_port.apply_changes.return_value = False
+        for _ in range(JOURNAL_CAPACITY + 1):
+            service.history.record_use(service.history.items[0].id)
+
+        storage_port.apply_changes.return_value = True
+        service.history.record_use(service.history.items[0].id)
+
+        storage_port.save_history.assert_called_once_with(service.history)
+
+    def test_changes_storage_already_has_are_skipped(self, service, storage_port):
+        self._fill_history(service, 3)
+        changes = []
+        service.history.subscribe(changes.extend)
+        service.history.record_use(service.history.items[0].id)
+        storage_port.apply_changes.reset_mock()
+
+        service._sync_storage(changes)
+        service._sync_storage([])
+
+        storage_port.apply_changes.assert_not_called()
+        storage_port.save_history.assert_not_called()
+
+    def test_clipboard_change_updates_ui_once(self, service, ui_port):
+        self._fill_history(service, 3)
+        ui_port.show_history.reset_mock()
+
+        service._on_clipboard_change("new item")
+
+        ui_port.show_history.assert_called_once()
+
+    def test_change_to_displayed_history_is_pushed_as_delta(self, service, ui_port):
+        self._fill_history(service, 3)
+        service._update_ui_display()
+        ui_port.show_history.reset_mock()
+
+        service._on_clipboard_change("new item")
+
+        ui_port.show_history.assert_not_called()
+        ((delta,),) = ui_port.apply_history_deltas.call_args.args
+        assert delta.kind is DeltaKind.INSERT
+        assert delta.position == 0
+        assert self._contents(delta.items) == ["new item"]
+
+    def test_change_during_search_shows_whole_history_again(self, service, ui_port):
+        self._fill_history(service, 3)
+        service._update_ui_display()
+        service._on_search("item 1")
+        ui_port.show_history.reset_mock()
+
+        service._on_clipboard_change("new item")
+
+        ui_port.apply_history_deltas.assert_not_called()
+        shown = ui_port.show_history.call_args.args[0]
+        assert self._contents(shown) == ["new item", "item 0", "item 1", "item 2"]
+
+    def test_dropped_clips_cost_no_storage_or_ui_work(
+        self, service, settings_service, ui_port, storage_port
+    ):
+        settings_service.update_setting("ingestion.ignore_apps", "KeePassXC, Vault")
+        settings_service.update_setting("ingestion.ignore_pattern", r"^\d{6}$")
+        ui_port.show_history.reset_mock()
+
+        service._on_clipboard_change("secret", [], "keepassxc.exe")
+        service._on_clipboard_change("123456")
+
+        assert len(service.history) == 0
+        storage_port.apply_changes.assert_not_called()
+        ui_port.show_history.assert_not_called()
+        dropped = {stats.name: stats.dropped for stats in service.ingestion_stats}
+        assert dropped["source_app"] == 1
+        assert dropped["pattern"] == 1
+
+    def test_primary_selection_captures_keep_their_source(self, service, storage_port):
+        service._on_clipboard_change("selected text", [], None, PRIMARY_SELECTION)
+
+        (item,) = service.history.items
+        assert item.source == "primary"
+        (changes,) = storage_port.apply_changes.call_args.args
+        assert changes[0].item.source == "primary"
+
+    def test_trimmed_clips_are_stored_trimmed(self, service, settings_service):
+        settings_service.update_setting("ingestion.trim_whitespace", True)
+
+        service._on_clipboard_change("  padded\n")
+
+        assert self._contents(service.history.items) == ["padded"]
+
+    def test_history_limits_follow_settings(self, service, settings_service):
+        settings_service.update_setting("history.max_items", 2)
+        settings_service.update_setting("history.max_size_mb", None)
+
+        for content in ["a", "b", "c"]:
+            service._on_clipboard_change(content)
+
+        assert self._contents(service.history.items) == ["c", "b"]
+        assert service.history.max_bytes is None
+
+    def test_loaded_items_past_the_limit_are_evicted_from_storage(
+        self, service, settings_service, storage_port
+    ):
+        settings_service.update_setting("history.max_items", 2)
+        items = [
+            ClipboardItem(content=f"item {i}", created_at=datetime.now())
+            for i in range(3)
+        ]
+        storage_port.load_history.return_value = ClipboardHistory(
+            items=items, max_items=3
+        )
+
+        service.start_monitoring()
+        service.stop()
+
+        assert self._contents(service.history.items) == ["item 0", "item 1"]
+        written = [
+            change
+            for call in storage_port.apply_changes.call_args_list
+            for change in call.args[0]
+        ]
+        assert [(change.kind, change.item.content) for change in written] == [
+            (ChangeKind.REMOVED, "item 2")
+        ]
+
+    def test_lowered_limit_evicts_right_away(
+        self, service, settings_service, storage_port
+    ):
+        for content in ["a", "b", "c"]:
+            service._on_clipboard_change(content)
+        storage_port.apply_changes.reset_mock()
+
+        settings_service.update_setting("history.max_items", 2)
+
+        assert self._contents(service.history.items) == ["c", "b"]
+        written = storage_port.apply_changes.call_args.args[0]
+        assert [(change.kind, change.item.content) for change in written] == [
+            (ChangeKind.REMOVED, "a")
+        ]
+
+    def test_default_byte_budget_comes_from_settings(self, service):
+        service._on_clipboard_change("a")
+        assert service.history.max_bytes == 100 * 1024 * 1024
+
+    def test_capture_limit_follows_settings(
+        self, service, clipboard_port, settings_service
+    ):
+        settings_service.update_setting("history.max_clip_size_mb", 2)
+        settings_service.update_setting("history.truncate_large_clips", True)
+
+        clipboard_port.set_capture_limit.assert_called_with(2 * 1024 * 1024, True)
+
+    def test_capture_limit_is_not_resent_per_clip(
+        self, service, clipboard_port, settings_service
+    ):
+        settings_service.update_setting("history.max_items", 10)
+
+        service._on_clipboard_change("a")
+        service._on_clipboard_change("b")
+
+        clipboard_port.set_capture_limit.assert_not_called()
+
+    def test_callbacks_from_other_threads_run_on_owner_loop(
+        self, service, ui_port, clipboard_port, storage_port, settings_service
+    ):
+        settings_service.update_setting("history.burst_window_ms", 0)
+        storage_port.load_history.return_value = ClipboardHistory(items=[])
+        service.start_monitoring()
+        on_change = clipboard_port.start_monitoring.call_args.args[0]
+        on_delete = ui_port.register_delete_callback.call_args.args[0]
+
+        threads = [
+            threading.Thread(target=on_change, args=(f"clip {i}",)) for i in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        on_delete(service.history.items[0].id)
+        service.stop()
+
+        assert len(service.history) == 19
+        written = [
+            change.version
+            for call in storage_port.apply_changes.call_args_list
+            for change in call.args[0]
+        ]
+        assert written == sorted(written)
+        assert service.loop_metrics.handled >= 21
+
+    @pytest.mark.parametrize(
+        "keep_values, expected",
+        [(False, ["clip 4"]), (True, [f"clip {i}" for i in reversed(range(5))])],
+    )
+    def test_burst_of_changes_is_committed_once(
+        self,
+        service,
+        clipboard_port,
+        storage_port,
+        settings_service,
+        keep_values,
+        expected,
+    ):
+        settings_service.update_setting("history.burst_window_ms", 5000)
+        settings_service.update_setting("history.keep_burst_values", keep_values)
+        storage_port.load_history.return_value = ClipboardHistory(items=[])
+        service.start_monitoring()
+        on_change = clipboard_port.start_monitoring.call_args.args[0]
+
+        for i in range(5):
+            on_change(f"clip {i}")
+        # Stopping commits the burst still waiting for its window to end.
+        service.stop()
+
+        assert self._contents(service.history.items) == expected
+        storage_port.apply_changes.assert_called_once()
+
+    def _commit_burst_of(self, service, clipboard_port, storage_port, changes):
+        storage_port.load_history.return_value = ClipboardHistory(items=[])
+        service.start_monitoring()
+        on_change = clipboard_port.start_monitoring.call_args.args[0]
+        for content, selection in changes:
+            on_change(content, [], None, selection)
+        service.stop()
+
+    def test_distinct_copies_within_the_window_are_all_kept(
+        self, service, clipboard_port, storage_port, settings_service
+    ):
+        settings_service.update_setting("history.burst_window_ms", 5000)
+
+        self._commit_burst_of(
+            service,
+            clipboard_port,
+            storage_port,
+            [("first", CLIPBOARD_SELECTION), ("second", CLIPBOARD_SELECTION)],
+        )
+
+        assert self._contents(service.history.items) == ["second", "first"]
+        storage_port.apply_changes.assert_called_once()
+
+    @pytest.mark.parametrize(
+        "keep_values, expected",
+        [(False, ["selected", "copied"]), (True, ["selected", "sel", "copied"])],
+    )
+    def test_burst_keeps_the_last_clip_of_each_selection(
+        self,
+        service,
+        clipboard_port,
+        storage_port,
+        settings_service,
+        keep_values,
+        expected,
+    ):
+        settings_service.update_setting("history.burst_window_ms", 5000)
+        settings_service.update_setting("history.keep_burst_values", keep_values)
+
+        self._commit_burst_of(
+            service,
+            clipboard_port,
+            storage_port,
+            [
+                ("copied", CLIPBOARD_SELECTION),
+                ("sel", PRIMARY_SELECTION),
+                ("selected", PRIMARY_SELECTION),
+                ("selected", PRIMARY_SELECTION),
+            ],
+        )
+
+        items = service.history.items
+        assert self._contents(items) == expected
+        assert items[-1].source == CLIPBOARD_SELECTION
+        assert storage_port.apply_changes.call_count == 1
+
+    def test_copy_writes_clipboard_off_the_owner_loop(
+        self, service, ui_port, clipboard_port, storage_port, settings_service
+    ):
+        settings_service.update_setting("history.burst_window_ms", 0)
+        storage_port.load_history.return_value = ClipboardHistory(items=[])
+        service.start_monitoring()
+        service._loop.post(service._on_clipboard_change, "clip")
+        owner = []
+        ready = threading.Event()
+        service._loop.post(
+            lambda: (owner.append(threading.current_thread()), ready.set())
+        )
+        writers = []
+        clipboard_port.set_content.side_effect = lambda content: writers.append(
+            threading.current_thread()
+        )
+        on_copy = ui_port.register_copy_callback.call_args.args[0]
+        on_bulk_copy = ui_port.register_bulk_copy_callback.call_args.args[0]
+
+        assert ready.wait(5)
+        item_id = service.history.items[0].id
+        on_copy(item_id)
+        on_bulk_copy([item_id])
+        service.stop()
+
+        assert len(writers) == 2
+        assert owner[0] not in writers
+
+    def test_bulk_copy_joins_items_in_selection_order(
+        self, service, clipboard_port, storage_port
+    ):
+        self._fill_history(service, 3)
+        first, _, last = service.history.items
+
+        service._on_copy_items([last.id, first.id, 999])
+
+        clipboard_port.set_content.assert_called_once_with("item 2\nitem 0")
+        storage_port.apply_changes.assert_called_once()
+        assert service.history.get_item(first.id).use_count == 1
+
+    def test_bulk_delete_is_one_storage_write_and_refresh(
+        self, service, ui_port, storage_port
+    ):
+        self._fill_history(service, 5)
+        ui_port.show_history.reset_mock()
+        ids = [item.id for item in service.history.items[:3]]
+
+        service._on_delete_items(ids)
+
+        assert self._contents(service.history.items) == ["item 3", "item 4"]
+        (changes,) = storage_port.apply_changes.call_args.args
+        assert len(changes) == 3
+        storage_port.apply_changes.assert_called_once()
+        ui_port.show_history.assert_called_once()
+
+    def test_pinned_items_are_listed_first(self, service, ui_port):
+        self._fill_history(service, 3)
+        oldest = service.history.items[-1]
+
+        service._on_pin_items([oldest.id])
+
+        shown = ui_port.show_history.call_args.args[0]
+        assert self._contents(shown) == ["item 2", "item 0", "item 1"]
+
+    def test_rich_formats_are_fetched_once_and_stored(
+        self, service, clipboard_port, storage_port
+    ):
+        clipboard_port.get_format.return_value = b"<b>bold</b>"
+        clipboard_port.get_content.return_value = "bold"
+
+        service._on_clipboard_change("bold", ["text/html"])
+
+        item = service.history.items[0]
+        clipboard_port.get_format.assert_called_once_with("text/html")
+        storage_port.save_formats.assert_called_once_with(
+            item.id, {"text/html": b"<b>bold</b>"}
+        )
+        assert item.formats == ("text/html",)
+
+    def test_formats_attach_to_an_item_used_meanwhile(self, service, storage_port):
+        item = service.history.add_item("bold")
+        service.history.record_use(item.id)
+
+        service._attach_formats(item, {"text/html": b"<b>bold</b>"})
+
+        storage_port.save_formats.assert_called_once()
+        assert service.history.get_item(item.id).formats == ("text/html",)
+
+    def test_formats_are_dropped_if_clipboard_changed_meanwhile(
+        self, service, clipboard_port, storage_port
+    ):
+        clipboard_port.get_format.return_value = b"<b>bold</b>"
+        clipboard_port.get_content.return_value = "something newer"
+
+        service._on_clipboard_change("bold", ["text/html"])
+
+        storage_port.save_formats.assert_not_called()
+        assert service.history.items[0].formats == ()
+
+    def test_rich_copy_loads_stored_formats(
+        self, service, clipboard_port, storage_port
+    ):
+        item = service.history.add_item("bold")
+        service.history.set_formats(item.id, ["text/html"])
+        storage_port.load_formats.return_value = {"text/html": b"<b>bold</b>"}
+
+        service._on_copy_rich_item(item.id)
+
+        storage_port.load_formats.assert_called_once_with(item.id)
+        clipboard_port.set_rich_content.assert_called_once_with(
+            "bold", {"text/html": b"<b>bold</b>"}
+        )
+
+    def test_rich_copy_without_formats_copies_text(
+        self, service, clipboard_port, storage_port
+    ):
+        item = service.history.add_item("plain")
+
+        service._on_copy_rich_item(item.id)
+
+        storage_port.load_formats.assert_not_called()
+        clipboard_port.set_content.assert_called_once_with("plain")
@@ -0,0 +1,156 @@
+from datetime import datetime, timedelta
+import random
+
+import pytest
+
+from src.application.history_view import HistoryView
+from src.domain.clipboard import ClipboardHistory, ClipboardItem
+from src.ports.ui_port import DeltaKind
+
+
+class TestHistoryView:
+    @pytest.fixture
+    def history(self):
+        start = datetime.now() - timedelta(hours=1)
+        items = [
+            ClipboardItem(content=f"item {i}", created_at=start - timedelta(minutes=i))
+            for i in range(5)
+        ]
+        return ClipboardHistory(items=items, max_items=6)
+
+    @pytest.fixture
+    def changes(self, history):
+        changes = []
+        history.subscribe(changes.extend)
+        return changes
+
+    def _follow(self, history, changes):
+        view = HistoryView(history.snapshot())
+        changes.clear()
+        return view
+
+    def _listed_ids(self, history):
+        return [item.id for item in history.snapshot().listed()]
+
+    def test_new_clip_is_one_insert_after_pinned_items(self, history, changes):
+        history.set_pinned([history.items[3].id])
+        view = self._follow(history, changes)
+
+        history.add_item("new")
+        (delta,) = view.apply(changes)
+
+        assert delta.kind is DeltaKind.INSERT
+        assert delta.position == 1
+        assert [item.content for item in delta.items] == ["new"]
+        assert view.ids() == self._listed_ids(history)
+
+    def test_eviction_removes_the_oldest_row(self, history, changes):
+        history.add_item("fills the history")
+        view = self._follow(history, changes)
+        oldest = history.items[-1]
+
+        history.add_item("new")
+        deltas = view.apply(changes)
+
+        assert [delta.kind for delta in deltas] == [DeltaKind.INSERT, DeltaKind.REMOVE]
+        assert deltas[1].item_id == oldest.id
+        assert deltas[1].position == 6
+        assert view.ids() == self._listed_ids(history)
+
+    def test_copied_again_moves_to_front(self, history, changes):
+        view = self._follow(history, changes)
+        item = history.items[2]
+
+        history.promote(item.id)
+        (delta,) = view.apply(changes)
+
+        assert delta.kind is DeltaKind.MOVE
+        assert (delta.origin, delta.position, delta.item_id) == (2, 0, item.id)
+        assert view.ids() == self._listed_ids(history)
+
+    def test_pinning_moves_to_place_among_pinned(self, history, changes):
+        history.set_pinned([history.items[1].id])
+        view = self._follow(history, changes)
+        item = history.items[3]
+
+        history.set_pinned([item.id])
+        (delta,) = view.apply(changes)
+
+        assert delta.kind is DeltaKind.MOVE
+        assert (delta.origin, delta.position) == (3, 1)
+        assert view.ids() == self._listed_ids(history)
+
+    def test_use_replaces_the_row_in_place(self, history, changes):
+        view = self._follow(history, changes)
+        item = history.items[1]
+
+        history.record_use(item.id)
+        (delta,) = view.apply(changes)
+
+        assert delta.kind is DeltaKind.REPLACE
+        assert delta.position == 1
+        assert delta.items == (item,)
+
+    def test_clear_resets(self, history, changes):
+        view = self._follow(history, changes)
+
+        history.clear()
+
+        assert [delta.kind for delta in view.apply(changes)] == [DeltaKind.RESET]
+        assert view.ids() == []
+
+    def test_changes_already_included_are_skipped(self, history, changes):
+        history.add_item("before")
+        view = HistoryView(history.snapshot())
+
+        assert view.apply(changes) == []
+
+    def test_missing_change_asks_for_rebuild(self, history, changes):
+        view = self._follow(history, changes)
+        history.add_item("lost")
+        changes.clear()
+
+        history.add_item("seen")
+
+        assert view.apply(changes) is None
+
+    def test_long_run_of_changes_stays_in_step(self, history, changes):
+        view = self._follow(history, changes)
+        rows = view.ids()
+        rng = random.Random(7)
+
+        for step in range(600):
+            ids = [item.id for item in history.items]
+            action = rng.random()
+            if action < 0.5 or not ids:
+                history.add_item(f"clip {step}")
+            elif action < 0.65:
+                history.promote(rng.choice(ids))
+            elif action < 0.8:
+                item = history.get_item(rng.choice(ids))
+                history.set_pinned([item.id], not item.pinned)
+            elif action < 0.9:
+                history.record_use(rng.choice(ids))
+            else:
+                history.remove_item_by_id(rng.choice(ids))
+            deltas = view.apply(changes)
+            changes.clear()
+            self._replay(rows, deltas)
+
+            assert view.ids() == self._listed_ids(history)
+            assert rows == view.ids()
+
+    def _replay(self, rows, deltas):
+        """Apply deltas to a plain list of ids, checking what they point at."""
+        for delta in deltas:
+            if delta.kind is DeltaKind.RESET:
+                rows.clear()
+            elif delta.kind is DeltaKind.INSERT:
+                rows[delta.position : delta.position] = [i.id for i in delta.items]
+            elif delta.kind is DeltaKind.REPLACE:
+                assert rows[delta.position] == delta.items[0].id
+            elif delta.kind is DeltaKind.REMOVE:
+                assert rows.pop(delta.position) == delta.item_id
+            else:
+                assert rows.pop(delta.origin) == delta.item_id
+                rows.insert(delta.position, delta.item_id)
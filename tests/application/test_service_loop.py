@@ -0,0 +1,123 @@
+import threading
+import time
+
+import pytest
+
+from src.application.service_loop import ServiceLoop
+
+
+class TestServiceLoop:
+    @pytest.fixture
+    def loop(self):
+        loop = ServiceLoop(name="test-loop")
+        loop.start()
+        yield loop
+        loop.stop()
+
+    def test_runs_inline_until_started(self):
+        loop = ServiceLoop()
+        calls = []
+
+        loop.post(calls.append, 1)
+        loop.offload("io", calls.append, 2)
+        loop.coalesce("ui", lambda: calls.append(3))
+
+        assert calls == [1, 2, 3]
+        assert not loop.is_running
+
+    def test_posted_handlers_run_in_order_on_owner_thread(self, loop):
+        seen = []
+
+        def handler(value):
+            seen.append((value, threading.current_thread().name))
+
+        for value in range(100):
+            loop.post(handler, value)
+        loop.stop()
+
+        assert [value for value, _ in seen] == list(range(100))
+        assert {name for _, name in seen} == {"test-loop"}
+
+    def test_coalesce_runs_waiting_request_once(self, loop):
+        started, release = threading.Event(), threading.Event()
+        refreshes = []
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        loop.post(block)
+        started.wait(5)
+        for _ in range(10):
+            loop.coalesce("ui", lambda: refreshes.append(1))
+        release.set()
+        loop.stop()
+
+        assert refreshes == [1]
+
+    def test_offloaded_work_keeps_lane_order(self, loop):
+        written = []
+
+        def submit():
+            for value in range(50):
+                loop.offload("storage", written.append, value)
+
+        loop.post(submit)
+        loop.stop()
+
+        assert written == list(range(50))
+
+    def test_handler_errors_do_not_stop_the_loop(self, loop):
+        calls = []
+
+        loop.post(lambda: 1 / 0)
+        loop.post(calls.append, "after")
+        loop.stop()
+
+        assert calls == ["after"]
+
+    def test_metrics_count_handled_messages(self, loop):
+        for _ in range(5):
+            loop.post(lambda: None)
+        loop.stop()
+
+        metrics = loop.metrics()
+        assert metrics.handled == 5
+        assert metrics.max_queue_depth >= 1
+        assert metrics.queue_depth == 0
+
+    def test_call_later_runs_after_the_delay_on_owner_thread(self, loop):
+        ran = threading.Event()
+        seen = []
+        started = time.monotonic()
+
+        loop.call_later(
+            0.05, lambda: (seen.append(threading.current_thread().name), ran.set())
+        )
+
+        assert ran.wait(5)
+        assert time.monotonic() - started >= 0.05
+        assert seen == ["test-loop"]
+
+    def test_stop_runs_delayed_handlers_right_away(self, loop):
+        seen = []
+
+        loop.call_later(60, seen.append, "delayed")
+        loop.post(seen.append, "posted")
+        loop.stop()
+
+        assert seen == ["posted", "delayed"]
+
+    def test_stop_runs_handlers_posted_during_the_drain(self, loop):
+        seen = []
+
+        def post_from_another_thread():
+            poster = threading.Thread(target=loop.post, args=(seen.append, "late"))
+            poster.start()
+            poster.join()
+
+        loop.call_later(60, post_from_another_thread)
+        loop.stop()
+
+        assert seen == ["late"]
+        assert not loop.is_running
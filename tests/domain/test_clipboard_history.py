@@ -0,0 +1,503 @@
+from datetime import datetime
+import threading
+
+import pytest
+
+from src.domain.clipboard import ChangeKind, ClipboardHistory, ClipboardItem
+from src.domain.clipboard.clipboard_history import JOURNAL_CAPACITY
+from src.domain.clipboard.clipboard_item import hash_content
+from src.domain.clipboard.near_duplicate_index import (
+    SIGNATURE_CHARS,
+    content_signature,
+)
+
+
+class TestClipboardHistory:
+    @pytest.fixture
+    def history(self):
+        return ClipboardHistory(items=[], max_items=3)
+
+    def test_rejects_non_positive_limit(self):
+        with pytest.raises(ValueError):
+            ClipboardHistory(items=[], max_items=0)
+
+    def test_add_item_puts_newest_first(self, history):
+        history.add_item("first")
+        history.add_item("second")
+        assert history.get_content_list() == ["second", "first"]
+
+    def test_add_item_ignores_empty_content(self, history):
+        history.add_item("")
+        assert len(history) == 0
+
+    def test_duplicate_moves_to_front(self, history):
+        history.add_item("first")
+        history.add_item("second")
+        history.add_item("first")
+        assert history.get_content_list() == ["first", "second"]
+        assert len(history) == 2
+
+    def test_limit_evicts_oldest(self, history):
+        for content in ["a", "b", "c", "d"]:
+            history.add_item(content)
+        assert history.get_content_list() == ["d", "c", "b"]
+        assert "a" not in history
+
+    def test_initial_items_are_deduplicated_and_trimmed(self):
+        items = [
+            ClipboardItem(content=content, created_at=datetime.now())
+            for content in ["x", "y", "x", "z"]
+        ]
+        history = ClipboardHistory(items=items, max_items=2)
+        assert history.get_content_list() == ["x", "y"]
+
+    def test_remove_content(self, history):
+        history.add_item("first")
+        history.add_item("second")
+        assert history.remove_content("first") is True
+        assert history.remove_content("first") is False
+        assert history.get_content_list() == ["second"]
+
+    def test_remove_item_by_index(self, history):
+        for content in ["a", "b", "c"]:
+            history.add_item(content)
+        assert history.remove_item_by_index(1) is True
+        assert history.remove_item_by_index(5) is False
+        assert history.get_content_list() == ["c", "a"]
+
+    def test_clear(self, history):
+        history.add_item("first")
+        history.clear()
+        assert history.items == []
+
+    def test_items_get_stable_ids(self, history):
+        first = history.add_item("first")
+        history.add_item("second")
+        moved = history.add_item("first")
+        assert moved.id == first.id
+        assert history.get_item(first.id).content == "first"
+
+    def test_initial_ids_are_kept_and_new_ids_follow_them(self):
+        history = ClipboardHistory(
+            items=[ClipboardItem(content="old", created_at=datetime.now(), id=41)]
+        )
+        assert history.get_item(41).content == "old"
+        assert history.add_item("new").id == 42
+
+    def test_remove_item_by_id(self, history):
+        item = history.add_item("first")
+        assert history.remove_item_by_id(item.id) is True
+        assert history.remove_item_by_id(item.id) is False
+        assert "first" not in history
+
+    def test_total_bytes_tracks_utf8_size(self, history):
+        history.add_item("abc")
+        history.add_item("ж")
+        history.add_item("abc")
+        assert history.total_bytes == 5
+        history.remove_content("ж")
+        assert history.total_bytes == 3
+        history.clear()
+        assert history.total_bytes == 0
+
+    def test_byte_budget_evicts_oldest(self):
+        history = ClipboardHistory(items=[], max_items=10, max_bytes=10)
+        for content in ["aaaa", "bbbb", "cccc"]:
+            history.add_item(content)
+        assert history.get_content_list() == ["cccc", "bbbb"]
+        assert history.total_bytes == 8
+
+    def test_byte_budget_keeps_newest_oversized_item(self):
+        history = ClipboardHistory(items=[], max_items=10, max_bytes=4)
+        history.add_item("small")
+        history.add_item("x" * 100)
+        assert history.get_content_list() == ["x" * 100]
+
+    def test_set_limits_trims_existing_items(self, history):
+        for content in ["a", "b", "c"]:
+            history.add_item(content)
+        history.set_limits(max_items=1)
+        assert history.get_content_list() == ["c"]
+
+    def test_rejects_non_positive_byte_budget(self):
+        with pytest.raises(ValueError):
+            ClipboardHistory(items=[], max_bytes=0)
+
+    def test_record_use_counts_and_ranks_item(self):
+        history = ClipboardHistory(items=[], max_items=10)
+        old = history.add_item("old")
+        history.add_item("new")
+        for _ in range(3):
+            history.record_use(old.id)
+        assert history.get_item(old.id).use_count == 3
+        assert history.get_item(old.id).last_used_at is not None
+        assert [item.content for item in history.top_by_frecency(2)] == [
+            "old",
+            "new",
+        ]
+
+    def test_usage_survives_move_to_front(self, history):
+        item = history.add_item("first")
+        history.record_use(item.id)
+        history.add_item("first")
+        assert history.get_item(item.id).use_count == 1
+
+    def test_frecency_skips_removed_items(self, history):
+        history.add_item("first")
+        second = history.add_item("second")
+        history.remove_item_by_id(second.id)
+        assert [item.content for item in history.iter_by_frecency()] == ["first"]
+
+    def test_near_duplicates_collapse_into_latest_variant(self):
+        history = ClipboardHistory(items=[], collapse_near_duplicates=True)
+        line = "2024-05-01 12:00:{:02d} INFO worker-3 processed batch {} from queue=ok"
+        first = history.add_item(line.format(1, 100))
+        history.add_item("something else")
+        latest = history.add_item(line.format(2, 100))
+
+        assert len(history) == 2
+        assert latest.id == first.id
+        assert history.items[0].content == line.format(2, 100)
+        assert history.items[0].variant_count == 2
+
+    def test_clips_differing_in_values_do_not_collapse(self):
+        history = ClipboardHistory(items=[], collapse_near_duplicates=True)
+        query = "UPDATE accounts SET balance = {} WHERE account_id = {} AND active = 1"
+        history.add_item(query.format(100, 4711))
+        history.add_item(query.format(999999, 1))
+        assert len(history) == 2
+
+    def test_clips_differing_past_the_signature_prefix_do_not_collapse(self):
+        history = ClipboardHistory(items=[], collapse_near_duplicates=True)
+        text = "".join(f"line {i} of a long file\n" for i in range(400))
+        assert len(text) > SIGNATURE_CHARS
+        history.add_item(text)
+        history.add_item(text + "one more line\n")
+        assert len(history) == 2
+
+    def test_near_duplicate_index_follows_the_setting(self, history):
+        line = "2024-05-01 12:00:{:02d} INFO worker-3 processed batch {} from queue=ok"
+        history.add_item(line.format(1, 100))
+        assert history._near_duplicates is None
+
+        history.collapse_near_duplicates = True
+        history.add_item(line.format(2, 100))
+
+        assert len(history) == 1
+
+    def test_stored_signatures_spare_loading_lazy_bodies(self):
+        line = "2024-05-01 12:00:{:02d} INFO worker-3 processed batch {} from queue=ok"
+        stored = line.format(1, 100)
+        loads = []
+
+        def loader(item_id):
+            loads.append(item_id)
+            return stored
+
+        lazy = ClipboardItem.lazy(
+            id=1,
+            head=stored,
+            content_hash=hash_content(stored),
+            size=len(stored),
+            created_timestamp=1,
+            loader=loader,
+        )
+        history = ClipboardHistory(
+            items=[lazy],
+            signature_loader=lambda: {1: content_signature(stored, len(stored))},
+        )
+
+        history.collapse_near_duplicates = True
+        history.add_item(line.format(2, 100))
+
+        assert len(history) == 1
+        assert loads == []
+
+    def test_near_duplicates_are_kept_when_collapsing_is_off(self, history):
+        line = "2024-05-01 12:00:{:02d} INFO worker-3 processed batch {} from queue=ok"
+        history.add_item(line.format(1, 100))
+        history.add_item(line.format(2, 101))
+        assert len(history) == 2
+
+    def test_changes_are_versioned_and_published(self, history):
+        published = []
+        history.subscribe(published.append)
+
+        first = history.add_item("first")
+        history.add_item("second")
+        history.add_item("first")
+
+        kinds = [change.kind for batch in published for change in batch]
+        assert kinds == [ChangeKind.ADDED, ChangeKind.ADDED, ChangeKind.MOVED]
+        assert published[-1][0].item_id == first.id
+        assert history.version == 3
+
+    def test_batch_publishes_once(self, history):
+        published = []
+        history.subscribe(published.append)
+
+        with history.batch():
+            for content in ["a", "b", "c", "d"]:
+                history.add_item(content)
+
+        assert len(published) == 1
+        assert [change.kind for change in published[0]] == [
+            ChangeKind.ADDED,
+            ChangeKind.ADDED,
+            ChangeKind.ADDED,
+            ChangeKind.ADDED,
+            ChangeKind.REMOVED,
+        ]
+
+    def test_changes_since_replays_missed_changes(self, history):
+        history.add_item("first")
+        history.add_item("second")
+        history.clear()
+
+        changes = history.changes_since(1)
+
+        assert [change.version for change in changes] == [2, 3]
+        assert changes[-1].kind is ChangeKind.CLEARED
+
+    def test_changes_since_reports_dropped_journal(self, history):
+        item = history.add_item("first")
+        for _ in range(JOURNAL_CAPACITY + 1):
+            history.record_use(item.id)
+
+        assert history.changes_since(0) is None
+        assert history.changes_since(history.version) == []
+
+    def test_snapshot_is_unaffected_by_later_changes(self, history):
+        history.add_item("first")
+        snapshot = history.snapshot()
+
+        history.add_item("second")
+        history.clear()
+
+        assert [item.content for item in snapshot] == ["first"]
+        assert snapshot.version == 1
+
+    def test_snapshot_is_shared_until_next_change(self, history):
+        history.add_item("first")
+        assert history.snapshot() is history.snapshot()
+
+        history.add_item("second")
+        assert history.snapshot().version == history.version
+
+    def test_snapshot_frecency_order_matches_index(self):
+        history = ClipboardHistory(items=[], max_items=10)
+        items = [history.add_item(f"item {i}") for i in range(5)]
+        history.record_use(items[1].id)
+        history.record_use(items[3].id)
+        history.record_use(items[1].id)
+
+        assert list(history.snapshot().by_frecency()) == list(
+            history.iter_by_frecency()
+        )
+
+    def test_snapshot_orders_are_fixed_when_taken(self):
+        history = ClipboardHistory(items=[], max_items=10)
+        items = [history.add_item(f"item {i}") for i in range(3)]
+        snapshot = history.snapshot()
+
+        history.record_use(items[0].id)
+        history.record_use(items[0].id)
+        history.set_pinned([items[1].id])
+
+        assert [item.content for item in snapshot.by_frecency()] == [
+            "item 2",
+            "item 1",
+            "item 0",
+        ]
+        assert [item.content for item in snapshot.listed()] == [
+            "item 2",
+            "item 1",
+            "item 0",
+        ]
+
+    def test_snapshot_lists_pinned_items_first(self):
+        history = ClipboardHistory(items=[], max_items=10)
+        items = [history.add_item(f"item {i}") for i in range(3)]
+        history.set_pinned([items[0].id])
+
+        snapshot = history.snapshot()
+
+        assert [item.content for item in snapshot.listed()] == [
+            "item 0",
+            "item 2",
+            "item 1",
+        ]
+        assert [item.content for item in snapshot.by_frecency()][0] == "item 0"
+
+    def test_readers_and_writers_on_different_threads(self):
+        history = ClipboardHistory(items=[], max_items=50)
+        errors = []
+
+        def write():
+            for i in range(2000):
+                history.add_item(f"item {i % 80}")
+
+        def read():
+            try:
+                for _ in range(200):
+                    snapshot = history.snapshot()
+                    assert len({item.id for item in snapshot}) == len(snapshot)
+                    assert len(snapshot) <= 50
+            except Exception as e:  # pragma: no cover - reported below
+                errors.append(e)
+
+        threads = [threading.Thread(target=write)] + [
+            threading.Thread(target=read) for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert len(history) == 50
+
+    def test_remove_items_by_ids_is_one_batch(self, history):
+        published = []
+        items = [history.add_item(content) for content in ["a", "b", "c"]]
+        history.subscribe(published.append)
+
+        removed = history.remove_items_by_ids([items[0].id, items[2].id, 999])
+
+        assert removed == 2
+        assert history.get_content_list() == ["b"]
+        assert len(published) == 1
+        assert [change.kind for change in published[0]] == [
+            ChangeKind.REMOVED,
+            ChangeKind.REMOVED,
+        ]
+
+    def test_pinned_items_are_not_evicted(self, history):
+        first = history.add_item("first")
+        history.set_pinned([first.id])
+
+        for content in ["b", "c", "d", "e"]:
+            history.add_item(content)
+
+        assert history.get_content_list() == ["e", "d", "first"]
+
+    def test_unpinning_applies_limits_again(self):
+        history = ClipboardHistory(items=[], max_items=2)
+        items = [history.add_item(content) for content in ["a", "b"]]
+        history.set_pinned([item.id for item in items])
+        history.add_item("c")
+        assert len(history) == 3
+
+        assert history.set_pinned([items[0].id], pinned=False) == 1
+
+        assert history.get_content_list() == ["c", "b"]
+
+    def test_pinning_keeps_items_in_place(self):
+        items = [
+            ClipboardItem(content=content, created_at=datetime(2024, 1, 1, hour))
+            for hour, content in enumerate(["a", "b", "c", "d"])
+        ]
+        history = ClipboardHistory(items=reversed(items), max_items=10)
+
+        history.set_pinned([items[1].id])
+        assert history.get_content_list() == ["d", "c", "b", "a"]
+
+        history.set_pinned([items[1].id], pinned=False)
+        assert history.get_content_list() == ["d", "c", "b", "a"]
+
+    def test_eviction_skips_pinned_tail_without_walking_it(self):
+        history = ClipboardHistory(items=[], max_items=5)
+        pinned = [history.add_item(f"pinned {i}") for i in range(4)]
+        history.set_pinned([item.id for item in pinned])
+
+        for content in ["a", "b", "c"]:
+            history.add_item(content)
+
+        assert history.get_content_list() == [
+            "c",
+            "pinned 3",
+            "pinned 2",
+            "pinned 1",
+            "pinned 0",
+        ]
+
+    def test_pin_survives_copying_same_content_again(self, history):
+        item = history.add_item("first")
+        history.set_pinned([item.id])
+        history.add_item("second")
+
+        assert history.add_item("first").pinned
+
+    def test_promote_moves_item_to_front_with_one_use(self, history):
+        first = history.add_item("first")
+        history.add_item("second")
+        frecency = first.frecency
+
+        promoted = history.promote(first.id)
+
+        assert promoted.id == first.id
+        assert history.get_item(first.id) is promoted
+        assert history.get_content_list() == ["first", "second"]
+        assert promoted.use_count == 1
+        assert promoted.frecency > frecency
+
+    def test_snapshots_keep_items_as_they_were(self, history):
+        first = history.add_item("first")
+        history.add_item("second")
+        created = first.created_timestamp
+        before = history.snapshot()
+
+        history.record_use(first.id)
+        history.promote(first.id)
+        history.set_pinned([first.id])
+
+        (kept,) = [item for item in before if item.id == first.id]
+        assert kept is first
+        assert (kept.use_count, kept.pinned) == (0, False)
+        assert [item.content for item in before] == ["second", "first"]
+        assert kept.created_timestamp == created
+        assert history.get_item(first.id).use_count == 2
+
+    def test_images_are_deduplicated_by_hash(self, history):
+        first = history.add_image(b"h" * 16, 1000, "Image 10×10")
+        history.add_item("text")
+        again = history.add_image(b"h" * 16, 1000, "Image 10×10")
+
+        assert again.id == first.id
+        assert again.is_image
+        assert len(history) == 2
+        assert history.total_bytes == 1000 + len("text")
+
+    def test_images_never_collapse_as_near_duplicates(self):
+        history = ClipboardHistory(items=[], collapse_near_duplicates=True)
+        history.add_image(b"a" * 16, 10, "Image 10×10")
+        history.add_image(b"b" * 16, 10, "Image 10×10")
+        assert len(history) == 2
+
+    def test_removed_change_carries_the_item(self, history):
+        item = history.add_item("first")
+        published = []
+        history.subscribe(published.append)
+
+        history.remove_item_by_id(item.id)
+
+        assert published[0][0].item is item
+
+    def test_set_formats_is_journaled(self, history):
+        item = history.add_item("bold")
+        published = []
+        history.subscribe(published.append)
+
+        assert history.set_formats(item.id, ["text/html"])
+
+        assert history.get_item(item.id).formats == ("text/html",)
+        assert [change.kind for change in published[0]] == [ChangeKind.UPDATED]
+
+    def test_copying_same_text_again_keeps_its_formats(self, history):
+        item = history.add_item("bold")
+        history.set_formats(item.id, ["text/html"])
+        history.add_item("other")
+
+        again = history.add_item("bold")
+
+        assert again.formats == ("text/html",)
@@ -0,0 +1,64 @@
+from datetime import datetime
+from unittest.mock import Mock
+
+import pytest
+
+from src.domain.clipboard import ClipboardItem
+from src.domain.clipboard.clipboard_item import PREVIEW_LENGTH
+
+
+class TestClipboardItem:
+    def test_rejects_empty_content(self):
+        with pytest.raises(ValueError):
+            ClipboardItem(content="", created_at=datetime.now())
+
+    def test_created_at_round_trips(self):
+        moment = datetime(2024, 5, 6, 7, 8, 9, 123456)
+        assert ClipboardItem(content="x", created_at=moment).created_at == moment
+
+    def test_size_is_utf8_length(self):
+        assert ClipboardItem(content="жж", created_at=datetime.now()).size == 4
+
+    def test_preview_truncates_and_flattens_newlines(self):
+        item = ClipboardItem(content="line one\nline two", created_at=datetime.now())
+        assert item.preview() == "line one line two"
+        assert item.preview(max_length=10) == "line on..."
+
+    def test_released_item_loads_content_on_access(self):
+        item = ClipboardItem(content="a" * 500, created_at=datetime.now(), id=7)
+        loader = Mock(return_value="a" * 500)
+
+        item.release_content(loader)
+
+        assert item.is_loaded is False
+        assert item.preview() == "a" * 47 + "..."
+        loader.assert_not_called()
+        assert item.content == "a" * 500
+        loader.assert_called_once_with(7)
+
+    def test_long_preview_of_lazy_item_uses_loader(self):
+        loader = Mock(return_value="b" * 300)
+        item = ClipboardItem.lazy(
+            id=3,
+            head="b" * 300,
+            content_hash=b"",
+            size=300,
+            created_timestamp=0,
+            loader=loader,
+        )
+
+        assert item.preview(max_length=PREVIEW_LENGTH - 1) == "b" * 196 + "..."
+        loader.assert_not_called()
+        assert item.preview(max_length=400) == "b" * 300
+        loader.assert_called_once_with(3)
+
+    def test_missing_body_falls_back_to_preview(self):
+        item = ClipboardItem.lazy(
+            id=3,
+            head="short",
+            content_hash=b"",
+            size=5,
+            created_timestamp=0,
+            loader=Mock(return_value=None),
+        )
+        assert item.content == "short"
@@ -0,0 +1,80 @@
+import random
+
+from src.domain.clipboard.frecency_index import (
+    FRECENCY_HALF_LIFE,
+    FrecencyIndex,
+    add_use,
+    decayed_score,
+)
+
+HALF_LIFE_US = FRECENCY_HALF_LIFE.total_seconds() * 1_000_000
+
+
+class TestFrecency:
+    def test_single_use_halves_after_half_life(self):
+        key = add_use(None, 0)
+        assert decayed_score(key, 0) == 1.0
+        assert abs(decayed_score(key, int(HALF_LIFE_US)) - 0.5) < 1e-9
+
+    def test_uses_accumulate(self):
+        key = add_use(add_use(None, 0), 0)
+        assert abs(decayed_score(key, 0) - 2.0) < 1e-9
+
+    def test_frequent_old_item_can_outrank_single_new_use(self):
+        frequent = None
+        for _ in range(4):
+            frequent = add_use(frequent, 0)
+        recent = add_use(None, int(HALF_LIFE_US))
+        assert frequent > recent
+
+
+class TestFrecencyIndex:
+    def test_iterates_highest_key_first(self):
+        index = FrecencyIndex()
+        for item_id, key in [(1, 0.5), (2, 3.0), (3, 1.5)]:
+            index.update(item_id, key)
+        assert list(index) == [2, 3, 1]
+        assert index.top(2) == [2, 3]
+
+    def test_update_replaces_previous_key(self):
+        index = FrecencyIndex()
+        index.update(1, 1.0)
+        index.update(2, 2.0)
+        index.update(1, 5.0)
+        assert list(index) == [1, 2]
+        assert len(index) == 2
+
+    def test_heap_is_built_once_a_copy_is_read(self):
+        index = FrecencyIndex()
+        index.update(1, 1.0)
+        assert index._heap is None
+
+        assert list(index.copy()) == [1]
+        index.update(2, 2.0)
+
+        assert index._heap is None
+        assert list(index.copy()) == [2, 1]
+        assert index._heap is not None
+
+    def test_removed_items_are_skipped(self):
+        index = FrecencyIndex()
+        index.update(1, 1.0)
+        index.update(2, 2.0)
+        index.remove(2)
+        assert list(index) == [1]
+
+    def test_matches_full_sort_after_many_updates(self):
+        rng = random.Random(7)
+        index = FrecencyIndex()
+        keys = {}
+        for _ in range(2000):
+            item_id = rng.randrange(300)
+            if rng.random() < 0.1:
+                index.remove(item_id)
+                keys.pop(item_id, None)
+            else:
+                keys[item_id] = rng.random()
+                index.update(item_id, keys[item_id])
+        expected = sorted(keys, key=keys.get, reverse=True)
+        assert list(index) == expected
+        assert index.top(10) == expected[:10]
@@ -0,0 +1,80 @@
+from src.domain.clipboard.near_duplicate_index import (
+    NearDuplicateIndex,
+    content_signature,
+    hamming_distance,
+)
+
+LOG_LINE = "2024-05-{:02d} 12:00:{:02d} INFO worker-3 processed batch 1234 status=ok"
+
+
+def signature(text):
+    return content_signature(text, len(text.encode("utf-8")))
+
+
+class TestContentSignature:
+    def test_log_lines_differing_in_timestamps_are_close(self):
+        first = signature(LOG_LINE.format(1, 1))
+        second = signature(LOG_LINE.format(2, 7) + "\n")
+        assert hamming_distance(first, second) <= 3
+
+    def test_other_numbers_are_significant(self):
+        query = "UPDATE accounts SET balance = {} WHERE account_id = {} AND active = 1"
+        first = signature(query.format(100, 4711))
+        second = signature(query.format(999999, 1))
+        assert hamming_distance(first, second) > 3
+
+    def test_unrelated_texts_are_far_apart(self):
+        first = signature(LOG_LINE.format(1, 1))
+        second = signature(
+            "Completely unrelated paragraph about gardening, soil and tomatoes."
+        )
+        assert hamming_distance(first, second) > 3
+
+    def test_text_past_the_simhash_prefix_is_compared_exactly(self):
+        text = "".join(f"line {i} of a long file\n" for i in range(400))
+        appended = text + "one more line\n"
+        assert hamming_distance(signature(text), signature(appended)) > 3
+        assert signature(text) == signature(text.replace("\n", " \n"))
+
+    def test_short_texts_only_match_on_whitespace_and_timestamps(self):
+        assert signature("hello  world\n") == signature("hello world")
+        assert signature("at 12:00:01") == signature("at 13:45:59")
+        assert signature("order 123") != signature("order 456")
+
+
+class TestNearDuplicateIndex:
+    def _add(self, index, item_id, text):
+        index.add(item_id, signature(text), len(text))
+
+    def test_finds_near_duplicate(self):
+        index = NearDuplicateIndex()
+        self._add(index, 1, LOG_LINE.format(1, 1))
+
+        variant = LOG_LINE.format(2, 7)
+        assert index.find(signature(variant), len(variant)) == 1
+
+    def test_ignores_removed_and_distant_items(self):
+        index = NearDuplicateIndex()
+        text = LOG_LINE.format(1, 1)
+        self._add(index, 1, text)
+        other = "Completely unrelated paragraph about gardening, soil and tomatoes."
+        assert index.find(signature(other), len(other)) is None
+
+        index.remove(1)
+        assert index.find(signature(text), len(text)) is None
+        assert len(index) == 0
+
+    def test_short_clips_match_exactly(self):
+        index = NearDuplicateIndex()
+        self._add(index, 1, "yes")
+        assert index.find(signature(" yes\n"), 5) == 1
+        assert index.find(signature("no"), 2) is None
+
+    def test_shared_buckets_keep_every_id(self):
+        index = NearDuplicateIndex()
+        self._add(index, 1, "same")
+        self._add(index, 2, "same ")
+        index.remove(1)
+
+        assert index.find(signature("same"), 4) == 2
+        assert len(index) == 1